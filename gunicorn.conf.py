@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+
+
+# Workers share metrics through files in this directory; it has to be set
+# before the app (and so prometheus_client) is loaded by each worker.
+METRICS_DIR = os.path.join(tempfile.gettempdir(), "howsmytrack-metrics")
+os.environ.setdefault("prometheus_multiproc_dir", METRICS_DIR)
+
+
+def on_starting(server):
+    # Don't carry over metrics from a previous run.
+    metrics_dir = os.environ["prometheus_multiproc_dir"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    # Imported here rather than at the top so that prometheus_client is never
+    # imported before prometheus_multiproc_dir has been set.
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
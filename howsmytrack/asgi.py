@@ -3,13 +3,19 @@ ASGI config for howsmytrack project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Scheduled jobs are run by the `clock` process (see `run_scheduler`), so
+nothing here should start the scheduler.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 """
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from howsmytrack.core.asgi import HowsMyTrackASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "howsmytrack.settings")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+application = HowsMyTrackASGIHandler()
@@ -1,10 +1,14 @@
 from django.contrib import admin
 
+from howsmytrack.core.models import DailyStats
 from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackRequest
 from howsmytrack.core.models import FeedbackResponse
 from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.models import IdempotencyKey
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import Lease
 
 
 class FeedbackRequestInline(admin.TabularInline):
@@ -95,8 +99,55 @@ class FeedbackRequestAdmin(admin.ModelAdmin):
     ]
 
 
+class DailyStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "feedback_requests",
+        "signups",
+        "feedback_groups",
+        "feedback_responses",
+        "submissions",
+        "ratings",
+        "replies",
+    )
+    ordering = ["-date"]
+
+
+class LeaseAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "holder",
+        "expires_at",
+    )
+
+
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "key",
+        "status_code",
+        "expires_at",
+    )
+
+
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "job_name",
+        "status",
+        "time_started",
+        "duration",
+        "rows_processed",
+        "host",
+    )
+    list_filter = ["job_name", "status"]
+
+
 admin.site.register(FeedbackGroupsUser, FeedbackGroupsUserAdmin)
 admin.site.register(FeedbackGroup, FeedbackGroupAdmin)
 admin.site.register(FeedbackRequest, FeedbackRequestAdmin)
 admin.site.register(FeedbackResponse, FeedbackResponseAdmin)
 admin.site.register(FeedbackResponseReply, FeedbackResponseReplyAdmin)
+admin.site.register(DailyStats, DailyStatsAdmin)
+admin.site.register(Lease, LeaseAdmin)
+admin.site.register(IdempotencyKey, IdempotencyKeyAdmin)
+admin.site.register(JobRun, JobRunAdmin)
@@ -5,4 +5,7 @@ class CoreConfig(AppConfig):
     name = "howsmytrack.core"
 
     def ready(self):
+        # Connect signal receivers.
+        import howsmytrack.core.auth  # noqa: F401
+
         print("Core app ready.")
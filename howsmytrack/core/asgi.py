@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+
+
+class HowsMyTrackASGIHandler(ASGIHandler):
+    """
+    Django 3.0 has no async views, so the ASGI handler runs every request
+    (including GraphQL resolvers) in a thread. By default that's the event
+    loop's executor, which can grow well beyond the number of DB connections
+    available to a dyno, and closes stale connections from whichever thread
+    happens to fire the request signals rather than the one that used them.
+
+    This handler runs requests in a pool of `settings.ASGI_THREADS` threads
+    instead. Requests beyond that wait on the event loop, each thread holds
+    at most one persistent DB connection, and connections are recycled by
+    the thread which owns them.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_THREADS, thread_name_prefix="asgi",
+        )
+
+    async def get_response(self, request):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, self.get_response_in_thread, request,
+        )
+
+    def get_response_in_thread(self, request):
+        close_old_connections()
+        try:
+            return super().get_response(request)
+        finally:
+            close_old_connections()
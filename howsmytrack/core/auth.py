@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import namedtuple
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from graphql_jwt.backends import JSONWebTokenBackend
+from graphql_jwt.utils import get_credentials
+from graphql_jwt.utils import get_payload
+from graphql_jwt.utils import get_user_by_natural_key as get_user_from_db
+from graphql_jwt.utils import get_user_by_payload
+
+from howsmytrack.core.cache import delete
+from howsmytrack.core.cache import get_or_compute
+from howsmytrack.core.cache import hash_key
+from howsmytrack.core.cache import USER_CACHE
+from howsmytrack.core.cache import USER_TIMEOUT
+
+
+def get_users_by_email(email):
+    """
+    Users whose username is `email` in any case.
+
+    Compares `LOWER(username)` so that the lookup can use the index created
+    in migration 0021; `username__iexact` can't use an index.
+    """
+    return User.objects.annotate(username_lower=Lower("username")).filter(
+        username_lower=email.lower()
+    )
+
+
+def get_user_by_natural_key(username):
+    """
+    Used by django-graphql-jwt to find the user for a token, which happens
+    on every authenticated request; cached to save a query each time.
+    """
+    return get_or_compute(
+        USER_CACHE,
+        hash_key(username),
+        lambda: get_user_from_db(username),
+        USER_TIMEOUT,
+    )
+
+
+def invalidate_user(username):
+    delete(USER_CACHE, hash_key(username))
+
+
+# The user is stored as its field values rather than as a User, so that each
+# hit gets a fresh instance; anything a request changes or loads onto its
+# user (including related objects cached in `_state`) stays with that request.
+VerifiedToken = namedtuple(
+    "VerifiedToken", ["payload", "user_id", "db", "user_values", "expires_at"]
+)
+
+
+class VerifiedTokenCache:
+    """
+    A bounded, per-process cache of JWTs which have already been verified,
+    keyed by a hash of the whole token, and the users they were issued to.
+
+    Entries last for `settings.JWT_VERIFICATION_CACHE["TTL"]` at most, and
+    never beyond the token's expiry. Invalidation only reaches the process it
+    happens in, so the TTL is kept short to bound how long other processes
+    keep accepting a changed user's tokens.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, token_key):
+        with self.lock:
+            entry = self.entries.get(token_key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self.entries[token_key]
+                return None
+            self.entries.move_to_end(token_key)
+        user = User.from_db(
+            entry.db,
+            [field.attname for field in User._meta.concrete_fields],
+            entry.user_values,
+        )
+        return dict(entry.payload), user
+
+    def set(self, token_key, payload, user):
+        max_size = settings.JWT_VERIFICATION_CACHE["MAX_SIZE"]
+        if not max_size:
+            return
+        entry = VerifiedToken(
+            payload=dict(payload),
+            user_id=user.id,
+            db=user._state.db,
+            user_values=tuple(
+                getattr(user, field.attname) for field in User._meta.concrete_fields
+            ),
+            expires_at=min(
+                time.time() + settings.JWT_VERIFICATION_CACHE["TTL"].total_seconds(),
+                payload.get("exp", 0),
+            ),
+        )
+        with self.lock:
+            self.entries[token_key] = entry
+            self.entries.move_to_end(token_key)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, token_key):
+        with self.lock:
+            self.entries.pop(token_key, None)
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for token_key, entry in list(self.entries.items()):
+                if entry.user_id == user_id:
+                    del self.entries[token_key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def get_token_key(token):
+    # The whole token rather than just its signature, so that a token whose
+    # payload has been tampered with is never matched and is verified as usual.
+    return hash_key(token)
+
+
+def get_user_by_token(token, context=None):
+    """
+    Like graphql_jwt.shortcuts.get_user_by_token, but tokens which have been
+    verified recently skip decoding the token and looking up the user.
+    """
+    token_key = get_token_key(token)
+    cached = verified_tokens.get(token_key)
+    if cached:
+        return cached[1]
+
+    payload = get_payload(token, context)
+    user = get_user_by_payload(payload)
+    if user is not None:
+        verified_tokens.set(token_key, payload, user)
+    return user
+
+
+def invalidate_token(token):
+    verified_tokens.invalidate(get_token_key(token))
+
+
+class CachedJSONWebTokenBackend(JSONWebTokenBackend):
+    def authenticate(self, request=None, **kwargs):
+        if request is None or getattr(request, "_jwt_token_auth", False):
+            return None
+
+        token = get_credentials(request, **kwargs)
+        if token is not None:
+            return get_user_by_token(token, request)
+        return None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_changed_user(sender, instance, **kwargs):
+    # Covers password and email changes and users being deactivated, but not
+    # queryset updates, which send no signals (see USER_TIMEOUT). If the
+    # username changed, the old username must be invalidated separately.
+    invalidate_user(instance.username)
+    verified_tokens.invalidate_user(instance.id)
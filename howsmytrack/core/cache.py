@@ -0,0 +1,80 @@
+import hashlib
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from howsmytrack.core.metrics import CACHE_REQUESTS
+
+
+MEDIA_INFO_CACHE = "media_info"
+NOTIFICATIONS_CACHE = "notifications"
+FEEDBACK_GROUP_CACHE = "feedback_group"
+USER_CACHE = "user"
+
+MEDIA_INFO_TIMEOUT = timedelta(days=1)
+NOTIFICATIONS_TIMEOUT = timedelta(minutes=5)
+FEEDBACK_GROUP_TIMEOUT = timedelta(hours=1)
+# Cached users are invalidated by post_save/post_delete signals, which a
+# queryset `update()` (e.g. deactivating users in bulk) doesn't send; such
+# changes only take effect for JWT requests once this has passed, unless
+# `auth.invalidate_user` is called for each user.
+USER_TIMEOUT = timedelta(minutes=5)
+
+
+def hash_key(value):
+    """Hash arbitrary user input (e.g. URLs) into a safe cache key."""
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def get_version_key(name, key):
+    return f"version:{name}:{key}"
+
+
+def get_version(name, key):
+    """
+    Get the current version of the values cached for `key`. If the version
+    has been evicted, it restarts from the current time rather than 1, so
+    that values cached under old versions are never served again.
+    """
+    version_key = get_version_key(name, key)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, int(time.time() * 1000), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_version(name, key):
+    """Invalidate every value cached for `key` under the current version."""
+    version_key = get_version_key(name, key)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # Not cached, so nothing to invalidate; start a new version.
+        get_version(name, key)
+
+
+def get_or_compute(name, key, compute, timeout, version=None):
+    """
+    Get the value cached for `key`, or compute and cache it. Hits and misses
+    are recorded per cache `name` to track hit rates.
+
+    None is never cached, so that e.g. lookups for objects that don't exist
+    yet aren't remembered.
+    """
+    cache_key = f"{name}:{key}"
+    value = cache.get(cache_key, version=version)
+    if value is not None:
+        CACHE_REQUESTS.labels(cache=name, result="hit").inc()
+        return value
+
+    CACHE_REQUESTS.labels(cache=name, result="miss").inc()
+    value = compute()
+    if value is not None:
+        cache.set(cache_key, value, timeout.total_seconds(), version=version)
+    return value
+
+
+def delete(name, key):
+    cache.delete(f"{name}:{key}")
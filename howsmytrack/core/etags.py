@@ -0,0 +1,102 @@
+import hashlib
+import json
+
+from django.db.models import Count
+from django.db.models import Sum
+from graphql import parse
+from graphql.error import GraphQLSyntaxError
+from graphql.language.ast import Field
+from graphql.language.ast import OperationDefinition
+
+from howsmytrack.core.models import FeedbackGroupsUser
+
+
+# Root query fields whose results only depend on their arguments and the data
+# covered by `get_data_version`.
+ETAG_FIELDS = {
+    "mediaInfo",
+    "userDetails",
+    "feedbackGroup",
+    "feedbackGroups",
+    "replies",
+}
+
+
+def get_operation(query, operation_name):
+    """
+    Get the definition of the operation to be run by a GraphQL request, or
+    None if the query is invalid or doesn't contain exactly one such operation.
+    """
+    try:
+        document = parse(query)
+    except GraphQLSyntaxError:
+        return None
+
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinition)
+        and (
+            not operation_name
+            or (definition.name and definition.name.value == operation_name)
+        )
+    ]
+    if len(operations) != 1:
+        return None
+    return operations[0]
+
+
+def get_root_fields(query, operation_name):
+    """
+    Get the names of the root fields selected by the query operation to be
+    run, or None if it isn't a query or can't be determined without running
+    it (e.g. it uses fragments at the root).
+    """
+    operation = get_operation(query, operation_name)
+    if not operation or operation.operation != "query":
+        return None
+
+    selections = operation.selection_set.selections
+    if not all(isinstance(selection, Field) for selection in selections):
+        return None
+    return {selection.name.value for selection in selections}
+
+
+def get_data_version(user):
+    """
+    Get values which change whenever anything a user can query through
+    ETAG_FIELDS changes: their own details, which groups they're in and the
+    versions of those groups (see FeedbackGroup.version).
+    """
+    if user.is_anonymous:
+        return None
+
+    return (
+        FeedbackGroupsUser.objects.filter(user=user)
+        .values("id", "rating", "send_reminder_emails")
+        .annotate(
+            feedback_groups=Count("feedback_requests__feedback_group"),
+            feedback_group_versions=Sum("feedback_requests__feedback_group__version"),
+        )
+        .first()
+    )
+
+
+def get_etag(user, query, variables, operation_name):
+    """
+    Get an ETag for the result of a GraphQL query without running it, or None
+    if the result could change without its tag changing.
+    """
+    root_fields = get_root_fields(query, operation_name)
+    if not root_fields or not root_fields <= ETAG_FIELDS:
+        return None
+
+    tagged = [
+        query,
+        variables,
+        operation_name,
+        user.username,
+        get_data_version(user),
+    ]
+    digest = hashlib.sha1(json.dumps(tagged, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
@@ -0,0 +1,221 @@
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.http import JsonResponse
+from django.utils.http import parse_etags
+from graphene_django.views import GraphQLView
+from graphene_django.views import HttpError
+from graphql_jwt.exceptions import JSONWebTokenError
+
+from howsmytrack.core import metrics
+from howsmytrack.core.etags import get_etag
+from howsmytrack.core.etags import get_operation
+from howsmytrack.core.models import IdempotencyKey
+from howsmytrack.core.profiling import execute_wrapper_for_all
+from howsmytrack.core.routers import is_pinned_to_primary
+from howsmytrack.core.routers import pin_to_primary
+from howsmytrack.core.routers import read_from_replica
+
+
+class HowsMyTrackGraphQLView(GraphQLView):
+    """
+    GraphQLView with some extra behaviour for howsmytrack:
+        - GET queries are tagged with ETags, and return 304 Not Modified
+          without running any resolvers if the client's tag still matches.
+        - queries read from the replica database, if one is configured,
+          unless the client has made a mutation recently.
+        - logged in users' POSTs with an `Idempotency-Key` header are only
+          run once; retries with the same key get the stored response.
+        - responses with rate limited fields have a Retry-After header.
+        - the latency, DB query count and resolver errors of each operation
+          are recorded in metrics.
+        - in debug mode, the SQL profile of profiled requests is returned
+          in the `extensions` field of the response.
+    """
+
+    def authenticate(self, request):
+        """
+        Authenticate JWTs up front rather than in the GraphQL middleware, since
+        ETags depend on the user. The middleware leaves authenticated requests
+        alone, so tokens are still only checked once.
+        """
+        if request.user.is_anonymous:
+            try:
+                user = authenticate(request=request)
+            except JSONWebTokenError:
+                # Let the middleware deal with invalid tokens as usual.
+                return
+            if user:
+                request.user = user
+
+    def can_read_from_replica(self, request):
+        return settings.REPLICA_DATABASE and not is_pinned_to_primary(request)
+
+    def dispatch(self, request, *args, **kwargs):
+        idempotency_key = request.META.get("HTTP_IDEMPOTENCY_KEY")
+        if idempotency_key and request.method.lower() == "post":
+            response = self.dispatch_idempotently(
+                request, idempotency_key, *args, **kwargs
+            )
+        else:
+            response = self.dispatch_with_etag(request, *args, **kwargs)
+        if settings.REPLICA_DATABASE and getattr(request, "graphql_mutation", False):
+            pin_to_primary(response)
+        # Set by RateLimitGraphQLMiddleware.
+        retry_after = getattr(request, "rate_limit_retry_after", None)
+        if retry_after:
+            response["Retry-After"] = str(retry_after)
+        return response
+
+    def dispatch_idempotently(self, request, key, *args, **kwargs):
+        self.authenticate(request)
+        # Keys are per user, so there's nothing to store them against for
+        # anonymous requests.
+        if request.user.is_anonymous:
+            return self.dispatch_with_etag(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return JsonResponse(
+                {"errors": [{"message": "Idempotency-Key is too long."}]}, status=400,
+            )
+
+        request_hash = hashlib.sha256(request.body).hexdigest()
+        claimed, idempotency_key = IdempotencyKey.claim(
+            request.user,
+            key,
+            request_hash,
+            settings.IDEMPOTENCY_KEY_TTL,
+            settings.IDEMPOTENCY_KEY_LEASE,
+        )
+        if not claimed:
+            return self.replay(request, idempotency_key, request_hash)
+
+        try:
+            response = self.dispatch_with_etag(request, *args, **kwargs)
+        except BaseException:
+            idempotency_key.release()
+            raise
+        # Only mutations need storing, and server errors and rate limited
+        # requests should be retried.
+        if (
+            getattr(request, "graphql_mutation", False)
+            and response.status_code < 500
+            and not getattr(request, "rate_limit_retry_after", None)
+        ):
+            idempotency_key.store_response(
+                response.status_code, response.content.decode()
+            )
+        else:
+            idempotency_key.release()
+        return response
+
+    def replay(self, request, idempotency_key, request_hash):
+        if idempotency_key.request_hash != request_hash:
+            return JsonResponse(
+                {
+                    "errors": [
+                        {
+                            "message": "Idempotency-Key has already been used for a different request."
+                        }
+                    ]
+                },
+                status=422,
+            )
+        if idempotency_key.status_code is None:
+            return JsonResponse(
+                {
+                    "errors": [
+                        {
+                            "message": "A request with this Idempotency-Key is still in progress."
+                        }
+                    ]
+                },
+                status=409,
+            )
+
+        request.graphql_mutation = True
+        response = HttpResponse(
+            idempotency_key.response,
+            status=idempotency_key.status_code,
+            content_type="application/json",
+        )
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def dispatch_with_etag(self, request, *args, **kwargs):
+        if request.method.lower() != "get" or self.can_display_graphiql(request, {}):
+            return super().dispatch(request, *args, **kwargs)
+
+        try:
+            query, variables, operation_name, _ = self.get_graphql_params(request, {})
+        except HttpError:
+            return super().dispatch(request, *args, **kwargs)
+
+        self.authenticate(request)
+        read_context = (
+            read_from_replica()
+            if self.can_read_from_replica(request)
+            else nullcontext()
+        )
+        with read_context:
+            etag = query and get_etag(request.user, query, variables, operation_name)
+        if not etag:
+            return super().dispatch(request, *args, **kwargs)
+
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            # Rate limit errors aren't covered by the data version, so
+            # mustn't be reused.
+            if response.status_code != 200 or getattr(
+                request, "rate_limit_retry_after", None
+            ):
+                return response
+
+        response["ETag"] = etag
+        # Results are per-user, and clients should check they're up to date.
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, *args, **kwargs
+    ):
+        # Filled in by MetricsGraphQLMiddleware.
+        request.graphql_root_fields = []
+        query_counter = metrics.QueryCounter()
+
+        operation = query and get_operation(query, operation_name)
+        operation_type = operation and operation.operation
+        request.graphql_mutation = operation_type == "mutation"
+        if operation_type == "query" and self.can_read_from_replica(request):
+            # Sessions are only written to the primary, so they must be read
+            # from it too.
+            self.authenticate(request)
+            read_context = read_from_replica()
+        else:
+            read_context = nullcontext()
+
+        start = time.perf_counter()
+        with execute_wrapper_for_all(query_counter), read_context:
+            result = super().execute_graphql_request(
+                request, data, query, variables, operation_name, *args, **kwargs
+            )
+        duration = time.perf_counter() - start
+
+        if result:
+            metrics.record_graphql_operation(
+                request.graphql_root_fields, duration, query_counter.count, result,
+            )
+        return result
+
+    def json_encode(self, request, d, pretty=False):
+        sql_profile = getattr(request, "sql_profile", None)
+        if settings.DEBUG and sql_profile:
+            d = {**d, "extensions": {"sqlProfile": sql_profile.as_dict()}}
+        return super().json_encode(request, d, pretty=pretty)
@@ -0,0 +1,171 @@
+import socket
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from django.db import connections
+from django.utils import timezone
+
+from howsmytrack.core.job_runner import run_job
+from howsmytrack.core.metrics import record_job_run
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import JobRunStatus
+
+
+# `name` is the name of the management command to run; the job only starts
+# once every job named in `dependencies` has succeeded.
+DagJob = namedtuple("DagJob", ["name", "dependencies", "timeout"])
+
+CRITICAL_PATH_SEPARATOR = " > "
+
+
+def run_job_in_thread(job_name):
+    try:
+        job_run = run_job(job_name)
+    finally:
+        # Each thread gets its own DB connection; don't leave them lying around.
+        connections.close_all()
+
+    if not job_run:
+        # Already running in another process; we can't vouch for its results.
+        return JobRunStatus.SKIPPED
+    return JobRunStatus[job_run.status]
+
+
+class JobDag:
+    """
+    Runs a set of jobs, starting each one as soon as all of its dependencies
+    have succeeded rather than at a fixed time. Independent jobs run
+    concurrently.
+
+    If a job fails, times out or is skipped, every job depending on it
+    (directly or otherwise) is skipped. Jobs that time out are not
+    killed; the DAG just stops waiting for them.
+
+    Each run of the whole DAG is recorded as a JobRun, along with its
+    critical path i.e. the chain of jobs that determined how long it took.
+    """
+
+    def __init__(self, name, jobs):
+        self.name = name
+        self.jobs = {job.name: job for job in jobs}
+
+        for job in jobs:
+            for dependency in job.dependencies:
+                if dependency not in self.jobs:
+                    raise ValueError(f"{job.name} depends on unknown job {dependency}")
+        self.check_acyclic()
+
+    def check_acyclic(self):
+        visited = set()
+
+        def visit(job_name, path):
+            if job_name in path:
+                raise ValueError(f"Dependency cycle involving {job_name}")
+            if job_name in visited:
+                return
+            for dependency in self.jobs[job_name].dependencies:
+                visit(dependency, path | {job_name})
+            visited.add(job_name)
+
+        for job_name in self.jobs:
+            visit(job_name, set())
+
+    def get_critical_path(self, finish_times):
+        """Walk back from the last job to finish, following whichever
+        dependency finished last at each step."""
+        if not finish_times:
+            return []
+
+        critical_path = [max(finish_times, key=finish_times.get)]
+        while True:
+            dependencies = [
+                dependency
+                for dependency in self.jobs[critical_path[0]].dependencies
+                if dependency in finish_times
+            ]
+            if not dependencies:
+                return critical_path
+            critical_path.insert(0, max(dependencies, key=finish_times.get))
+
+    def run(self):
+        dag_run = JobRun(job_name=self.name, host=socket.gethostname())
+        dag_run.save()
+
+        statuses = {}
+        finish_times = {}
+        # Maps futures for running jobs to (job, deadline)
+        running = {}
+        pending = list(self.jobs.values())
+
+        executor = ThreadPoolExecutor(max_workers=len(self.jobs) or 1)
+        while pending or running:
+            for job in list(pending):
+                dependency_statuses = [
+                    statuses.get(dependency) for dependency in job.dependencies
+                ]
+                if all(
+                    status == JobRunStatus.SUCCEEDED for status in dependency_statuses
+                ):
+                    pending.remove(job)
+                    future = executor.submit(run_job_in_thread, job.name)
+                    running[future] = (job, timezone.now() + job.timeout)
+                elif any(
+                    status not in (None, JobRunStatus.SUCCEEDED)
+                    for status in dependency_statuses
+                ):
+                    pending.remove(job)
+                    statuses[job.name] = JobRunStatus.SKIPPED
+                    print(f"Skipped: {job.name}, as a dependency did not succeed.")
+
+            if not running:
+                continue
+
+            next_deadline = min(deadline for job, deadline in running.values())
+            done, not_done = wait(
+                running,
+                timeout=max((next_deadline - timezone.now()).total_seconds(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+
+            for future in done:
+                job, deadline = running.pop(future)
+                finish_times[job.name] = timezone.now()
+                try:
+                    statuses[job.name] = future.result()
+                except Exception as e:
+                    print(f"Failed: {job.name} raised {e!r}")
+                    statuses[job.name] = JobRunStatus.FAILED
+
+            now = timezone.now()
+            for future in not_done:
+                job, deadline = running[future]
+                if deadline <= now:
+                    running.pop(future)
+                    finish_times[job.name] = now
+                    statuses[job.name] = JobRunStatus.TIMED_OUT
+                    print(f"Timed out: {job.name} took longer than {job.timeout}.")
+
+        # Don't wait around for jobs that have timed out.
+        executor.shutdown(wait=False)
+
+        unsuccessful_jobs = [
+            job_name
+            for job_name, status in statuses.items()
+            if status != JobRunStatus.SUCCEEDED
+        ]
+        dag_run.critical_path = CRITICAL_PATH_SEPARATOR.join(
+            self.get_critical_path(finish_times)
+        )
+        dag_run.finish(
+            JobRunStatus.FAILED if unsuccessful_jobs else JobRunStatus.SUCCEEDED,
+            rows_processed=len(statuses) - len(unsuccessful_jobs),
+            error=", ".join(
+                f"{job_name}: {statuses[job_name].value}"
+                for job_name in unsuccessful_jobs
+            )
+            or None,
+        )
+        record_job_run(dag_run)
+        return statuses
@@ -0,0 +1,90 @@
+import socket
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management import load_command_class
+from django.db import connection
+
+from howsmytrack.core.metrics import record_job_run
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import JobRunStatus
+from howsmytrack.core.models import Lease
+
+
+# Only used when falling back to lease rows; if a process dies while holding
+# a job lock, the job can run again once the lease expires.
+JOB_LEASE_DURATION = timedelta(hours=1)
+
+
+def advisory_lock_id(job_name):
+    # Postgres advisory locks are keyed by integers; crc32 gives a stable
+    # key per job name across processes.
+    return zlib.crc32(job_name.encode())
+
+
+@contextmanager
+def postgres_advisory_lock(job_name):
+    lock_id = advisory_lock_id(job_name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [lock_id])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+
+@contextmanager
+def lease_lock(job_name):
+    lease_name = f"job:{job_name}"
+    holder = Lease.default_holder()
+    acquired = Lease.acquire(lease_name, holder, JOB_LEASE_DURATION)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            Lease.release(lease_name, holder)
+
+
+def job_lock(job_name):
+    """Context manager yielding whether this process got the lock for
+    `job_name`; it never waits for another process to release it."""
+    if connection.vendor == "postgresql":
+        return postgres_advisory_lock(job_name)
+    # SQLite has no advisory locks, so use a lease row instead.
+    return lease_lock(job_name)
+
+
+def run_job(command_name, **options):
+    """
+    Run the management command `command_name` as a job, provided that it
+    isn't already running in another process, and record the run as a JobRun.
+
+    Commands can report how much work they did by setting `rows_processed`.
+    """
+    with job_lock(command_name) as acquired:
+        if not acquired:
+            print(f"Skipped: {command_name} is already running elsewhere.")
+            return None
+
+        job_run = JobRun(job_name=command_name, host=socket.gethostname())
+        job_run.save()
+
+        command = load_command_class("howsmytrack.core", command_name)
+        try:
+            call_command(command, **options)
+        except Exception as e:
+            job_run.finish(JobRunStatus.FAILED, error=repr(e))
+            record_job_run(job_run)
+            raise
+
+        job_run.finish(
+            JobRunStatus.SUCCEEDED,
+            rows_processed=getattr(command, "rows_processed", None),
+        )
+        record_job_run(job_run)
+        return job_run
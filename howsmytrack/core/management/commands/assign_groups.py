@@ -3,6 +3,10 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.template.loader import render_to_string
 
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.metrics import EMAIL_SEND_LATENCY
+from howsmytrack.core.metrics import update_queue_depths
 from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackRequest
 from howsmytrack.core.models import FeedbackResponse
@@ -95,13 +99,14 @@ class Command(BaseCommand):
                 },
             )
 
-        send_mail(
-            subject="your new feedback group",
-            message=message,
-            from_email=None,  # Use default in settings.py
-            recipient_list=[email],
-            html_message=html_message,
-        )
+        with EMAIL_SEND_LATENCY.labels(email="new_group").time():
+            send_mail(
+                subject="your new feedback group",
+                message=message,
+                from_email=None,  # Use default in settings.py
+                recipient_list=[email],
+                html_message=html_message,
+            )
 
     def send_emails_for_group(self, feedback_group):
         for feedback_request in feedback_group.feedback_requests.all():
@@ -326,6 +331,17 @@ class Command(BaseCommand):
         with transaction.atomic():
             feedback_groups = self.assign_groups()
 
+        grouped_feedback_requests = FeedbackRequest.objects.filter(
+            feedback_group__in=feedback_groups,
+        )
+        self.rows_processed = grouped_feedback_requests.count()
+
+        # Everyone who was grouped has new feedback responses to write.
+        for user_id in grouped_feedback_requests.values_list("user_id", flat=True):
+            bump_version(NOTIFICATIONS_CACHE, user_id)
+
+        update_queue_depths()
+
         # Send every member of the group an email with a link to the newly created group
         for feedback_group in feedback_groups:
             self.send_emails_for_group(feedback_group)
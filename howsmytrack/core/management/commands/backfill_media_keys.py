@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.validators import get_media_key
+
+
+class Command(BaseCommand):
+    """
+    Fill in `media_key` for requests made before it existed.
+
+    Requests are processed in batches by id, so the command can be stopped
+    and rerun at any point; only requests without a key are updated. If
+    several unassigned requests are for the same track, only the oldest is
+    given a key since only one can be pending per track. The others are
+    given theirs by a later run, once they've been assigned to groups.
+    """
+
+    help = "Backfill FeedbackRequest.media_key."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of requests to update per query.",
+        )
+
+    def get_pending_media_keys(self, media_keys):
+        return set(
+            FeedbackRequest.objects.filter(
+                feedback_group=None, media_key__in=media_keys,
+            ).values_list("media_key", flat=True)
+        )
+
+    def backfill_batch(self, feedback_requests):
+        for feedback_request in feedback_requests:
+            feedback_request.media_key = get_media_key(feedback_request.media_url)
+
+        unassigned_requests = [
+            feedback_request
+            for feedback_request in feedback_requests
+            if feedback_request.feedback_group_id is None
+        ]
+        pending_media_keys = self.get_pending_media_keys(
+            [feedback_request.media_key for feedback_request in unassigned_requests]
+        )
+        for feedback_request in unassigned_requests:
+            if feedback_request.media_key in pending_media_keys:
+                feedback_request.media_key = None
+            else:
+                pending_media_keys.add(feedback_request.media_key)
+
+        feedback_requests = [
+            feedback_request
+            for feedback_request in feedback_requests
+            if feedback_request.media_key
+        ]
+        FeedbackRequest.objects.bulk_update(feedback_requests, ["media_key"])
+        return len(feedback_requests)
+
+    def handle(self, *args, **options):
+        feedback_requests = (
+            FeedbackRequest.objects.filter(
+                media_url__isnull=False, media_key__isnull=True,
+            )
+            .only("id", "media_url", "feedback_group_id")
+            .order_by("id")
+        )
+
+        self.rows_processed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                feedback_requests.filter(id__gt=last_id)[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                self.rows_processed += self.backfill_batch(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfilled media keys for {self.rows_processed} requests."
+            )
+        )
@@ -0,0 +1,222 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from graphql_jwt.shortcuts import get_token
+
+from howsmytrack.core.asgi import HowsMyTrackASGIHandler
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+
+
+GROUP_SIZE = 4
+EMAIL_FORMAT = "benchmark-{}@howsmytrack.com"
+
+
+def get_percentile(latencies, percentile):
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+
+class Command(BaseCommand):
+    """
+    Compare the throughput and latency of GraphQL requests served through
+    the WSGI and ASGI handlers under concurrent `feedbackGroup` and
+    `userDetails` traffic.
+
+    Requests are made in-process, so this measures the handlers, middleware
+    and resolvers rather than a particular server. WSGI requests are made
+    from `--concurrency` threads, as with a threaded WSGI server; ASGI
+    requests are made from `--concurrency` tasks on one event loop, run in
+    a pool of `settings.ASGI_THREADS` threads.
+
+    Benchmark users and a group are created before the run and deleted
+    afterwards, so this can only be run locally.
+    """
+
+    help = "Benchmark GraphQL requests over WSGI and ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests to make through each handler.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Number of requests in flight at once.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG:
+            raise CommandError("Benchmarks can only be run locally.")
+
+        feedback_group, tokens = self.create_group()
+        try:
+            requests = list(
+                itertools.islice(
+                    itertools.cycle(self.get_requests(feedback_group, tokens)),
+                    options["requests"],
+                )
+            )
+
+            self.stdout.write(
+                f"{len(requests)} requests, concurrency {options['concurrency']}, "
+                f"{settings.ASGI_THREADS} ASGI threads"
+            )
+            for name, benchmark in (
+                ("WSGI", self.benchmark_wsgi),
+                ("ASGI", self.benchmark_asgi),
+            ):
+                start = time.perf_counter()
+                results = benchmark(requests, options["concurrency"])
+                duration = time.perf_counter() - start
+                self.report(name, results, duration)
+        finally:
+            User.objects.filter(
+                username__in=[EMAIL_FORMAT.format(i) for i in range(GROUP_SIZE)]
+            ).delete()
+            feedback_group.delete()
+
+    def create_group(self):
+        feedback_group = FeedbackGroup(name="benchmark")
+        feedback_group.save()
+
+        tokens = []
+        feedback_requests = []
+        for i in range(GROUP_SIZE):
+            feedback_groups_user = FeedbackGroupsUser.create(
+                email=EMAIL_FORMAT.format(i), password="password",
+            )
+            feedback_groups_user.save()
+            feedback_request = FeedbackRequest(
+                user=feedback_groups_user,
+                media_url=f"https://soundcloud.com/ruairidx/benchmark-{i}",
+                media_type=MediaTypeChoice.SOUNDCLOUD.name,
+                feedback_group=feedback_group,
+                genre=GenreChoice.NO_GENRE.name,
+            )
+            feedback_request.save()
+            feedback_requests.append(feedback_request)
+            tokens.append(get_token(feedback_groups_user.user))
+
+        for feedback_request in feedback_requests:
+            for feedback_groups_user in FeedbackGroupsUser.objects.filter(
+                feedback_requests__feedback_group=feedback_group
+            ).exclude(id=feedback_request.user_id):
+                FeedbackResponse(
+                    feedback_request=feedback_request,
+                    user=feedback_groups_user,
+                    feedback="benchmark",
+                    submitted=True,
+                    allow_replies=True,
+                ).save()
+
+        return feedback_group, tokens
+
+    def get_requests(self, feedback_group, tokens):
+        queries = [
+            "{ userDetails { username rating notifications } }",
+            "{ feedbackGroup(feedbackGroupId: %d) {"
+            " id name mediaUrl feedbackResponses { id feedback }"
+            " userFeedbackResponses { id feedback rating } } }" % feedback_group.id,
+        ]
+        return [
+            (urlencode({"query": query}), f"JWT={token}")
+            for token in tokens
+            for query in queries
+        ]
+
+    def benchmark_wsgi(self, requests, concurrency):
+        application = WSGIHandler()
+
+        def make_request(request):
+            query_string, cookie = request
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": "/graphql/",
+                "QUERY_STRING": query_string,
+                "HTTP_HOST": "localhost",
+                "HTTP_COOKIE": cookie,
+            }
+            setup_testing_defaults(environ)
+            statuses = []
+
+            start = time.perf_counter()
+            response = application(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            b"".join(response)
+            response.close()
+            return statuses[0].startswith("200"), time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(make_request, requests))
+
+    def benchmark_asgi(self, requests, concurrency):
+        application = HowsMyTrackASGIHandler()
+
+        async def make_request(request):
+            query_string, cookie = request
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            start = time.perf_counter()
+            await application(
+                {
+                    "type": "http",
+                    "method": "GET",
+                    "path": "/graphql/",
+                    "query_string": query_string.encode(),
+                    "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode()),],
+                },
+                receive,
+                send,
+            )
+            return messages[0]["status"] == 200, time.perf_counter() - start
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def make_limited_request(request):
+                async with semaphore:
+                    return await make_request(request)
+
+            return await asyncio.gather(
+                *[make_limited_request(request) for request in requests]
+            )
+
+        try:
+            return asyncio.run(run())
+        finally:
+            application.executor.shutdown()
+
+    def report(self, name, results, duration):
+        latencies = [latency for _, latency in results]
+        failures = sum(1 for succeeded, _ in results if not succeeded)
+        self.stdout.write(
+            f"{name}: {len(results) / duration:.1f} requests/s, "
+            f"p50 {get_percentile(latencies, 0.5) * 1000:.1f}ms, "
+            f"p99 {get_percentile(latencies, 0.99) * 1000:.1f}ms, "
+            f"{failures} failed"
+        )
@@ -48,6 +48,7 @@ class Command(BaseCommand):
         all_users = FeedbackGroupsUser.objects.all()
         for user in all_users:
             self.calculate_rating(user)
+        self.rows_processed = len(all_users)
 
         self.stdout.write(
             self.style.SUCCESS(f"Updated ratings for {len(all_users)} users.")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from howsmytrack.core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """
+    Delete idempotency keys and their stored responses once they've expired;
+    run every hour via jobs.py.
+    """
+
+    help = "Delete expired idempotency keys."
+
+    def add_arguments(self, parser):
+        pass
+
+    def handle(self, *args, **options):
+        self.rows_processed, _ = IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {self.rows_processed} expired idempotency keys."
+            )
+        )
@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from howsmytrack.core.models import DailyStats
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.stats import filter_date_range
+
+
+def count_by_date(queryset, field, start_date):
+    return (
+        filter_date_range(queryset, field, start_date=start_date)
+        .annotate(date=TruncDate(field))
+        .values("date")
+        .annotate(count=Count("id"))
+        .values_list("date", "count")
+    )
+
+
+class Command(BaseCommand):
+    """
+    Roll activity up into one DailyStats row per day.
+
+    Only days from the most recent rollup onwards are recomputed (the most
+    recent day is included since it may have been rolled up before it was
+    over), so the cost of a run depends on recent activity rather than the
+    total size of the DB. Pass --backfill to recompute every day from scratch.
+    """
+
+    help = "Roll up usage stats into DailyStats rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Recompute stats for every day instead of just the days since the last rollup.",
+        )
+
+    def get_counts_by_metric(self, start_date):
+        return {
+            "feedback_requests": count_by_date(
+                FeedbackRequest.objects.all(), "time_created", start_date
+            ),
+            "signups": count_by_date(
+                FeedbackGroupsUser.objects.all(), "user__date_joined", start_date
+            ),
+            "feedback_groups": count_by_date(
+                FeedbackGroup.objects.all(), "time_created", start_date
+            ),
+            "feedback_responses": count_by_date(
+                FeedbackResponse.objects.all(),
+                "feedback_request__feedback_group__time_created",
+                start_date,
+            ),
+            "submissions": count_by_date(
+                FeedbackResponse.objects.filter(submitted=True),
+                "time_submitted",
+                start_date,
+            ),
+            "ratings": count_by_date(
+                FeedbackResponse.objects.filter(rating__isnull=False),
+                "time_rated",
+                start_date,
+            ),
+            "replies": count_by_date(
+                FeedbackResponseReply.objects.all(), "time_created", start_date
+            ),
+        }
+
+    def get_start_date(self, backfill):
+        if backfill:
+            return None
+
+        # If nothing has been rolled up yet, every day needs computing.
+        latest_daily_stats = DailyStats.objects.order_by("-date").first()
+        if not latest_daily_stats:
+            return None
+        return latest_daily_stats.date
+
+    def handle(self, *args, **options):
+        start_date = self.get_start_date(options["backfill"])
+
+        stats_by_date = defaultdict(dict)
+        for metric, counts in self.get_counts_by_metric(start_date).items():
+            for date, count in counts:
+                if date:
+                    stats_by_date[date][metric] = count
+
+        with transaction.atomic():
+            daily_stats_to_replace = DailyStats.objects.all()
+            if start_date:
+                daily_stats_to_replace = daily_stats_to_replace.filter(
+                    date__gte=start_date
+                )
+            daily_stats_to_replace.delete()
+
+            DailyStats.objects.bulk_create(
+                [
+                    DailyStats(date=date, **stats)
+                    for date, stats in sorted(stats_by_date.items())
+                ]
+            )
+
+        self.rows_processed = len(stats_by_date)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rolled up stats for {len(stats_by_date)} days.")
+        )
@@ -0,0 +1,69 @@
+import signal
+import sys
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from howsmytrack.core.models import Lease
+from howsmytrack.jobs import pause_scheduler
+from howsmytrack.jobs import shutdown_scheduler
+from howsmytrack.jobs import start_scheduler
+
+
+SCHEDULER_LEASE_NAME = "scheduler"
+SCHEDULER_LEASE_DURATION = timedelta(seconds=60)
+# Renew the lease well before it expires so that a slow DB doesn't
+# cause the leader to lose it.
+HEARTBEAT_INTERVAL = timedelta(seconds=20)
+
+
+def exit_on_sigterm(signum, frame):
+    # Heroku sends SIGTERM when restarting dynos; exiting cleanly lets
+    # us release the lease rather than waiting for it to expire.
+    sys.exit(0)
+
+
+class Command(BaseCommand):
+    """
+    Run scheduled jobs; intended to be run as the `clock` process in the Procfile.
+
+    Any number of these processes can run at once, but only the one holding
+    the scheduler lease actually runs jobs. The rest wait for the lease
+    to expire and take over if the leader goes away.
+    """
+
+    help = "Run the job scheduler while holding the scheduler lease."
+
+    def add_arguments(self, parser):
+        pass
+
+    def heartbeat(self, holder, is_leader):
+        acquired = Lease.acquire(SCHEDULER_LEASE_NAME, holder, SCHEDULER_LEASE_DURATION)
+        if acquired and not is_leader:
+            self.stdout.write(f"{holder} acquired the scheduler lease.")
+            start_scheduler()
+        elif not acquired and is_leader:
+            self.stdout.write(f"{holder} lost the scheduler lease.")
+            pause_scheduler()
+        return acquired
+
+    def handle(self, *args, **options):
+        signal.signal(signal.SIGTERM, exit_on_sigterm)
+        if settings.CLOCK_METRICS_PORT:
+            start_http_server(settings.CLOCK_METRICS_PORT)
+
+        holder = Lease.default_holder()
+        is_leader = False
+        try:
+            while True:
+                is_leader = self.heartbeat(holder, is_leader)
+                time.sleep(HEARTBEAT_INTERVAL.total_seconds())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            shutdown_scheduler()
+            Lease.release(SCHEDULER_LEASE_NAME, holder)
+            self.stdout.write(f"{holder} stopped.")
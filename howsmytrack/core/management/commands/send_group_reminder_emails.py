@@ -5,8 +5,10 @@ from django.core.management.base import BaseCommand
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from howsmytrack.core.metrics import EMAIL_SEND_LATENCY
 from howsmytrack.core.models import FeedbackRequest
 from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.routers import read_from_replica
 
 
 MIN_GROUP_AGE = timedelta(hours=20)
@@ -73,34 +75,45 @@ class Command(BaseCommand):
                 },
             )
 
-        send_mail(
-            subject="don't forget your feedback group!",
-            message=message,
-            from_email=None,  # Use default in settings.py
-            recipient_list=[feedback_request.user.email],
-            html_message=html_message,
-        )
+        with EMAIL_SEND_LATENCY.labels(email="group_reminder").time():
+            send_mail(
+                subject="don't forget your feedback group!",
+                message=message,
+                from_email=None,  # Use default in settings.py
+                recipient_list=[feedback_request.user.email],
+                html_message=html_message,
+            )
 
         feedback_request.reminder_email_sent = True
         feedback_request.save()
 
     def handle(self, *args, **options):
         max_group_time_created = timezone.now() - MIN_GROUP_AGE
-        unreminded_feedback_requests = FeedbackRequest.objects.filter(
-            feedback_group__isnull=False,
-            feedback_group__time_created__lt=max_group_time_created,
-            email_when_grouped=True,
-            reminder_email_sent=False,
-            # Don't send reminder emails to users who have disabled them.
-            user__send_reminder_emails=True,
-        ).all()
+        with read_from_replica():
+            unreminded_feedback_requests = FeedbackRequest.objects.filter(
+                feedback_group__isnull=False,
+                feedback_group__time_created__lt=max_group_time_created,
+                email_when_grouped=True,
+                reminder_email_sent=False,
+                # Don't send reminder emails to users who have disabled them.
+                user__send_reminder_emails=True,
+            ).all()
+            # Only send reminder for users who have unsubmitted responses for
+            # the group. Find them all before sending anything, since the
+            # first write would send the remaining reads to the primary.
+            feedback_requests_to_remind = [
+                feedback_request
+                for feedback_request in unreminded_feedback_requests
+                if FeedbackResponse.objects.filter(
+                    feedback_request__feedback_group_id=(
+                        feedback_request.feedback_group_id
+                    ),
+                    user_id=feedback_request.user_id,
+                    submitted=False,
+                ).exists()
+            ]
 
-        for feedback_request in unreminded_feedback_requests:
-            # Only send reminder for users who have unsubmitted responses for the group.
-            incomplete_responses_for_user = FeedbackResponse.objects.filter(
-                feedback_request__feedback_group=feedback_request.feedback_group,
-                user=feedback_request.user,
-                submitted=False,
-            ).count()
-            if incomplete_responses_for_user > 0:
-                self.send_reminder_email_for_request(feedback_request)
+        self.rows_processed = 0
+        for feedback_request in feedback_requests_to_remind:
+            self.send_reminder_email_for_request(feedback_request)
+            self.rows_processed += 1
@@ -0,0 +1,132 @@
+import os
+
+from django.db.models import Count
+from django.db.models import Q
+from prometheus_client import CollectorRegistry
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+from prometheus_client import multiprocess
+from prometheus_client import REGISTRY
+
+from howsmytrack.core.models import FeedbackRequest
+
+
+# When set, every process (e.g. each gunicorn worker) writes its metrics to
+# mmapped files in this directory, which are aggregated when scraped. It must
+# be set before prometheus_client is imported; see gunicorn.conf.py.
+MULTIPROCESS_DIR_ENV_VAR = "prometheus_multiproc_dir"
+
+GRAPHQL_OPERATION_LATENCY = Histogram(
+    "howsmytrack_graphql_operation_seconds",
+    "Time taken to execute GraphQL operations.",
+    ["operation"],
+)
+GRAPHQL_OPERATION_QUERIES = Histogram(
+    "howsmytrack_graphql_operation_db_queries",
+    "Number of DB queries run by GraphQL operations.",
+    ["operation"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, float("inf")),
+)
+GRAPHQL_RESOLVER_ERRORS = Counter(
+    "howsmytrack_graphql_resolver_errors",
+    "Number of errors raised by GraphQL resolvers.",
+    ["field"],
+)
+RATE_LIMITED_REQUESTS = Counter(
+    "howsmytrack_rate_limited_requests",
+    "Number of GraphQL root fields refused by rate limits.",
+    ["field"],
+)
+JOB_DURATION = Histogram(
+    "howsmytrack_job_duration_seconds",
+    "Time taken to run scheduled jobs.",
+    ["job", "status"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, float("inf")),
+)
+EMAIL_SEND_LATENCY = Histogram(
+    "howsmytrack_email_send_seconds", "Time taken to send emails.", ["email"],
+)
+CACHE_REQUESTS = Counter(
+    "howsmytrack_cache_requests",
+    "Number of cache lookups, by whether they hit or missed.",
+    ["cache", "result"],
+)
+# Only set by the clock process; see update_queue_depths.
+UNASSIGNED_FEEDBACK_REQUESTS = Gauge(
+    "howsmytrack_unassigned_feedback_requests",
+    "Number of feedback requests waiting to be assigned to a group.",
+    ["has_track"],
+)
+
+
+def get_operation_name(root_fields):
+    """
+    Operation names are chosen by clients, so label operations by the root
+    fields they resolved instead; these are limited by the schema.
+    """
+    return ",".join(sorted(set(root_fields))) or "none"
+
+
+def record_graphql_operation(root_fields, duration, query_count, result):
+    operation = get_operation_name(root_fields)
+    GRAPHQL_OPERATION_LATENCY.labels(operation=operation).observe(duration)
+    GRAPHQL_OPERATION_QUERIES.labels(operation=operation).observe(query_count)
+
+    for error in result.errors or []:
+        # Errors without a path happened before execution e.g. syntax errors.
+        path = getattr(error, "path", None)
+        if path:
+            field = [key for key in path if isinstance(key, str)][-1]
+            GRAPHQL_RESOLVER_ERRORS.labels(field=field).inc()
+
+
+def record_job_run(job_run):
+    JOB_DURATION.labels(job=job_run.job_name, status=job_run.status).observe(
+        job_run.duration.total_seconds()
+    )
+
+
+def update_queue_depths():
+    """
+    Count unassigned feedback requests. Run by the clock process every minute
+    and after grouping, rather than by mutations or when metrics are scraped.
+    """
+    depths = FeedbackRequest.objects.filter(feedback_group=None).aggregate(
+        with_track=Count("id", filter=Q(media_url__isnull=False)),
+        without_track=Count("id", filter=Q(media_url__isnull=True)),
+    )
+    UNASSIGNED_FEEDBACK_REQUESTS.labels(has_track="true").set(depths["with_track"])
+    UNASSIGNED_FEEDBACK_REQUESTS.labels(has_track="false").set(depths["without_track"])
+
+
+def get_registry():
+    if MULTIPROCESS_DIR_ENV_VAR not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class QueryCounter:
+    """Counts the SQL queries run through the connection while installed as an
+    execute wrapper."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsGraphQLMiddleware:
+    """Note which root fields are resolved by each request, so that operations
+    can be labelled by them."""
+
+    def resolve(self, next, root, info, **args):
+        root_fields = getattr(info.context, "graphql_root_fields", None)
+        if root_fields is not None and len(info.path) == 1:
+            root_fields.append(info.field_name)
+        return next(root, info, **args)
@@ -0,0 +1,48 @@
+# Generated by Django 3.0.7 on 2026-10-19 10:58
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_time_rated(apps, schema_editor):
+    # Ratings weren't timestamped before this migration; the submission
+    # time is the closest approximation we have.
+    FeedbackResponse = apps.get_model('core', 'FeedbackResponse')
+    FeedbackResponse.objects.filter(
+        rating__isnull=False, time_rated__isnull=True,
+    ).update(time_rated=F('time_submitted'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_feedbackgroupsuser_send_reminder_emails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('feedback_requests', models.PositiveIntegerField(default=0)),
+                ('signups', models.PositiveIntegerField(default=0)),
+                ('feedback_groups', models.PositiveIntegerField(default=0)),
+                ('feedback_responses', models.PositiveIntegerField(default=0)),
+                ('submissions', models.PositiveIntegerField(default=0)),
+                ('ratings', models.PositiveIntegerField(default=0)),
+                ('replies', models.PositiveIntegerField(default=0)),
+                ('time_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'DailyStats',
+                'verbose_name_plural': 'DailyStats',
+            },
+        ),
+        migrations.AddField(
+            model_name='feedbackresponse',
+            name='time_rated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_time_rated, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_name', models.CharField(max_length=64)),
+                ('host', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed')], default='RUNNING', max_length=32)),
+                ('time_started', models.DateTimeField(auto_now_add=True)),
+                ('time_finished', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('rows_processed', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'JobRun',
+                'verbose_name_plural': 'JobRuns',
+            },
+        ),
+    ]
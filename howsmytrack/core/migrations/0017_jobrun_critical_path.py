@@ -0,0 +1,23 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_jobrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobrun',
+            name='critical_path',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='jobrun',
+            name='status',
+            field=models.CharField(choices=[('RUNNING', 'Running'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed'), ('SKIPPED', 'Skipped'), ('TIMED_OUT', 'Timed Out')], default='RUNNING', max_length=32),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_jobrun_critical_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedbackrequest',
+            index=models.Index(condition=models.Q(feedback_group__isnull=True), fields=['user'], name='unassigned_request_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackrequest',
+            index=models.Index(condition=models.Q(feedback_group__isnull=True), fields=['media_url'], name='unassigned_request_media_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackresponse',
+            index=models.Index(fields=['user', 'submitted'], name='response_user_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackresponsereply',
+            index=models.Index(condition=models.Q(time_read__isnull=True), fields=['feedback_response', 'user'], name='unread_reply_response_idx'),
+        ),
+    ]
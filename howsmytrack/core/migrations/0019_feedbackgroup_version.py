@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackgroup',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
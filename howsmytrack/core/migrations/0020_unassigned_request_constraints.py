@@ -0,0 +1,57 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_unassigned_request_users(apps, schema_editor):
+    # Users could previously end up with more than one unassigned request if
+    # two were created at once. There's no way to choose which to keep, so
+    # fail with a clear message rather than at the unique constraint.
+    FeedbackRequest = apps.get_model('core', 'FeedbackRequest')
+    user_ids = list(
+        FeedbackRequest.objects.using(schema_editor.connection.alias)
+        .filter(feedback_group__isnull=True)
+        .values('user')
+        .annotate(unassigned_requests=Count('id'))
+        .filter(unassigned_requests__gt=1)
+        .values_list('user', flat=True)
+    )
+    if user_ids:
+        raise RuntimeError(
+            f'FeedbackGroupsUsers {user_ids} have more than one unassigned '
+            'feedback request. Delete all but one of each of their unassigned '
+            'requests, then migrate again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_feedbackgroup_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedbackrequest',
+            name='unassigned_request_user_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='feedbackrequest',
+            name='unassigned_request_media_idx',
+        ),
+        migrations.AddField(
+            model_name='feedbackrequest',
+            name='media_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(check_unassigned_request_users, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='feedbackrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(feedback_group__isnull=True), fields=('user',), name='unassigned_request_user_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(feedback_group__isnull=True), fields=('media_key',), name='unassigned_request_media_unique'),
+        ),
+    ]
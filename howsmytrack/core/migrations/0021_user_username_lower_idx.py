@@ -0,0 +1,21 @@
+# Generated by Django 3.0.7 on 2026-10-19 11:55
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0020_unassigned_request_constraints'),
+    ]
+
+    # Django 3.0 can't declare expression indexes, so this is created by
+    # hand for `auth.get_users_by_email`'s `LOWER(username)` lookups.
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_username_lower_idx ON auth_user (LOWER(username));',
+            'DROP INDEX auth_user_username_lower_idx;',
+        ),
+    ]
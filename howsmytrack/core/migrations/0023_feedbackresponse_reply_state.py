@@ -0,0 +1,50 @@
+# Generated by Django 3.0.7 on 2026-10-19 12:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+
+def backfill_reply_state(apps, schema_editor):
+    # Only responses with replies need updating, a batch of ids at a time.
+    FeedbackResponse = apps.get_model('core', 'FeedbackResponse')
+    FeedbackResponseReply = apps.get_model('core', 'FeedbackResponseReply')
+    db_alias = schema_editor.connection.alias
+    responses_with_replies = FeedbackResponse.objects.using(db_alias).filter(
+        replies__isnull=False,
+    ).distinct().order_by('id').values_list('id', flat=True)
+    last_reply_at = FeedbackResponseReply.objects.using(db_alias).filter(
+        feedback_response=OuterRef('id'),
+    ).order_by('-time_created').values('time_created')[:1]
+
+    last_id = 0
+    while True:
+        ids = list(responses_with_replies.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not ids:
+            break
+        batch = FeedbackResponse.objects.using(db_alias).filter(id__in=ids)
+        batch.update(last_reply_at=Subquery(last_reply_at))
+        batch.filter(replies__allow_replies=False).update(replies_closed=True)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackresponse',
+            name='last_reply_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feedbackresponse',
+            name='replies_closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_reply_state, migrations.RunPython.noop),
+    ]
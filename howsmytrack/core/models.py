@@ -1,9 +1,16 @@
+import os
+import socket
+import uuid
 from enum import Enum
 
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator
 from django.core.validators import MinValueValidator
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
 
 MAX_DISPLAY_STRING_LENGTH = 50
@@ -56,6 +63,27 @@ class FeedbackGroupsUser(models.Model):
 class FeedbackGroup(models.Model):
     name = models.CharField(max_length=255)
     time_created = models.DateTimeField(auto_now_add=True, blank=True, null=True,)
+    # Incremented whenever anything shown on the group page changes, so that
+    # cached snapshots of the page can be checked for staleness cheaply.
+    version = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def bump_version(cls, feedback_group_id):
+        cls.bump_versions([feedback_group_id])
+
+    @classmethod
+    def bump_versions(cls, feedback_group_ids):
+        cls.objects.filter(id__in=feedback_group_ids).update(
+            version=models.F("version") + 1
+        )
+
+    @classmethod
+    def bump_version_for_response(cls, feedback_response_id):
+        """Bump the version of the group a response belongs to, without
+        having to load the response first."""
+        cls.objects.filter(
+            feedback_requests__feedback_responses__id=feedback_response_id
+        ).update(version=models.F("version") + 1)
 
     def __str__(self):
         return f"{self.name} ({self.time_created})"
@@ -103,6 +131,9 @@ class FeedbackRequest(models.Model):
         blank=True,
         null=True,
     )
+    # `validators.get_media_key(media_url)`, so that different links to the
+    # same track can be found and count as duplicates.
+    media_key = models.CharField(max_length=64, blank=True, null=True, db_index=True,)
     media_type = models.CharField(
         max_length=32,
         choices=[(tag.name, tag.value) for tag in MediaTypeChoice],
@@ -136,6 +167,22 @@ class FeedbackRequest(models.Model):
     class Meta:
         verbose_name = "FeedbackRequest"
         verbose_name_plural = "FeedbackRequests"
+        constraints = [
+            # Users can only have one unassigned request at a time, and only
+            # one unassigned request can be made for each track. This
+            # prevents users creating multiple accounts to request the same
+            # track.
+            models.UniqueConstraint(
+                fields=["user"],
+                name="unassigned_request_user_unique",
+                condition=Q(feedback_group__isnull=True),
+            ),
+            models.UniqueConstraint(
+                fields=["media_key"],
+                name="unassigned_request_media_unique",
+                condition=Q(feedback_group__isnull=True),
+            ),
+        ]
 
 
 class FeedbackResponse(models.Model):
@@ -164,6 +211,11 @@ class FeedbackResponse(models.Model):
     rating = models.PositiveIntegerField(
         blank=True, null=True, validators=[MinValueValidator(1), MaxValueValidator(5)]
     )
+    time_rated = models.DateTimeField(blank=True, null=True,)
+    # Kept up to date by FeedbackResponseReply.save. Replies are closed once
+    # either user has replied with allow_replies=False.
+    replies_closed = models.BooleanField(default=False)
+    last_reply_at = models.DateTimeField(blank=True, null=True,)
 
     @property
     def ordered_replies(self):
@@ -171,12 +223,7 @@ class FeedbackResponse(models.Model):
 
     @property
     def allow_further_replies(self):
-        return (
-            FeedbackResponseReply.objects.filter(
-                feedback_response=self, allow_replies=False,
-            ).count()
-            == 0
-        )
+        return not self.replies_closed
 
     def __str__(self):
         return f'{self.user} responded: "{truncate_string(self.feedback)}" to {self.feedback_request}'
@@ -184,6 +231,11 @@ class FeedbackResponse(models.Model):
     class Meta:
         verbose_name = "FeedbackResponse"
         verbose_name_plural = "FeedbackResponses"
+        indexes = [
+            models.Index(
+                fields=["user", "submitted"], name="response_user_submitted_idx",
+            ),
+        ]
 
 
 class FeedbackResponseReply(models.Model):
@@ -206,9 +258,267 @@ class FeedbackResponseReply(models.Model):
     time_created = models.DateTimeField(auto_now_add=True)
     time_read = models.DateTimeField(blank=True, null=True,)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        # No savepoint; if this is already in a transaction, the reply and
+        # its response's state are committed or rolled back with it.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            response_state = {}
+            if adding:
+                response_state["last_reply_at"] = self.time_created
+            if not self.allow_replies:
+                response_state["replies_closed"] = True
+            if response_state:
+                FeedbackResponse.objects.filter(id=self.feedback_response_id).update(
+                    **response_state
+                )
+
     def __str__(self):
         return f'{self.user} replied: "{truncate_string(self.text)}"'
 
     class Meta:
         verbose_name = "FeedbackResponseReply"
         verbose_name_plural = "FeedbackResponseReplies"
+        indexes = [
+            # Unread replies are counted for every user on every page load.
+            models.Index(
+                fields=["feedback_response", "user"],
+                name="unread_reply_response_idx",
+                condition=Q(time_read__isnull=True),
+            ),
+        ]
+
+
+class DailyStats(models.Model):
+    """
+    Activity counts for a single (UTC) day, rolled up by `rollup_daily_stats`
+    so that stats reports don't need to scan every row ever created.
+
+    Each count is attributed to the day the activity happened, so rows for
+    past days never change once that day is over.
+    """
+
+    date = models.DateField(unique=True)
+    feedback_requests = models.PositiveIntegerField(default=0)
+    signups = models.PositiveIntegerField(default=0)
+    feedback_groups = models.PositiveIntegerField(default=0)
+    # Blank responses created when requests are assigned to groups.
+    feedback_responses = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+    ratings = models.PositiveIntegerField(default=0)
+    replies = models.PositiveIntegerField(default=0)
+    time_updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.date}"
+
+    class Meta:
+        verbose_name = "DailyStats"
+        verbose_name_plural = "DailyStats"
+
+
+class Lease(models.Model):
+    """
+    A named, time-limited claim held by a single process, used to make sure
+    only one process across every dyno does a particular thing (e.g. run the
+    scheduler) at a time.
+
+    The holder must keep renewing the lease with `acquire` before it expires;
+    if the holder dies, another process can take over once it has expired.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    holder = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+
+    @staticmethod
+    def default_holder():
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @classmethod
+    def acquire(cls, name, holder, duration):
+        """Acquire or renew the lease `name` for `duration`, returning
+        True if `holder` now holds it."""
+        now = timezone.now()
+        expires_at = now + duration
+
+        # A single conditional UPDATE, so two processes can't both take
+        # over the same expired lease.
+        renewed = (
+            cls.objects.filter(name=name)
+            .filter(Q(holder=holder) | Q(expires_at__lt=now))
+            .update(holder=holder, expires_at=expires_at)
+        )
+        if renewed:
+            return True
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, holder=holder, expires_at=expires_at)
+        except IntegrityError:
+            # Somebody else holds the lease.
+            return False
+        return True
+
+    @classmethod
+    def release(cls, name, holder):
+        cls.objects.filter(name=name, holder=holder).delete()
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder} until {self.expires_at}"
+
+    class Meta:
+        verbose_name = "Lease"
+        verbose_name_plural = "Leases"
+
+
+class IdempotencyKey(models.Model):
+    """
+    A key sent by a client in the `Idempotency-Key` header of a mutation, and
+    the response to the first request made with it. Retries made with the
+    same key are given the stored response rather than running the mutation
+    again.
+
+    Keys are unique per user and expire after `settings.IDEMPOTENCY_KEY_TTL`;
+    expired keys are deleted by `delete_expired_idempotency_keys`.
+    """
+
+    user = models.ForeignKey(
+        User, related_name="idempotency_keys", on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    # A hash of the request body, so that a key can't be reused for a
+    # different request.
+    request_hash = models.CharField(max_length=64)
+    # Both unset while the first request is still in progress.
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True,)
+    response = models.TextField(blank=True, null=True,)
+    # When the request in progress claimed the key.
+    claimed_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    @classmethod
+    def claim(cls, user, key, request_hash, ttl, lease):
+        """
+        Claim `key` for a new request, returning (claimed, idempotency_key).
+        If the key has already been claimed and hasn't expired, the existing
+        claim is returned instead.
+
+        A request that dies without storing its response or releasing the
+        key (e.g. because its worker was killed) leaves it in progress, so
+        a retry of the same request can take it over once it has been in
+        progress for longer than `lease`.
+        """
+        now = timezone.now()
+        idempotency_key = cls.objects.filter(user=user, key=key).first()
+        if idempotency_key:
+            if idempotency_key.expires_at <= now:
+                # Not yet deleted by the sweep.
+                idempotency_key.delete()
+            elif (
+                idempotency_key.status_code is None
+                and idempotency_key.request_hash == request_hash
+                and idempotency_key.claimed_at <= now - lease
+            ):
+                # A single conditional UPDATE, so two retries can't both
+                # take over the same claim.
+                taken_over = cls.objects.filter(
+                    id=idempotency_key.id,
+                    status_code=None,
+                    claimed_at=idempotency_key.claimed_at,
+                ).update(claimed_at=now)
+                if taken_over:
+                    idempotency_key.claimed_at = now
+                return bool(taken_over), idempotency_key
+            else:
+                return False, idempotency_key
+
+        try:
+            with transaction.atomic():
+                return (
+                    True,
+                    cls.objects.create(
+                        user=user,
+                        key=key,
+                        request_hash=request_hash,
+                        claimed_at=now,
+                        expires_at=now + ttl,
+                    ),
+                )
+        except IntegrityError:
+            # A concurrent request with the same key claimed it first.
+            return False, cls.objects.get(user=user, key=key)
+
+    def get_claim(self):
+        # The key as claimed by this request; once another request has taken
+        # it over, this request can no longer store a response or release it.
+        return type(self).objects.filter(
+            id=self.id, status_code=None, claimed_at=self.claimed_at
+        )
+
+    def store_response(self, status_code, response):
+        self.status_code = status_code
+        self.response = response
+        self.get_claim().update(status_code=status_code, response=response)
+
+    def release(self):
+        """Give up the claim, so that the request can be retried."""
+        self.get_claim().delete()
+
+    def __str__(self):
+        return f"{self.user}'s idempotency key {truncate_string(self.key)}"
+
+    class Meta:
+        verbose_name = "IdempotencyKey"
+        verbose_name_plural = "IdempotencyKeys"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="idempotency_key_user_key_unique",
+            ),
+        ]
+
+
+class JobRunStatus(Enum):
+    RUNNING = "Running"
+    SUCCEEDED = "Succeeded"
+    FAILED = "Failed"
+    SKIPPED = "Skipped"
+    TIMED_OUT = "Timed Out"
+
+
+class JobRun(models.Model):
+    """
+    A record of a single run of a scheduled job, used to see how long
+    jobs take and whether they're failing.
+    """
+
+    job_name = models.CharField(max_length=64)
+    host = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=32,
+        choices=[(tag.name, tag.value) for tag in JobRunStatus],
+        default=JobRunStatus.RUNNING.name,
+    )
+    time_started = models.DateTimeField(auto_now_add=True)
+    time_finished = models.DateTimeField(blank=True, null=True,)
+    duration = models.DurationField(blank=True, null=True,)
+    rows_processed = models.PositiveIntegerField(blank=True, null=True,)
+    error = models.TextField(blank=True, null=True,)
+    # Only set for runs of a JobDag; the chain of jobs that took the longest.
+    critical_path = models.TextField(blank=True, null=True,)
+
+    def finish(self, status, rows_processed=None, error=None):
+        self.time_finished = timezone.now()
+        self.duration = self.time_finished - self.time_started
+        self.status = status.name
+        self.rows_processed = rows_processed
+        self.error = error
+        self.save()
+
+    def __str__(self):
+        return f"{self.job_name} on {self.host} ({self.time_started})"
+
+    class Meta:
+        verbose_name = "JobRun"
+        verbose_name_plural = "JobRuns"
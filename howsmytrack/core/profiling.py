@@ -0,0 +1,147 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# List indices in resolver paths (e.g. `feedbackGroups.3.feedbackResponses`)
+# are dropped so that queries are totalled per field rather than per item.
+LIST_INDEX_PATTERN = re.compile(r"\.\d+(?=\.|$)")
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+@contextmanager
+def execute_wrapper_for_all(wrapper):
+    """Install an execute wrapper on the connection to every database (e.g.
+    the primary and replica) rather than just the default one."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+class QueryProfile:
+    """
+    Records every SQL query run through the connection while installed as an
+    execute wrapper, totalling them per GraphQL resolver path.
+    """
+
+    def __init__(self, max_slowest_queries):
+        self.max_slowest_queries = max_slowest_queries
+        self.query_count = 0
+        self.total_time = 0
+        # (duration, sql) tuples, slowest first.
+        self.slowest_queries = []
+        self.resolvers = defaultdict(lambda: {"queries": 0, "time": 0})
+        # Set by SQLProfilerGraphQLMiddleware while a resolver is running.
+        self.resolver_path = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - start)
+
+    def record(self, sql, duration):
+        self.query_count += 1
+        self.total_time += duration
+
+        self.slowest_queries.append((duration, sql))
+        self.slowest_queries.sort(key=lambda query: -query[0])
+        del self.slowest_queries[self.max_slowest_queries :]
+
+        if self.resolver_path:
+            self.resolvers[self.resolver_path]["queries"] += 1
+            self.resolvers[self.resolver_path]["time"] += duration
+
+    def as_dict(self):
+        return {
+            "queries": self.query_count,
+            "timeMs": to_ms(self.total_time),
+            "slowestQueries": [
+                {"sql": sql, "timeMs": to_ms(duration)}
+                for duration, sql in self.slowest_queries
+            ],
+            "resolvers": {
+                path: {"queries": totals["queries"], "timeMs": to_ms(totals["time"])}
+                for path, totals in self.resolvers.items()
+            },
+        }
+
+
+class SQLProfilerMiddleware:
+    """
+    Profile the SQL run by a sample of requests (see SQL_PROFILER in settings),
+    logging the profile of any request that exceeds the configured thresholds.
+
+    The profile is stored on the request as `sql_profile`, so that views can
+    include it in their responses.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = settings.SQL_PROFILER
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        profile = QueryProfile(max_slowest_queries=config["SLOWEST_QUERIES"])
+        request.sql_profile = profile
+
+        start = time.perf_counter()
+        with execute_wrapper_for_all(profile):
+            response = self.get_response(request)
+        request_time = time.perf_counter() - start
+
+        if (
+            request_time * 1000 >= config["SLOW_REQUEST_MS"]
+            or profile.total_time * 1000 >= config["SLOW_SQL_MS"]
+            or profile.query_count >= config["MAX_QUERIES"]
+        ):
+            logger.warning(
+                json.dumps(
+                    {
+                        "message": "Slow request",
+                        "path": request.path,
+                        "method": request.method,
+                        "status": response.status_code,
+                        "requestTimeMs": to_ms(request_time),
+                        **profile.as_dict(),
+                    }
+                )
+            )
+
+        return response
+
+
+class SQLProfilerGraphQLMiddleware:
+    """Attribute queries to the GraphQL resolver that ran them, for requests
+    being profiled by SQLProfilerMiddleware."""
+
+    def resolve(self, next, root, info, **args):
+        profile = getattr(info.context, "sql_profile", None)
+        if not profile:
+            return next(root, info, **args)
+
+        parent_resolver_path = profile.resolver_path
+        profile.resolver_path = LIST_INDEX_PATTERN.sub(
+            "", ".".join(str(key) for key in info.path)
+        )
+        try:
+            return next(root, info, **args)
+        finally:
+            profile.resolver_path = parent_resolver_path
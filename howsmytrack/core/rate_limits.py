@@ -0,0 +1,124 @@
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError
+
+from howsmytrack.core.metrics import RATE_LIMITED_REQUESTS
+
+
+RATE_LIMIT_CACHE = "rate_limit"
+
+logger = logging.getLogger(__name__)
+
+# Buckets are kept here instead if the cache can't be reached, so that limits
+# still apply (per process) while it's down. Each is stored with the time it
+# would have expired from the cache, oldest first.
+_fallback_buckets = {}
+MAX_FALLBACK_BUCKETS = 10000
+_fallback_lock = threading.Lock()
+
+
+class RateLimited(GraphQLError):
+    def __init__(self, retry_after):
+        super().__init__(
+            f"Too many requests. Please try again in {retry_after} seconds.",
+            extensions={"code": "RATE_LIMITED", "retryAfter": retry_after},
+        )
+
+
+def get_client_ip(request):
+    # Heroku's router appends the address it saw to X-Forwarded-For, so only
+    # the last entry can be trusted.
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded_for:
+        return forwarded_for.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR")
+
+
+def get_client_key(request):
+    """Logged in users are limited individually, and anyone else by IP."""
+    user = getattr(request, "user", None)
+    if user and user.is_authenticated:
+        return f"user:{user.id}"
+    return f"ip:{get_client_ip(request)}"
+
+
+def get_bucket(key):
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.warning("Rate limit cache unavailable.", exc_info=True)
+        with _fallback_lock:
+            bucket, expires_at = _fallback_buckets.get(key, (None, None))
+            return bucket if bucket and expires_at > time.time() else None
+
+
+def set_bucket(key, bucket, timeout):
+    try:
+        cache.set(key, bucket, timeout)
+    except Exception:
+        now = time.time()
+        with _fallback_lock:
+            _fallback_buckets.pop(key, None)
+            if len(_fallback_buckets) >= MAX_FALLBACK_BUCKETS:
+                # Forget buckets that have refilled, then the oldest ones if
+                # that isn't enough.
+                for expired_key, (_, expires_at) in list(_fallback_buckets.items()):
+                    if expires_at <= now:
+                        del _fallback_buckets[expired_key]
+                while len(_fallback_buckets) >= MAX_FALLBACK_BUCKETS:
+                    del _fallback_buckets[next(iter(_fallback_buckets))]
+            _fallback_buckets[key] = (bucket, now + timeout)
+
+
+def take_token(key, capacity, refill_per_second):
+    """
+    Take a token from the bucket `key`, which holds up to `capacity` tokens
+    and refills continuously. Returns 0 if a token was taken, or else the
+    number of seconds until one will be available.
+
+    Buckets are read and written without locking, so concurrent requests may
+    occasionally both take the last token; this is only meant to stop
+    sustained abuse.
+    """
+    now = time.time()
+    tokens, updated_at = get_bucket(key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+    if tokens < 1:
+        return (1 - tokens) / refill_per_second
+
+    # Full buckets don't need storing, so let them expire once they'd be full.
+    set_bucket(key, (tokens - 1, now), capacity / refill_per_second)
+    return 0
+
+
+class RateLimitGraphQLMiddleware:
+    """
+    Limit how often each client can resolve the expensive root fields in
+    `settings.RATE_LIMITS`, using a token bucket per client and field.
+
+    Limited fields resolve to a RATE_LIMITED error saying when to retry; the
+    view also sends that in a Retry-After header.
+    """
+
+    def resolve(self, next, root, info, **args):
+        rate_limit = settings.RATE_LIMITS.get(info.field_name)
+        if rate_limit and len(info.path) == 1:
+            request = info.context
+            retry_after = take_token(
+                f"{RATE_LIMIT_CACHE}:{info.field_name}:{get_client_key(request)}",
+                rate_limit["capacity"],
+                rate_limit["per_minute"] / 60,
+            )
+            if retry_after:
+                retry_after = math.ceil(retry_after)
+                request.rate_limit_retry_after = max(
+                    retry_after, getattr(request, "rate_limit_retry_after", 0)
+                )
+                RATE_LIMITED_REQUESTS.labels(field=info.field_name).inc()
+                raise RateLimited(retry_after)
+        return next(root, info, **args)
@@ -0,0 +1,76 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Cookie set on responses to mutations, so that the client's requests keep
+# reading from the primary until the replica has caught up with its writes.
+PRIMARY_PIN_COOKIE = "pin_primary"
+# The app label of DatabaseCache's table.
+CACHE_APP_LABEL = "django_cache"
+
+_state = threading.local()
+
+
+def get_read_database():
+    return getattr(_state, "read_database", None) or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route reads within the block to `settings.REPLICA_DATABASE`, if one is
+    configured. Writes always go to the primary, and once anything in the
+    block writes, its remaining reads go to the primary too so that they
+    see what was written.
+    """
+    previous_read_database = getattr(_state, "read_database", None)
+    _state.read_database = settings.REPLICA_DATABASE
+    try:
+        yield
+    finally:
+        _state.read_database = previous_read_database
+
+
+def is_pinned_to_primary(request):
+    """Whether the client has made a mutation within REPLICA_PIN_SECONDS."""
+    return PRIMARY_PIN_COOKIE in request.COOKIES
+
+
+def pin_to_primary(response):
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        "1",
+        max_age=settings.REPLICA_PIN_SECONDS,
+        secure=not settings.DEBUG,
+        httponly=True,
+        samesite="Strict",
+    )
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica inside `read_from_replica` blocks, and
+    everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        # The DB cache (used when there's no Redis) must always see the latest
+        # versions, so it's never read from the replica.
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        # Explicit, so that objects read from the replica aren't used as a
+        # hint to keep reading their relations from it outside the block.
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        # Caching a value doesn't change anything the block might read.
+        if model._meta.app_label != CACHE_APP_LABEL:
+            _state.read_database = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica has the same rows as the primary.
+        return True
@@ -10,6 +10,9 @@ from howsmytrack.core.schema.mutations.delete_feedback_request import (
     DeleteFeedbackRequest,
 )
 from howsmytrack.core.schema.mutations.edit_feedback_request import EditFeedbackRequest
+from howsmytrack.core.schema.mutations.mark_all_replies_as_read import (
+    MarkAllRepliesAsRead,
+)
 from howsmytrack.core.schema.mutations.mark_replies_as_read import MarkRepliesAsRead
 from howsmytrack.core.schema.mutations.obtain_json_web_token_case_insensitive import (
     ObtainJSONWebTokenCaseInsensitive,
@@ -17,10 +20,16 @@ from howsmytrack.core.schema.mutations.obtain_json_web_token_case_insensitive im
 from howsmytrack.core.schema.mutations.rate_feedback_response import (
     RateFeedbackResponse,
 )
+from howsmytrack.core.schema.mutations.rate_feedback_responses import (
+    RateFeedbackResponses,
+)
 from howsmytrack.core.schema.mutations.register_user import RegisterUser
 from howsmytrack.core.schema.mutations.submit_feedback_response import (
     SubmitFeedbackResponse,
 )
+from howsmytrack.core.schema.mutations.submit_feedback_responses import (
+    SubmitFeedbackResponses,
+)
 from howsmytrack.core.schema.mutations.update_email import UpdateEmail
 from howsmytrack.core.schema.mutations.update_send_reminder_emails import (
     UpdateSendReminderEmails,
@@ -36,8 +45,11 @@ class Mutation(graphene.ObjectType):
     delete_feedback_request = DeleteFeedbackRequest.Field()
     edit_feedback_request = EditFeedbackRequest.Field()
     submit_feedback_response = SubmitFeedbackResponse.Field()
+    submit_feedback_responses = SubmitFeedbackResponses.Field()
     rate_feedback_response = RateFeedbackResponse.Field()
+    rate_feedback_responses = RateFeedbackResponses.Field()
     add_feedback_response_reply = AddFeedbackResponseReply.Field()
     mark_replies_as_read = MarkRepliesAsRead.Field()
+    mark_all_replies_as_read = MarkAllRepliesAsRead.Field()
 
     token_auth = ObtainJSONWebTokenCaseInsensitive.Field()
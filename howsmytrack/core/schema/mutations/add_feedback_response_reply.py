@@ -1,6 +1,9 @@
 import graphene
+from django.db import transaction
 
-from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackResponse
 from howsmytrack.core.models import FeedbackResponseReply
 from howsmytrack.core.schema.types import FeedbackResponseReplyType
@@ -23,45 +26,59 @@ class AddFeedbackResponseReply(graphene.Mutation):
         if user.is_anonymous:
             return AddFeedbackResponseReply(reply=None, error="Not logged in.")
 
-        feedback_groups_user = FeedbackGroupsUser.objects.filter(user=user,).first()
+        with transaction.atomic():
+            # Everything needed to check the reply is allowed, in one query.
+            # The response is locked until the reply is saved, so a reply
+            # closing the conversation can't be saved alongside this one.
+            feedback_response = (
+                FeedbackResponse.objects.filter(id=feedback_response_id,)
+                .select_related("user", "feedback_request__user")
+                .select_for_update(of=("self",))
+                .first()
+            )
 
-        feedback_response = FeedbackResponse.objects.filter(
-            id=feedback_response_id,
-        ).first()
+            if not feedback_response:
+                return AddFeedbackResponseReply(
+                    reply=None, error="Invalid feedback_response_id"
+                )
 
-        if not feedback_response:
-            return AddFeedbackResponseReply(
-                reply=None, error="Invalid feedback_response_id"
-            )
+            # Only allow the FeedbackRequest user or FeedbackResponseUser to reply.
+            if feedback_response.user.user_id == user.id:
+                feedback_groups_user = feedback_response.user
+            elif feedback_response.feedback_request.user.user_id == user.id:
+                feedback_groups_user = feedback_response.feedback_request.user
+            else:
+                return AddFeedbackResponseReply(
+                    reply=None,
+                    error="You are not authorised to reply to this feedback.",
+                )
 
-        # Only allow the FeedbackRequest user or FeedbackResponseUser to reply.
-        if (
-            not feedback_response.user == feedback_groups_user
-            and not feedback_response.feedback_request.user == feedback_groups_user
-        ):
-            return AddFeedbackResponseReply(
-                reply=None, error="You are not authorised to reply to this feedback."
-            )
+            # The client should prevent users from replying to unsubmitted feedback, obviously,
+            # but we should protect against it here anyway.
+            # If there are other replies and one of them opted to end the conversation, don't allow a new reply.
+            # Replies that end conversations set `replies_closed` on the response when they're saved.
+            if (
+                not feedback_response.allow_replies
+                or not feedback_response.submitted
+                or feedback_response.replies_closed
+            ):
+                return AddFeedbackResponseReply(
+                    reply=None, error="You cannot reply to this feedback."
+                )
 
-        # The client should prevent users from replying to unsubmitted feedback, obviously,
-        # but we should protect against it here anyway.
-        # If there are other replies and one of them opted to end the conversation, don't allow a new reply.
-        if (
-            not feedback_response.allow_replies
-            or not feedback_response.submitted
-            or not feedback_response.allow_further_replies
-        ):
-            return AddFeedbackResponseReply(
-                reply=None, error="You cannot reply to this feedback."
+            reply = FeedbackResponseReply(
+                feedback_response=feedback_response,
+                user=feedback_groups_user,
+                text=text,
+                allow_replies=allow_replies,
+            )
+            reply.save()
+            FeedbackGroup.bump_version(
+                feedback_response.feedback_request.feedback_group_id
             )
 
-        reply = FeedbackResponseReply(
-            feedback_response=feedback_response,
-            user=feedback_groups_user,
-            text=text,
-            allow_replies=allow_replies,
-        )
-        reply.save()
+        bump_version(NOTIFICATIONS_CACHE, feedback_response.user_id)
+        bump_version(NOTIFICATIONS_CACHE, feedback_response.feedback_request.user_id)
 
         return AddFeedbackResponseReply(
             reply=FeedbackResponseReplyType.from_model(reply, feedback_groups_user,),
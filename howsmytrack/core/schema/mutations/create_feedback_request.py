@@ -1,8 +1,11 @@
 import graphene
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db import transaction
 
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.validators import get_media_key
 from howsmytrack.core.validators import validate_media_url
 
 
@@ -46,40 +49,38 @@ class CreateFeedbackRequest(graphene.Mutation):
                     success=False, error=e.message, invalid_media_url=True,
                 )
 
-        # Only create a new request if the user has an outstanding, ungrouped request
-        # (should only happen if user's request is from within the last 24 hours or
-        # the request is the only one submitted :cry: )
-        unassigned_requests = FeedbackRequest.objects.filter(
-            user=feedback_groups_user, feedback_group=None,
-        ).count()
-        if unassigned_requests > 0:
-            return CreateFeedbackRequest(
-                success=False,
-                error="You have an unassigned feedback request. Once that request has been assigned to a feedback group, you will be eligible to submit another request.",
-                invalid_media_url=False,
-            )
-
-        # Reject requests for the same URL (if the other submission hasn't been grouped yet)
-        # This prevents users creating multiple accounts to request the same track.
-        if media_url:
-            existing_track_requests = FeedbackRequest.objects.filter(
-                media_url=media_url, feedback_group=None,
-            ).count()
-            if existing_track_requests > 0:
-                return CreateFeedbackRequest(
-                    success=False,
-                    error="A request for this track is already pending.",
-                    invalid_media_url=False,
-                )
-
         feedback_request = FeedbackRequest(
             user=feedback_groups_user,
             media_url=media_url,
+            media_key=get_media_key(media_url),
             media_type=media_type,
             feedback_prompt=feedback_prompt,
             email_when_grouped=email_when_grouped,
             genre=genre,
         )
-        feedback_request.save()
+        # Users can only have one unassigned request, and only one unassigned
+        # request can be made for each track; both are enforced by unique
+        # constraints, so that concurrent requests can't both be created.
+        try:
+            with transaction.atomic():
+                feedback_request.save()
+        except IntegrityError:
+            # Only create a new request if the user has an outstanding, ungrouped request
+            # (should only happen if user's request is from within the last 24 hours or
+            # the request is the only one submitted :cry: )
+            if FeedbackRequest.objects.filter(
+                user=feedback_groups_user, feedback_group=None,
+            ).exists():
+                return CreateFeedbackRequest(
+                    success=False,
+                    error="You have an unassigned feedback request. Once that request has been assigned to a feedback group, you will be eligible to submit another request.",
+                    invalid_media_url=False,
+                )
+            # Otherwise, another user's unassigned request is for the same track.
+            return CreateFeedbackRequest(
+                success=False,
+                error="A request for this track is already pending.",
+                invalid_media_url=False,
+            )
 
         return CreateFeedbackRequest(success=True, error=None, invalid_media_url=False,)
@@ -1,8 +1,11 @@
 import graphene
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db import transaction
 
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.validators import get_media_key
 from howsmytrack.core.validators import validate_media_url
 
 
@@ -68,6 +71,7 @@ class EditFeedbackRequest(graphene.Mutation):
             )
 
         feedback_request.media_url = media_url
+        feedback_request.media_key = get_media_key(media_url)
         feedback_request.media_type = media_type
         # Allow empty feedback prompt
         if feedback_prompt is not None:
@@ -77,6 +81,15 @@ class EditFeedbackRequest(graphene.Mutation):
         if genre is not None:
             feedback_request.genre = genre
 
-        feedback_request.save()
+        try:
+            with transaction.atomic():
+                feedback_request.save()
+        except IntegrityError:
+            # Another user's unassigned request is for the same track.
+            return EditFeedbackRequest(
+                success=False,
+                error="A request for this track is already pending.",
+                invalid_media_url=False,
+            )
 
         return EditFeedbackRequest(success=True, error=None, invalid_media_url=False,)
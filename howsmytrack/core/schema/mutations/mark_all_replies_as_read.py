@@ -0,0 +1,60 @@
+import graphene
+
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.schema.mutations.mark_replies_as_read import get_unread_replies
+from howsmytrack.core.schema.mutations.mark_replies_as_read import mark_as_read
+
+
+class MarkAllRepliesAsRead(graphene.Mutation):
+    """
+    Mark every unread reply for a feedback response, or for every response
+    in a feedback group, as read without having to fetch their ids first.
+    """
+
+    class Arguments:
+        feedback_response_id = graphene.Int()
+        feedback_group_id = graphene.Int()
+
+    success = graphene.Boolean()
+    error = graphene.String()
+    count = graphene.Int()
+
+    def __eq__(self, other):
+        return all(
+            [
+                self.success == other.success,
+                self.error == other.error,
+                self.count == other.count,
+            ]
+        )
+
+    def mutate(self, info, feedback_response_id=None, feedback_group_id=None):
+        user = info.context.user
+        if user.is_anonymous:
+            return MarkAllRepliesAsRead(success=False, error="Not logged in.")
+
+        if (feedback_response_id is None) == (feedback_group_id is None):
+            return MarkAllRepliesAsRead(
+                success=False,
+                error="Exactly one of feedback_response_id and feedback_group_id is required",
+            )
+
+        feedback_groups_user_id = (
+            FeedbackGroupsUser.objects.filter(user=user,)
+            .values_list("id", flat=True)
+            .first()
+        )
+
+        unread_replies = get_unread_replies(feedback_groups_user_id)
+        if feedback_response_id is not None:
+            unread_replies = unread_replies.filter(
+                feedback_response_id=feedback_response_id
+            )
+        else:
+            unread_replies = unread_replies.filter(
+                feedback_response__feedback_request__feedback_group_id=feedback_group_id
+            )
+
+        count = mark_as_read(feedback_groups_user_id, unread_replies)
+
+        return MarkAllRepliesAsRead(success=True, error=None, count=count)
@@ -1,40 +1,77 @@
 import graphene
+from django.db import transaction
+from django.db.models import F
 from django.db.models import Q
 from django.utils import timezone
 
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackResponseReply
 
 
+def get_unread_replies(feedback_groups_user_id):
+    # Replies *not* sent by the user but involving a response for the user's
+    # request or that the user has written feedback for.
+    return (
+        FeedbackResponseReply.objects.exclude(user_id=feedback_groups_user_id,)
+        .filter(time_read__isnull=True,)
+        .filter(
+            Q(feedback_response__user_id=feedback_groups_user_id)
+            | Q(feedback_response__feedback_request__user_id=feedback_groups_user_id),
+        )
+    )
+
+
+def mark_as_read(feedback_groups_user_id, unread_replies):
+    """
+    Mark replies as read with a single UPDATE, rather than loading and saving
+    each one, and return how many were marked.
+    """
+    with transaction.atomic():
+        # Bump the groups' versions first, while the replies still match.
+        FeedbackGroup.objects.filter(
+            feedback_requests__feedback_responses__replies__in=unread_replies
+        ).update(version=F("version") + 1)
+        count = unread_replies.update(time_read=timezone.now())
+
+    if count:
+        bump_version(NOTIFICATIONS_CACHE, feedback_groups_user_id)
+    return count
+
+
 class MarkRepliesAsRead(graphene.Mutation):
     class Arguments:
         reply_ids = graphene.List(graphene.Int, required=True)
 
     success = graphene.Boolean()
     error = graphene.String()
+    count = graphene.Int()
 
     def __eq__(self, other):
-        return all([self.success == other.success, self.error == other.error,])
+        return all(
+            [
+                self.success == other.success,
+                self.error == other.error,
+                self.count == other.count,
+            ]
+        )
 
     def mutate(self, info, reply_ids):
         user = info.context.user
         if user.is_anonymous:
             return MarkRepliesAsRead(success=False, error="Not logged in.")
 
-        feedback_groups_user = FeedbackGroupsUser.objects.filter(user=user,).first()
-
-        unread_replies = (
-            FeedbackResponseReply.objects.exclude(user=feedback_groups_user,)
-            .filter(id__in=reply_ids, time_read__isnull=True,)
-            .filter(
-                Q(feedback_response__user=feedback_groups_user)
-                | Q(feedback_response__feedback_request__user=feedback_groups_user),
-            )
-            .all()
+        feedback_groups_user_id = (
+            FeedbackGroupsUser.objects.filter(user=user,)
+            .values_list("id", flat=True)
+            .first()
         )
 
-        for reply in unread_replies:
-            reply.time_read = timezone.now()
-            reply.save()
+        count = mark_as_read(
+            feedback_groups_user_id,
+            get_unread_replies(feedback_groups_user_id).filter(id__in=reply_ids),
+        )
 
-        return MarkRepliesAsRead(success=True, error=None)
+        return MarkRepliesAsRead(success=True, error=None, count=count)
@@ -1,5 +1,9 @@
 import graphql_jwt
-from django.contrib.auth.models import User
+from django.db.models import Case
+from django.db.models import Value
+from django.db.models import When
+
+from howsmytrack.core.auth import get_users_by_email
 
 
 class ObtainJSONWebTokenCaseInsensitive(graphql_jwt.ObtainJSONWebToken):
@@ -26,10 +30,15 @@ class ObtainJSONWebTokenCaseInsensitive(graphql_jwt.ObtainJSONWebToken):
 
     @classmethod
     def mutate(cls, *args, **kwargs):
-        exact_user = User.objects.filter(username=kwargs["username"]).first()
-        different_case_user = User.objects.filter(
-            username__iexact=kwargs["username"]
-        ).first()
-        if not exact_user and different_case_user:
-            kwargs["username"] = different_case_user.username
+        # Prefer the exact match, then the oldest account in another case.
+        username = (
+            get_users_by_email(kwargs["username"])
+            .order_by(
+                Case(When(username=kwargs["username"], then=Value(0)), default=1), "id",
+            )
+            .values_list("username", flat=True)
+            .first()
+        )
+        if username:
+            kwargs["username"] = username
         return super(ObtainJSONWebTokenCaseInsensitive, cls).mutate(*args, **kwargs,)
@@ -1,5 +1,8 @@
 import graphene
+from django.db import transaction
+from django.utils import timezone
 
+from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackResponse
 
@@ -20,32 +23,53 @@ class RateFeedbackResponse(graphene.Mutation):
         if user.is_anonymous:
             return RateFeedbackResponse(success=False, error="Not logged in.")
 
-        feedback_groups_user = FeedbackGroupsUser.objects.filter(user=user,).first()
+        feedback_groups_user_id = (
+            FeedbackGroupsUser.objects.filter(user=user,)
+            .values_list("id", flat=True)
+            .first()
+        )
 
-        feedback_response = FeedbackResponse.objects.filter(
-            feedback_request__user=feedback_groups_user, id=feedback_response_id,
-        ).first()
+        # Check and rate in one statement, so that concurrent requests can't
+        # both rate the same feedback.
+        rated = 0
+        if 1 <= rating <= 5:
+            with transaction.atomic():
+                rated = FeedbackResponse.objects.filter(
+                    feedback_request__user_id=feedback_groups_user_id,
+                    id=feedback_response_id,
+                    submitted=True,
+                    rating__isnull=True,
+                ).update(rating=rating, time_rated=timezone.now())
+                if rated:
+                    FeedbackGroup.bump_version_for_response(feedback_response_id)
+
+        if rated:
+            return RateFeedbackResponse(success=True, error=None)
+
+        # Work out why nothing was rated.
+        feedback_response = (
+            FeedbackResponse.objects.filter(
+                feedback_request__user_id=feedback_groups_user_id,
+                id=feedback_response_id,
+            )
+            .values("submitted", "rating")
+            .first()
+        )
 
         if not feedback_response:
             return RateFeedbackResponse(
                 success=False, error="Invalid feedback_response_id"
             )
 
-        if not feedback_response.submitted:
+        if not feedback_response["submitted"]:
             return RateFeedbackResponse(
                 success=False,
                 error="This feedback has not been submitted and cannot be rated.",
             )
 
-        if feedback_response.rating:
+        if feedback_response["rating"]:
             return RateFeedbackResponse(
                 success=False, error="Feedback has already been rated"
             )
 
-        if rating < 1 or rating > 5:
-            return RateFeedbackResponse(success=False, error="Invalid rating")
-
-        feedback_response.rating = rating
-        feedback_response.save()
-
-        return RateFeedbackResponse(success=True, error=None)
+        return RateFeedbackResponse(success=False, error="Invalid rating")
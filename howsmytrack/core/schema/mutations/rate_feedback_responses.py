@@ -0,0 +1,135 @@
+import graphene
+from django.db import transaction
+from django.utils import timezone
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackResponse
+
+
+class RateFeedbackResponseInput(graphene.InputObjectType):
+    feedback_response_id = graphene.Int(required=True)
+    rating = graphene.Int(required=True)
+
+
+class RateFeedbackResponseResult(graphene.ObjectType):
+    feedback_response_id = graphene.Int()
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def __eq__(self, other):
+        return all(
+            [
+                self.feedback_response_id == other.feedback_response_id,
+                self.success == other.success,
+                self.error == other.error,
+            ]
+        )
+
+
+class RateFeedbackResponses(graphene.Mutation):
+    """
+    Rate several pieces of feedback (e.g. all the feedback for a request) in
+    one request. Each rating is validated as in RateFeedbackResponse, with a
+    result per rating in the order they were given; `success` is only true
+    if every rating was saved.
+    """
+
+    class Arguments:
+        feedback_responses = graphene.List(
+            graphene.NonNull(RateFeedbackResponseInput), required=True
+        )
+
+    success = graphene.Boolean()
+    error = graphene.String()
+    results = graphene.List(RateFeedbackResponseResult)
+
+    def __eq__(self, other):
+        return all(
+            [
+                self.success == other.success,
+                self.error == other.error,
+                self.results == other.results,
+            ]
+        )
+
+    def mutate(self, info, feedback_responses):
+        user = info.context.user
+        if user.is_anonymous:
+            return RateFeedbackResponses(
+                success=False, error="Not logged in.", results=[]
+            )
+
+        time_rated = timezone.now()
+        results = []
+        rated_feedback_responses = {}
+        with transaction.atomic():
+            # Only feedback for the user's own requests can be rated.
+            owned_feedback_responses = {
+                feedback_response.id: feedback_response
+                for feedback_response in FeedbackResponse.objects.filter(
+                    feedback_request__user__user=user,
+                    id__in=[
+                        item["feedback_response_id"] for item in feedback_responses
+                    ],
+                )
+                .select_for_update(of=("self",))
+                .values_list(
+                    "id",
+                    "submitted",
+                    "rating",
+                    "feedback_request__feedback_group_id",
+                    named=True,
+                )
+            }
+
+            for item in feedback_responses:
+                feedback_response = owned_feedback_responses.get(
+                    item["feedback_response_id"]
+                )
+                if not feedback_response:
+                    error = "Invalid feedback_response_id"
+                elif not feedback_response.submitted:
+                    error = "This feedback has not been submitted and cannot be rated."
+                elif (
+                    feedback_response.rating
+                    or item["feedback_response_id"] in rated_feedback_responses
+                ):
+                    error = "Feedback has already been rated"
+                elif not 1 <= item["rating"] <= 5:
+                    error = "Invalid rating"
+                else:
+                    error = None
+                    rated_feedback_responses[
+                        item["feedback_response_id"]
+                    ] = FeedbackResponse(
+                        id=item["feedback_response_id"],
+                        rating=item["rating"],
+                        time_rated=time_rated,
+                    )
+
+                results.append(
+                    RateFeedbackResponseResult(
+                        feedback_response_id=item["feedback_response_id"],
+                        success=not error,
+                        error=error,
+                    )
+                )
+
+            if rated_feedback_responses:
+                FeedbackResponse.objects.bulk_update(
+                    rated_feedback_responses.values(), ["rating", "time_rated"],
+                )
+                FeedbackGroup.bump_versions(
+                    {
+                        owned_feedback_responses[
+                            feedback_response_id
+                        ].feedback_request__feedback_group_id
+                        for feedback_response_id in rated_feedback_responses
+                    }
+                )
+
+        return RateFeedbackResponses(
+            success=all(result.success for result in results),
+            error=None,
+            results=results,
+        )
@@ -1,10 +1,10 @@
 import graphene
-from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator
 from django.db import transaction
 
+from howsmytrack.core.auth import get_users_by_email
 from howsmytrack.core.models import FeedbackGroupsUser
 
 
@@ -33,8 +33,7 @@ class RegisterUser(graphene.Mutation):
             )
 
         # Don't allow users to sign up with the same email in a different case.
-        existing_users = User.objects.filter(username__iexact=email).count()
-        if existing_users > 0:
+        if get_users_by_email(email).exists():
             return RegisterUser(
                 success=False, error="An account for that email address already exists."
             )
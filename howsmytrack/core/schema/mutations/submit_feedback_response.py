@@ -1,6 +1,10 @@
 import graphene
+from django.db import transaction
 from django.utils import timezone
 
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackResponse
 
@@ -22,26 +26,39 @@ class SubmitFeedbackResponse(graphene.Mutation):
         if user.is_anonymous:
             return SubmitFeedbackResponse(success=False, error="Not logged in.")
 
-        feedback_groups_user = FeedbackGroupsUser.objects.filter(user=user,).first()
+        feedback_groups_user_id = (
+            FeedbackGroupsUser.objects.filter(user=user,)
+            .values_list("id", flat=True)
+            .first()
+        )
 
-        feedback_response = FeedbackResponse.objects.filter(
-            user=feedback_groups_user, id=feedback_response_id,
-        ).first()
-
-        if not feedback_response:
-            return SubmitFeedbackResponse(
-                success=False, error="Invalid feedback_response_id"
+        # Check and submit in one statement, so that concurrent requests
+        # can't both submit the same feedback.
+        with transaction.atomic():
+            submitted = FeedbackResponse.objects.filter(
+                user_id=feedback_groups_user_id,
+                id=feedback_response_id,
+                submitted=False,
+            ).update(
+                feedback=feedback,
+                time_submitted=timezone.now(),
+                submitted=True,
+                allow_replies=allow_replies,
             )
+            if submitted:
+                FeedbackGroup.bump_version_for_response(feedback_response_id)
 
-        if feedback_response.submitted:
+        if not submitted:
+            if FeedbackResponse.objects.filter(
+                user_id=feedback_groups_user_id, id=feedback_response_id,
+            ).exists():
+                return SubmitFeedbackResponse(
+                    success=False, error="Feedback has already been submitted"
+                )
             return SubmitFeedbackResponse(
-                success=False, error="Feedback has already been submitted"
+                success=False, error="Invalid feedback_response_id"
             )
 
-        feedback_response.feedback = feedback
-        feedback_response.time_submitted = timezone.now()
-        feedback_response.submitted = True
-        feedback_response.allow_replies = allow_replies
-        feedback_response.save()
+        bump_version(NOTIFICATIONS_CACHE, feedback_groups_user_id)
 
         return SubmitFeedbackResponse(success=True, error=None)
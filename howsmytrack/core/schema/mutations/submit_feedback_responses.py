@@ -0,0 +1,142 @@
+import graphene
+from django.db import transaction
+from django.utils import timezone
+
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackResponse
+
+
+class SubmitFeedbackResponseInput(graphene.InputObjectType):
+    feedback_response_id = graphene.Int(required=True)
+    feedback = graphene.String(required=True)
+    allow_replies = graphene.Boolean(required=True)
+
+
+class SubmitFeedbackResponseResult(graphene.ObjectType):
+    feedback_response_id = graphene.Int()
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def __eq__(self, other):
+        return all(
+            [
+                self.feedback_response_id == other.feedback_response_id,
+                self.success == other.success,
+                self.error == other.error,
+            ]
+        )
+
+
+class SubmitFeedbackResponses(graphene.Mutation):
+    """
+    Submit several pieces of feedback (e.g. for the rest of a group) in one
+    request. Each piece is validated as in SubmitFeedbackResponse, with a
+    result per piece in the order they were given; `success` is only true
+    if every piece was submitted.
+    """
+
+    class Arguments:
+        feedback_responses = graphene.List(
+            graphene.NonNull(SubmitFeedbackResponseInput), required=True
+        )
+
+    success = graphene.Boolean()
+    error = graphene.String()
+    results = graphene.List(SubmitFeedbackResponseResult)
+
+    def __eq__(self, other):
+        return all(
+            [
+                self.success == other.success,
+                self.error == other.error,
+                self.results == other.results,
+            ]
+        )
+
+    def mutate(self, info, feedback_responses):
+        user = info.context.user
+        if user.is_anonymous:
+            return SubmitFeedbackResponses(
+                success=False, error="Not logged in.", results=[]
+            )
+
+        time_submitted = timezone.now()
+        results = []
+        submitted_feedback_responses = {}
+        with transaction.atomic():
+            owned_feedback_responses = {
+                feedback_response.id: feedback_response
+                for feedback_response in FeedbackResponse.objects.filter(
+                    user__user=user,
+                    id__in=[
+                        item["feedback_response_id"] for item in feedback_responses
+                    ],
+                )
+                .select_for_update(of=("self",))
+                .values_list(
+                    "id",
+                    "submitted",
+                    "user_id",
+                    "feedback_request__feedback_group_id",
+                    named=True,
+                )
+            }
+
+            for item in feedback_responses:
+                feedback_response = owned_feedback_responses.get(
+                    item["feedback_response_id"]
+                )
+                if not feedback_response:
+                    error = "Invalid feedback_response_id"
+                elif (
+                    feedback_response.submitted
+                    or item["feedback_response_id"] in submitted_feedback_responses
+                ):
+                    error = "Feedback has already been submitted"
+                else:
+                    error = None
+                    submitted_feedback_responses[
+                        item["feedback_response_id"]
+                    ] = FeedbackResponse(
+                        id=item["feedback_response_id"],
+                        feedback=item["feedback"],
+                        allow_replies=item["allow_replies"],
+                        submitted=True,
+                        time_submitted=time_submitted,
+                    )
+
+                results.append(
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=item["feedback_response_id"],
+                        success=not error,
+                        error=error,
+                    )
+                )
+
+            if submitted_feedback_responses:
+                FeedbackResponse.objects.bulk_update(
+                    submitted_feedback_responses.values(),
+                    ["feedback", "allow_replies", "submitted", "time_submitted"],
+                )
+                FeedbackGroup.bump_versions(
+                    {
+                        owned_feedback_responses[
+                            feedback_response_id
+                        ].feedback_request__feedback_group_id
+                        for feedback_response_id in submitted_feedback_responses
+                    }
+                )
+
+        if submitted_feedback_responses:
+            feedback_groups_user_id = next(
+                iter(owned_feedback_responses.values())
+            ).user_id
+            bump_version(NOTIFICATIONS_CACHE, feedback_groups_user_id)
+
+        return SubmitFeedbackResponses(
+            success=all(result.success for result in results),
+            error=None,
+            results=results,
+        )
@@ -1,8 +1,9 @@
 import graphene
-from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator
 
+from howsmytrack.core.auth import get_users_by_email
+from howsmytrack.core.auth import invalidate_user
 from howsmytrack.core.models import FeedbackGroupsUser
 
 
@@ -32,12 +33,14 @@ class UpdateEmail(graphene.Mutation):
             )
 
         # Don't allow users to change their email to one used by another account.
-        existing_users = User.objects.filter(username__iexact=email).count()
-        if existing_users > 0:
+        if get_users_by_email(email).exists():
             return UpdateEmail(
                 success=False, error="An account for that email address already exists."
             )
 
+        old_username = user.username
         feedback_groups_user.update_email(email)
+        # Tokens for the old username should no longer find the user.
+        invalidate_user(old_username)
 
         return UpdateEmail(success=True, error=None)
@@ -2,6 +2,15 @@ import graphene
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 
+from howsmytrack.core.cache import FEEDBACK_GROUP_CACHE
+from howsmytrack.core.cache import FEEDBACK_GROUP_TIMEOUT
+from howsmytrack.core.cache import get_or_compute
+from howsmytrack.core.cache import get_version
+from howsmytrack.core.cache import hash_key
+from howsmytrack.core.cache import MEDIA_INFO_CACHE
+from howsmytrack.core.cache import MEDIA_INFO_TIMEOUT
+from howsmytrack.core.cache import NOTIFICATIONS_CACHE
+from howsmytrack.core.cache import NOTIFICATIONS_TIMEOUT
 from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackRequest
@@ -15,6 +24,54 @@ from howsmytrack.core.schema.types import UserType
 from howsmytrack.core.validators import validate_media_url
 
 
+def count_notifications(feedback_groups_user):
+    # Find number of responses assigned to user which are unsubmitted.
+    # Displayed as an irrtating badge to encourage the user to get on with it.
+    incomplete_responses = FeedbackResponse.objects.filter(
+        user=feedback_groups_user, submitted=False,
+    ).count()
+
+    # Find number of replies *not* sent by the user but involving a response
+    # for the user's request or that the user has written feedback for.
+    unread_replies = (
+        FeedbackResponseReply.objects.exclude(user=feedback_groups_user,)
+        .filter(time_read__isnull=True,)
+        .filter(
+            Q(feedback_response__user=feedback_groups_user)
+            | Q(feedback_response__feedback_request__user=feedback_groups_user),
+        )
+        .count()
+    )
+
+    return incomplete_responses + unread_replies
+
+
+def get_media_type(media_url):
+    try:
+        return validate_media_url(media_url)
+    except ValidationError:
+        return None
+
+
+def get_feedback_group_snapshot(
+    feedback_group_id, version, feedback_groups_user, get_feedback_group
+):
+    """
+    Get the FeedbackGroupType for a user's view of a group, which is cached
+    for each FeedbackGroup.version. `get_feedback_group` is only called to
+    fetch the group when the snapshot isn't cached.
+    """
+    return get_or_compute(
+        FEEDBACK_GROUP_CACHE,
+        f"{feedback_group_id}:{feedback_groups_user.id}",
+        lambda: FeedbackGroupType.from_model(
+            get_feedback_group(), feedback_groups_user
+        ),
+        FEEDBACK_GROUP_TIMEOUT,
+        version=version,
+    )
+
+
 class Query(graphene.ObjectType):
     media_info = graphene.Field(
         MediaInfoType, media_url=graphene.String(required=True),
@@ -45,37 +102,28 @@ class Query(graphene.ObjectType):
         if feedback_groups_user.rating:
             rating = feedback_groups_user.rating
 
-        # Find number of responses assigned to user which are unsubmitted.
-        # Displayed as an irrtating badge to encourage the user to get on with it.
-        incomplete_responses = FeedbackResponse.objects.filter(
-            user=feedback_groups_user, submitted=False,
-        ).count()
-
-        # Find number of replies *not* sent by the user but involving a response
-        # for the user's request or that the user has written feedback for.
-        unread_replies = (
-            FeedbackResponseReply.objects.exclude(user=feedback_groups_user,)
-            .filter(time_read__isnull=True,)
-            .filter(
-                Q(feedback_response__user=feedback_groups_user)
-                | Q(feedback_response__feedback_request__user=feedback_groups_user),
-            )
-            .count()
+        notifications = get_or_compute(
+            NOTIFICATIONS_CACHE,
+            feedback_groups_user.id,
+            lambda: count_notifications(feedback_groups_user),
+            NOTIFICATIONS_TIMEOUT,
+            version=get_version(NOTIFICATIONS_CACHE, feedback_groups_user.id),
         )
 
         return UserType(
             username=user.username,
             rating=rating,
-            notifications=incomplete_responses + unread_replies,
+            notifications=notifications,
             send_reminder_emails=feedback_groups_user.send_reminder_emails,
         )
 
     def resolve_media_info(self, info, media_url):
-        media_type = None
-        try:
-            media_type = validate_media_url(media_url)
-        except ValidationError:
-            return MediaInfoType(media_url=media_url, media_type=media_type,)
+        media_type = get_or_compute(
+            MEDIA_INFO_CACHE,
+            hash_key(media_url),
+            lambda: get_media_type(media_url),
+            MEDIA_INFO_TIMEOUT,
+        )
 
         return MediaInfoType(media_url=media_url, media_type=media_type,)
 
@@ -86,16 +134,25 @@ class Query(graphene.ObjectType):
 
         feedback_groups_user = FeedbackGroupsUser.objects.filter(user=user,).first()
 
-        feedback_group = (
+        # Snapshots are cached per version, so this is all that's needed to
+        # check whether the cached snapshot is up to date.
+        version = (
             FeedbackGroup.objects.filter(id=feedback_group_id,)
-            .prefetch_related("feedback_requests")
+            .values_list("version", flat=True)
             .first()
         )
 
-        if not feedback_group:
+        if version is None:
             return None
 
-        return FeedbackGroupType.from_model(feedback_group, feedback_groups_user)
+        return get_feedback_group_snapshot(
+            feedback_group_id,
+            version,
+            feedback_groups_user,
+            lambda: FeedbackGroup.objects.filter(id=feedback_group_id,)
+            .prefetch_related("feedback_requests")
+            .get(),
+        )
 
     def resolve_feedback_groups(self, info):
         user = info.context.user
@@ -113,11 +170,14 @@ class Query(graphene.ObjectType):
         )
 
         return [
-            FeedbackGroupType.from_model(
-                feedback_request.feedback_group, feedback_groups_user
+            get_feedback_group_snapshot(
+                feedback_request.feedback_group_id,
+                feedback_request.feedback_group.version,
+                feedback_groups_user,
+                lambda: feedback_request.feedback_group,
             )
             for feedback_request in feedback_requests
-            if feedback_request.feedback_group
+            if feedback_request.feedback_group_id
         ]
 
     def resolve_unassigned_request(self, info):
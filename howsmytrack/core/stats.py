@@ -0,0 +1,157 @@
+from collections import namedtuple
+
+from django.db.models import Count
+from django.db.models import Q
+from django.db.models.functions import TruncDate
+
+from howsmytrack.core.models import DailyStats
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+
+
+# Rows are read through server-side cursors in chunks of this size so
+# that memory usage stays flat no matter how large the tables get.
+ITERATOR_CHUNK_SIZE = 2000
+
+DATE_STRING = "{day}/{month}/{year}"
+DATETIME_STRING = "{day}/{month}/{year} {hour}:{minute}:{second}"
+
+
+DAILY_STATS_FIELDS = [
+    "feedback_requests",
+    "signups",
+    "feedback_groups",
+    "feedback_responses",
+    "submissions",
+    "ratings",
+    "replies",
+]
+
+
+StatsReport = namedtuple("StatsReport", ["filename", "columns", "build_rows"])
+
+
+def format_datetime(date):
+    return DATETIME_STRING.format(
+        day=date.day,
+        month=date.month,
+        year=date.year,
+        hour=date.hour,
+        minute=date.minute,
+        second=date.second,
+    )
+
+
+def format_date(date):
+    return DATE_STRING.format(day=date.day, month=date.month, year=date.year,)
+
+
+def filter_date_range(queryset, field, start_date=None, end_date=None):
+    """Restrict `queryset` to rows where the date of `field` falls
+    between `start_date` and `end_date` inclusive; either bound may be omitted."""
+    if start_date:
+        queryset = queryset.filter(**{f"{field}__date__gte": start_date})
+    if end_date:
+        queryset = queryset.filter(**{f"{field}__date__lte": end_date})
+    return queryset
+
+
+def build_cumulative_rows(queryset, field, start_date=None, end_date=None):
+    # Running totals include everything created before the start of the range
+    # so that filtered exports line up with unfiltered ones.
+    count = 0
+    if start_date:
+        count = queryset.filter(**{f"{field}__date__lt": start_date}).count()
+
+    times = (
+        filter_date_range(queryset, field, start_date, end_date)
+        .order_by(field, "id")
+        .values_list(field, flat=True)
+    )
+    for time in times.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        count += 1
+        yield format_datetime(time), count
+
+
+def build_daily_stats_rows(fields, start_date=None, end_date=None):
+    daily_stats = DailyStats.objects.order_by("date").values_list("date", *fields)
+    if start_date:
+        daily_stats = daily_stats.filter(date__gte=start_date)
+    if end_date:
+        daily_stats = daily_stats.filter(date__lte=end_date)
+    for date, *counts in daily_stats.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield (format_date(date), *counts)
+
+
+def build_feedback_requests(start_date=None, end_date=None):
+    return build_cumulative_rows(
+        FeedbackRequest.objects.all(), "time_created", start_date, end_date,
+    )
+
+
+def build_feedback_groups_users(start_date=None, end_date=None):
+    return build_cumulative_rows(
+        FeedbackGroupsUser.objects.all(), "user__date_joined", start_date, end_date,
+    )
+
+
+def build_response_rates_by_date(start_date=None, end_date=None):
+    field = "feedback_request__feedback_group__time_created"
+    response_rates_by_date = (
+        filter_date_range(FeedbackResponse.objects.all(), field, start_date, end_date)
+        .annotate(date=TruncDate(field))
+        .values("date")
+        .annotate(
+            responses=Count("id"), submissions=Count("id", filter=Q(submitted=True)),
+        )
+        .order_by("date")
+    )
+    for row in response_rates_by_date.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield format_date(row["date"]), row["submissions"] / row["responses"]
+
+
+def build_feedback_requests_by_date(start_date=None, end_date=None):
+    return build_daily_stats_rows(["feedback_requests"], start_date, end_date)
+
+
+def build_feedback_groups_users_by_date(start_date=None, end_date=None):
+    return build_daily_stats_rows(["signups"], start_date, end_date)
+
+
+def build_daily_stats(start_date=None, end_date=None):
+    return build_daily_stats_rows(DAILY_STATS_FIELDS, start_date, end_date)
+
+
+STATS_REPORTS = {
+    "feedback_requests": StatsReport(
+        filename="feedback_requests.csv",
+        columns=["time_created", "count"],
+        build_rows=build_feedback_requests,
+    ),
+    "feedback_groups_users": StatsReport(
+        filename="feedback_groups_users.csv",
+        columns=["date_joined", "count"],
+        build_rows=build_feedback_groups_users,
+    ),
+    "feedback_response_rates": StatsReport(
+        filename="feedback_response_rates.csv",
+        columns=["date", "response_rate"],
+        build_rows=build_response_rates_by_date,
+    ),
+    "feedback_requests_by_date": StatsReport(
+        filename="feedback_requests_by_date.csv",
+        columns=["date", "count"],
+        build_rows=build_feedback_requests_by_date,
+    ),
+    "feedback_groups_users_by_date": StatsReport(
+        filename="feedback_groups_users_by_date.csv",
+        columns=["date", "count"],
+        build_rows=build_feedback_groups_users_by_date,
+    ),
+    "daily_stats": StatsReport(
+        filename="daily_stats.csv",
+        columns=["date"] + DAILY_STATS_FIELDS,
+        build_rows=build_daily_stats,
+    ),
+}
@@ -0,0 +1,60 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.validators import get_media_key
+
+
+GREY_MEDIA_KEY = get_media_key("https://soundcloud.com/ruairidx/grey")
+
+
+class BackfillMediaKeysTest(TestCase):
+    def setUp(self):
+        feedback_group = FeedbackGroup(name="name")
+        feedback_group.save()
+        self.feedback_requests = []
+        for email, media_url, group in [
+            ("graham", "https://soundcloud.com/ruairidx/grey", feedback_group),
+            ("lewis", "https://soundcloud.com/ruairidx/grey/?si=abc", None),
+            ("davy", "https://soundcloud.com/ruairidx/grey", None),
+            ("alexis", "https://soundcloud.com/ruairidx/grey", feedback_group),
+            ("pascal", None, None),
+        ]:
+            user = FeedbackGroupsUser.create(
+                email=f"{email}@brightonandhovealbion.com", password="password",
+            )
+            user.save()
+            feedback_request = FeedbackRequest(
+                user=user, media_url=media_url, feedback_group=group,
+            )
+            feedback_request.save()
+            self.feedback_requests.append(feedback_request)
+
+    def get_media_keys(self):
+        return [
+            FeedbackRequest.objects.get(id=feedback_request.id).media_key
+            for feedback_request in self.feedback_requests
+        ]
+
+    def test_backfill(self):
+        call_command("backfill_media_keys", batch_size=2)
+
+        # Only the oldest unassigned request for the track is given a key.
+        self.assertEqual(
+            self.get_media_keys(),
+            [GREY_MEDIA_KEY, GREY_MEDIA_KEY, None, GREY_MEDIA_KEY, None],
+        )
+
+        # Once the other request is assigned, a rerun gives it a key.
+        FeedbackRequest.objects.filter(id=self.feedback_requests[2].id).update(
+            feedback_group=self.feedback_requests[0].feedback_group
+        )
+        with self.assertNumQueries(5):
+            # One batch (with its update, savepoint and release) and the
+            # empty batch which ends the run. No keys are looked up since
+            # none of the batch is unassigned.
+            call_command("backfill_media_keys")
+
+        self.assertEqual(self.get_media_keys(), [GREY_MEDIA_KEY] * 4 + [None])
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import IdempotencyKey
+
+
+class DeleteExpiredIdempotencyKeysTest(TestCase):
+    def test_delete_expired(self):
+        user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        user.save()
+        IdempotencyKey.claim(user.user, "expired", "hash", timedelta(0), timedelta(0))
+        IdempotencyKey.claim(
+            user.user, "current", "hash", timedelta(hours=1), timedelta(0)
+        )
+
+        call_command("delete_expired_idempotency_keys")
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["current"]
+        )
@@ -0,0 +1,117 @@
+import datetime
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytz
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from howsmytrack.core.models import DailyStats
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+
+
+DAY_ONE = datetime.datetime(2020, 2, 16, 6, tzinfo=pytz.utc)
+DAY_TWO = datetime.datetime(2020, 2, 17, 6, tzinfo=pytz.utc)
+DAY_THREE = datetime.datetime(2020, 2, 18, 6, tzinfo=pytz.utc)
+
+
+class RollupDailyStatsTest(TestCase):
+    def setUp(self):
+        self.graham_user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.lewis_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.graham_user.save()
+        self.lewis_user.save()
+        User.objects.update(date_joined=DAY_ONE)
+
+        with patch("django.utils.timezone.now", Mock(return_value=DAY_ONE)):
+            self.feedback_group = FeedbackGroup(name="name")
+            self.feedback_group.save()
+            self.graham_feedback_request = FeedbackRequest(
+                user=self.graham_user,
+                media_url="https://soundcloud.com/ruairidx/grey",
+                feedback_group=self.feedback_group,
+            )
+            self.graham_feedback_request.save()
+            self.lewis_feedback_request = FeedbackRequest(
+                user=self.lewis_user,
+                media_url="https://soundcloud.com/ruairidx/bruno",
+                feedback_group=self.feedback_group,
+            )
+            self.lewis_feedback_request.save()
+
+        self.feedback_response = FeedbackResponse(
+            feedback_request=self.graham_feedback_request,
+            user=self.lewis_user,
+            feedback="feedback",
+            submitted=True,
+            time_submitted=DAY_TWO,
+            allow_replies=True,
+            rating=5,
+            time_rated=DAY_TWO,
+        )
+        self.feedback_response.save()
+        FeedbackResponse(
+            feedback_request=self.lewis_feedback_request, user=self.graham_user,
+        ).save()
+
+    def test_rollup(self):
+        call_command("rollup_daily_stats")
+
+        self.assertEqual(
+            list(
+                DailyStats.objects.order_by("date").values_list(
+                    "date",
+                    "feedback_requests",
+                    "signups",
+                    "feedback_groups",
+                    "feedback_responses",
+                    "submissions",
+                    "ratings",
+                    "replies",
+                )
+            ),
+            [
+                (DAY_ONE.date(), 2, 2, 1, 2, 0, 0, 0),
+                (DAY_TWO.date(), 0, 0, 0, 0, 1, 1, 0),
+            ],
+        )
+
+    def test_rollup_only_recomputes_since_last_rollup(self):
+        call_command("rollup_daily_stats")
+
+        # Tamper with an old day; an incremental rollup should leave it alone.
+        DailyStats.objects.filter(date=DAY_ONE.date()).update(feedback_requests=100)
+
+        with patch("django.utils.timezone.now", Mock(return_value=DAY_THREE)):
+            FeedbackResponseReply(
+                feedback_response=self.feedback_response,
+                user=self.graham_user,
+                text="cheers",
+            ).save()
+
+        call_command("rollup_daily_stats")
+
+        self.assertEqual(
+            DailyStats.objects.get(date=DAY_ONE.date()).feedback_requests, 100,
+        )
+        self.assertEqual(DailyStats.objects.get(date=DAY_TWO.date()).submissions, 1)
+        self.assertEqual(DailyStats.objects.get(date=DAY_THREE.date()).replies, 1)
+
+    def test_backfill(self):
+        call_command("rollup_daily_stats")
+        DailyStats.objects.filter(date=DAY_ONE.date()).update(feedback_requests=100)
+
+        call_command("rollup_daily_stats", backfill=True)
+
+        self.assertEqual(
+            DailyStats.objects.get(date=DAY_ONE.date()).feedback_requests, 2,
+        )
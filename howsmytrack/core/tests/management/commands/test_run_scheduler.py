@@ -0,0 +1,98 @@
+import datetime
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytz
+from django.core.management import call_command
+from django.test import override_settings
+from django.test import TestCase
+
+from howsmytrack.core.management.commands.run_scheduler import exit_on_sigterm
+from howsmytrack.core.management.commands.run_scheduler import SCHEDULER_LEASE_NAME
+from howsmytrack.core.models import Lease
+
+
+FAR_FUTURE = datetime.datetime(2999, 1, 1, tzinfo=pytz.utc)
+
+
+@patch("howsmytrack.core.management.commands.run_scheduler.signal.signal", Mock())
+@patch("howsmytrack.core.management.commands.run_scheduler.shutdown_scheduler")
+@patch("howsmytrack.core.management.commands.run_scheduler.pause_scheduler")
+@patch("howsmytrack.core.management.commands.run_scheduler.start_scheduler")
+class RunSchedulerTest(TestCase):
+    def run_heartbeats(self, between_heartbeats):
+        """Run the scheduler loop, calling each of `between_heartbeats` in place
+        of sleeping between heartbeats, then stop."""
+        between_heartbeats = list(between_heartbeats)
+
+        def sleep(seconds):
+            if not between_heartbeats:
+                raise KeyboardInterrupt()
+            between_heartbeats.pop(0)()
+
+        with patch(
+            "howsmytrack.core.management.commands.run_scheduler.time.sleep",
+            Mock(side_effect=sleep),
+        ):
+            call_command("run_scheduler")
+
+    def test_leader_starts_scheduler(
+        self, start_scheduler, pause_scheduler, shutdown_scheduler
+    ):
+        self.run_heartbeats([Mock(), Mock()])
+
+        start_scheduler.assert_called_once()
+        pause_scheduler.assert_not_called()
+        shutdown_scheduler.assert_called_once()
+        # Lease is released on exit.
+        self.assertEqual(Lease.objects.filter(name=SCHEDULER_LEASE_NAME).count(), 0)
+
+    def test_follower_does_not_start_scheduler(
+        self, start_scheduler, pause_scheduler, shutdown_scheduler
+    ):
+        Lease(name=SCHEDULER_LEASE_NAME, holder="other", expires_at=FAR_FUTURE).save()
+
+        self.run_heartbeats([Mock()])
+
+        start_scheduler.assert_not_called()
+        self.assertEqual(
+            Lease.objects.get(name=SCHEDULER_LEASE_NAME).holder, "other",
+        )
+
+    def test_leader_pauses_scheduler_on_losing_lease(
+        self, start_scheduler, pause_scheduler, shutdown_scheduler
+    ):
+        def steal_lease():
+            Lease.objects.filter(name=SCHEDULER_LEASE_NAME).update(
+                holder="other", expires_at=FAR_FUTURE
+            )
+
+        self.run_heartbeats([steal_lease])
+
+        start_scheduler.assert_called_once()
+        pause_scheduler.assert_called_once()
+
+    def test_exit_on_sigterm(
+        self, start_scheduler, pause_scheduler, shutdown_scheduler
+    ):
+        with self.assertRaises(SystemExit):
+            exit_on_sigterm(None, None)
+
+    @override_settings(CLOCK_METRICS_PORT=9100)
+    def test_serves_metrics(self, start_scheduler, pause_scheduler, shutdown_scheduler):
+        with patch(
+            "howsmytrack.core.management.commands.run_scheduler.start_http_server"
+        ) as start_http_server:
+            self.run_heartbeats([])
+
+        start_http_server.assert_called_once_with(9100)
+
+    def test_metrics_not_served_by_default(
+        self, start_scheduler, pause_scheduler, shutdown_scheduler
+    ):
+        with patch(
+            "howsmytrack.core.management.commands.run_scheduler.start_http_server"
+        ) as start_http_server:
+            self.run_heartbeats([])
+
+        start_http_server.assert_not_called()
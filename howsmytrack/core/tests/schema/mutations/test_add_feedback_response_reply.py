@@ -280,3 +280,26 @@ class AddFeedbackResponseReplyTest(TestCase):
                 error=None,
             ),
         )
+
+    def test_single_query(self):
+        info = Mock()
+        info.context = Mock()
+        add_feedback_response_reply = schema.get_mutation_type().fields[
+            "addFeedbackResponseReply"
+        ]
+        for user in [self.response_user, self.request_user]:
+            info.context.user = user.user
+            # In a savepoint, the locked response with its users, the insert,
+            # the response's reply state and the group version bump.
+            with self.assertNumQueries(6):
+                result = add_feedback_response_reply.resolver(
+                    self=Mock(),
+                    info=info,
+                    feedback_response_id=self.feedback_response.id,
+                    text="thanks pal",
+                    allow_replies=True,
+                )
+            self.assertEqual(result.reply.username, "You")
+            self.assertEqual(
+                FeedbackResponseReply.objects.get(id=result.reply.id).user, user
+            )
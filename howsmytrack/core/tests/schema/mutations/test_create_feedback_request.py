@@ -10,6 +10,7 @@ from howsmytrack.core.models import MediaTypeChoice
 from howsmytrack.core.schema.mutations.create_feedback_request import (
     CreateFeedbackRequest,
 )
+from howsmytrack.core.validators import get_media_key
 from howsmytrack.core.validators import INVALID_MEDIA_URL_MESSAGE
 from howsmytrack.schema import schema
 
@@ -337,6 +338,7 @@ class CreateFeedbackRequestTest(TestCase):
         FeedbackRequest(
             user=self.another_user,
             media_url="https://soundcloud.com/ruairidx/bruno",
+            media_key=get_media_key("https://soundcloud.com/ruairidx/bruno"),
             media_type=MediaTypeChoice.SOUNDCLOUD.name,
             feedback_prompt="feedback_prompt",
             email_when_grouped=True,
@@ -374,3 +376,88 @@ class CreateFeedbackRequestTest(TestCase):
             ).count(),
             0,
         )
+
+    def test_same_track_different_account(self):
+        another_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        another_user.save()
+
+        info = Mock()
+        info.context = Mock()
+        create_feedback_request = schema.get_mutation_type().fields[
+            "createFeedbackRequest"
+        ]
+        info.context.user = another_user.user
+        result = create_feedback_request.resolver(
+            self=Mock(),
+            info=info,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            genre=GenreChoice.ELECTRONIC.name,
+        )
+        self.assertEqual(
+            result,
+            CreateFeedbackRequest(success=True, error=None, invalid_media_url=False,),
+        )
+
+        info.context.user = self.user.user
+        # User lookup and the insert in a savepoint; the duplicate checks are
+        # left to the DB.
+        with self.assertNumQueries(4):
+            result = create_feedback_request.resolver(
+                self=Mock(),
+                info=info,
+                media_url="https://soundcloud.com/ruairidx/grey",
+                genre=GenreChoice.ELECTRONIC.name,
+            )
+        self.assertEqual(
+            result,
+            CreateFeedbackRequest(success=True, error=None, invalid_media_url=False,),
+        )
+
+        # A different user's request for the same track, with a trailing
+        # slash, a tracking parameter and a fragment.
+        yet_another_user = FeedbackGroupsUser.create(
+            email="davy@brightonandhovealbion.com", password="password",
+        )
+        yet_another_user.save()
+        info.context.user = yet_another_user.user
+        result = create_feedback_request.resolver(
+            self=Mock(),
+            info=info,
+            media_url="https://soundcloud.com/ruairidx/bruno/?si=abc#t=0:30",
+            genre=GenreChoice.ELECTRONIC.name,
+        )
+        self.assertEqual(
+            result,
+            CreateFeedbackRequest(
+                success=False,
+                error="A request for this track is already pending.",
+                invalid_media_url=False,
+            ),
+        )
+        self.assertFalse(FeedbackRequest.objects.filter(user=yet_another_user).exists())
+
+    def test_trackless_different_accounts(self):
+        another_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        another_user.save()
+
+        info = Mock()
+        info.context = Mock()
+        for user in [self.user, another_user]:
+            info.context.user = user.user
+            result = (
+                schema.get_mutation_type()
+                .fields["createFeedbackRequest"]
+                .resolver(self=Mock(), info=info, genre=GenreChoice.ELECTRONIC.name,)
+            )
+            self.assertEqual(
+                result,
+                CreateFeedbackRequest(
+                    success=True, error=None, invalid_media_url=False,
+                ),
+            )
+
+        self.assertEqual(FeedbackRequest.objects.filter(media_key=None).count(), 2)
@@ -8,6 +8,7 @@ from howsmytrack.core.models import FeedbackRequest
 from howsmytrack.core.models import GenreChoice
 from howsmytrack.core.models import MediaTypeChoice
 from howsmytrack.core.schema.mutations.edit_feedback_request import EditFeedbackRequest
+from howsmytrack.core.validators import get_media_key
 from howsmytrack.core.validators import INVALID_MEDIA_URL_MESSAGE
 from howsmytrack.schema import schema
 
@@ -255,3 +256,46 @@ class EditFeedbackRequestTest(TestCase):
             ).count(),
             1,
         )
+
+    def test_same_url_different_account(self):
+        another_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        another_user.save()
+        FeedbackRequest(
+            user=another_user,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            media_key=get_media_key("https://soundcloud.com/ruairidx/bruno"),
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            genre=GenreChoice.ELECTRONIC.name,
+        ).save()
+
+        info = Mock()
+        info.context = Mock()
+        info.context.user = self.user.user
+        result = (
+            schema.get_mutation_type()
+            .fields["editFeedbackRequest"]
+            .resolver(
+                self=Mock(),
+                info=info,
+                feedback_request_id=self.existing_request.id,
+                media_url="https://soundcloud.com/ruairidx/bruno?utm_source=clipboard",
+                feedback_prompt="feedback_prompt",
+                email_when_grouped=False,
+                genre=GenreChoice.HIPHOP.name,
+            )
+        )
+
+        self.assertEqual(
+            result,
+            EditFeedbackRequest(
+                success=False,
+                error="A request for this track is already pending.",
+                invalid_media_url=False,
+            ),
+        )
+        self.existing_request.refresh_from_db()
+        self.assertEqual(
+            self.existing_request.media_url, "https://soundcloud.com/ruairidx/grey"
+        )
@@ -0,0 +1,151 @@
+from unittest.mock import Mock
+
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.core.schema.mutation import MarkAllRepliesAsRead
+from howsmytrack.schema import schema
+
+
+class MarkAllRepliesAsReadTest(TestCase):
+    def setUp(self):
+        self.feedback_group = FeedbackGroup(name="name")
+        self.feedback_group.save()
+
+        self.graham = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.graham.save()
+        self.lewis = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.lewis.save()
+
+        graham_request = FeedbackRequest(
+            user=self.graham,
+            media_url="https://soundcloud.com/ruairidx/grey",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.HIPHOP.name,
+        )
+        graham_request.save()
+        lewis_request = FeedbackRequest(
+            user=self.lewis,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.HIPHOP.name,
+        )
+        lewis_request.save()
+
+        # Lewis's feedback for Graham, and Graham's for Lewis.
+        self.lewis_response = FeedbackResponse(
+            user=self.lewis,
+            feedback_request=graham_request,
+            feedback="feedback",
+            submitted=True,
+            allow_replies=True,
+        )
+        self.lewis_response.save()
+        self.graham_response = FeedbackResponse(
+            user=self.graham,
+            feedback_request=lewis_request,
+            feedback="feedback",
+            submitted=True,
+            allow_replies=True,
+        )
+        self.graham_response.save()
+
+        for feedback_response, user in [
+            (self.lewis_response, self.graham),
+            (self.lewis_response, self.graham),
+            (self.graham_response, self.graham),
+            (self.graham_response, self.lewis),
+        ]:
+            FeedbackResponseReply(
+                feedback_response=feedback_response,
+                user=user,
+                text="this is a reply",
+                allow_replies=True,
+            ).save()
+
+    def mark_all_replies_as_read(self, user, **kwargs):
+        info = Mock()
+        info.context.user = user
+        return (
+            schema.get_mutation_type()
+            .fields["markAllRepliesAsRead"]
+            .resolver(self=Mock(), info=info, **kwargs)
+        )
+
+    def get_unread_replies(self, user):
+        return FeedbackResponseReply.objects.filter(time_read__isnull=True).exclude(
+            user=user
+        )
+
+    def test_logged_out(self):
+        info = Mock()
+        result = (
+            schema.get_mutation_type()
+            .fields["markAllRepliesAsRead"]
+            .resolver(self=Mock(), info=info, feedback_group_id=1)
+        )
+
+        self.assertEqual(
+            result, MarkAllRepliesAsRead(success=False, error="Not logged in.")
+        )
+
+    def test_bad_arguments(self):
+        error = MarkAllRepliesAsRead(
+            success=False,
+            error="Exactly one of feedback_response_id and feedback_group_id is required",
+        )
+        self.assertEqual(self.mark_all_replies_as_read(self.lewis.user), error)
+        self.assertEqual(
+            self.mark_all_replies_as_read(
+                self.lewis.user,
+                feedback_response_id=self.lewis_response.id,
+                feedback_group_id=self.feedback_group.id,
+            ),
+            error,
+        )
+
+    def test_feedback_response(self):
+        result = self.mark_all_replies_as_read(
+            self.lewis.user, feedback_response_id=self.lewis_response.id,
+        )
+
+        self.assertEqual(
+            result, MarkAllRepliesAsRead(success=True, error=None, count=2)
+        )
+        # Graham's reply on Lewis's other response is still unread.
+        self.assertEqual(self.get_unread_replies(self.lewis).count(), 1)
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 1)
+
+    def test_feedback_group(self):
+        result = self.mark_all_replies_as_read(
+            self.lewis.user, feedback_group_id=self.feedback_group.id,
+        )
+
+        self.assertEqual(
+            result, MarkAllRepliesAsRead(success=True, error=None, count=3)
+        )
+        self.assertEqual(self.get_unread_replies(self.lewis).count(), 0)
+        # Lewis's reply to Graham is still unread.
+        self.assertEqual(self.get_unread_replies(self.graham).count(), 1)
+
+    def test_other_feedback_group(self):
+        result = self.mark_all_replies_as_read(self.lewis.user, feedback_group_id=1901)
+
+        self.assertEqual(
+            result, MarkAllRepliesAsRead(success=True, error=None, count=0)
+        )
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 0)
@@ -2,6 +2,7 @@ from unittest.mock import Mock
 
 from django.test import TestCase
 
+from howsmytrack.core.models import FeedbackGroup
 from howsmytrack.core.models import FeedbackGroupsUser
 from howsmytrack.core.models import FeedbackRequest
 from howsmytrack.core.models import FeedbackResponse
@@ -75,7 +76,7 @@ class MarkRepliesAsReadTest(TestCase):
             .resolver(self=Mock(), info=info, reply_ids=[1],)
         )
 
-        self.assertEqual(result, MarkRepliesAsRead(success=True, error=None,))
+        self.assertEqual(result, MarkRepliesAsRead(success=True, error=None, count=0))
 
         self.assertEqual(
             FeedbackResponseReply.objects.filter(time_read__isnull=True,).count(), 1,
@@ -91,7 +92,7 @@ class MarkRepliesAsReadTest(TestCase):
             .resolver(self=Mock(), info=info, reply_ids=[1],)
         )
 
-        self.assertEqual(result, MarkRepliesAsRead(success=True, error=None,))
+        self.assertEqual(result, MarkRepliesAsRead(success=True, error=None, count=1))
 
         self.assertEqual(
             FeedbackResponseReply.objects.filter(
@@ -99,3 +100,39 @@ class MarkRepliesAsReadTest(TestCase):
             ).count(),
             1,
         )
+
+    def test_single_update(self):
+        feedback_group = FeedbackGroup(name="name")
+        feedback_group.save()
+        self.feedback_request.feedback_group = feedback_group
+        self.feedback_request.save()
+        second_reply = FeedbackResponseReply(
+            feedback_response=self.feedback_response,
+            user=self.request_user,
+            text="this is another reply",
+            allow_replies=True,
+        )
+        second_reply.save()
+
+        info = Mock()
+        info.context = Mock()
+        info.context.user = self.response_user.user
+        # User lookup, then the group version and reply updates in a
+        # transaction; the replies are never loaded.
+        with self.assertNumQueries(5):
+            result = (
+                schema.get_mutation_type()
+                .fields["markRepliesAsRead"]
+                .resolver(
+                    self=Mock(),
+                    info=info,
+                    reply_ids=[self.feedback_response_reply.id, second_reply.id],
+                )
+            )
+
+        self.assertEqual(result, MarkRepliesAsRead(success=True, error=None, count=2))
+        self.assertEqual(
+            FeedbackResponseReply.objects.filter(time_read__isnull=True,).count(), 0,
+        )
+        feedback_group.refresh_from_db()
+        self.assertEqual(feedback_group.version, 1)
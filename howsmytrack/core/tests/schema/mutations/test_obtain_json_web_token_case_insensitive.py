@@ -81,6 +81,29 @@ class ObtainJSONWebTokenCaseInsensitiveTest(TestCase):
             "GRAHAM@brightonandhovealbion.com",
         )
 
+    def test_duplicates_different_case(self):
+        """If no account matches exactly, log into the oldest one."""
+        duplicate_user = FeedbackGroupsUser.create(
+            email="Graham@brightonandhovealbion.com", password="password",
+        )
+        duplicate_user.save()
+
+        info = Mock()
+        result = (
+            schema.get_mutation_type()
+            .fields["tokenAuth"]
+            .resolver(
+                root=Mock(),
+                info=info,
+                username="GRAHAM@brightonandhovealbion.com",
+                password="password",
+            )
+        )
+        self.assertEqual(
+            graphql_jwt.utils.jwt_decode(result.token).get("username"),
+            "graham@brightonandhovealbion.com",
+        )
+
     def test_different_username(self):
         info = Mock()
         with self.assertRaises(graphql_jwt.exceptions.JSONWebTokenError):
@@ -220,6 +220,42 @@ class RateFeedbackResponseTest(TestCase):
                 feedback="feedback",
                 submitted=True,
                 rating=3,
+                time_rated__isnull=False,
             ).count(),
             1,
         )
+
+    def test_single_update(self):
+        info = Mock()
+        info.context = Mock()
+        info.context.user = self.request_user.user
+        rate_feedback_response = schema.get_mutation_type().fields[
+            "rateFeedbackResponse"
+        ]
+
+        # User lookup, then the rating and group version updates in a
+        # transaction; the response is never read.
+        with self.assertNumQueries(5):
+            result = rate_feedback_response.resolver(
+                self=Mock(),
+                info=info,
+                feedback_response_id=self.feedback_response.id,
+                rating=3,
+            )
+        self.assertEqual(result, RateFeedbackResponse(success=True, error=None,))
+
+        # The rating is checked by the update, so rating again fails.
+        result = rate_feedback_response.resolver(
+            self=Mock(),
+            info=info,
+            feedback_response_id=self.feedback_response.id,
+            rating=4,
+        )
+        self.assertEqual(
+            result,
+            RateFeedbackResponse(
+                success=False, error="Feedback has already been rated"
+            ),
+        )
+        self.feedback_response.refresh_from_db()
+        self.assertEqual(self.feedback_response.rating, 3)
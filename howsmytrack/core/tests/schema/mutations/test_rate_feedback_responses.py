@@ -0,0 +1,259 @@
+import json
+from unittest.mock import Mock
+
+from django.test import Client
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.core.schema.mutations.rate_feedback_responses import (
+    RateFeedbackResponseResult,
+)
+from howsmytrack.core.schema.mutations.rate_feedback_responses import (
+    RateFeedbackResponses,
+)
+from howsmytrack.schema import schema
+
+
+class RateFeedbackResponsesTest(TestCase):
+    def setUp(self):
+        self.feedback_group = FeedbackGroup(name="name")
+        self.feedback_group.save()
+
+        self.request_user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.request_user.save()
+        self.feedback_request = FeedbackRequest(
+            user=self.request_user,
+            media_url="https://soundcloud.com/ruairidx/grey",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.HIPHOP.name,
+        )
+        self.feedback_request.save()
+
+        self.feedback_responses = []
+        for i, email in enumerate(
+            [
+                "lewis@brightonandhovealbion.com",
+                "alexis@brightonandhovealbion.com",
+                "davy@brightonandhovealbion.com",
+            ]
+        ):
+            response_user = FeedbackGroupsUser.create(email=email, password="password")
+            response_user.save()
+            FeedbackRequest(
+                user=response_user,
+                media_url=f"https://soundcloud.com/ruairidx/bruno{i}",
+                media_type=MediaTypeChoice.SOUNDCLOUD.name,
+                feedback_group=self.feedback_group,
+                genre=GenreChoice.HIPHOP.name,
+            ).save()
+            feedback_response = FeedbackResponse(
+                user=response_user,
+                feedback_request=self.feedback_request,
+                feedback="feedback",
+                submitted=True,
+            )
+            feedback_response.save()
+            self.feedback_responses.append(feedback_response)
+
+        # Feedback from the request user, which they can't rate themselves.
+        self.other_feedback_response = FeedbackResponse(
+            user=self.request_user,
+            feedback_request=FeedbackRequest.objects.get(user=response_user),
+            feedback="feedback",
+            submitted=True,
+        )
+        self.other_feedback_response.save()
+
+    def rate(self, user, ratings):
+        info = Mock()
+        info.context.user = user
+        return (
+            schema.get_mutation_type()
+            .fields["rateFeedbackResponses"]
+            .resolver(
+                self=Mock(),
+                info=info,
+                feedback_responses=[
+                    {"feedback_response_id": feedback_response_id, "rating": rating}
+                    for feedback_response_id, rating in ratings
+                ],
+            )
+        )
+
+    def test_logged_out(self):
+        info = Mock()
+        info.context.user.is_anonymous = True
+        result = (
+            schema.get_mutation_type()
+            .fields["rateFeedbackResponses"]
+            .resolver(self=Mock(), info=info, feedback_responses=[])
+        )
+
+        self.assertEqual(
+            result,
+            RateFeedbackResponses(success=False, error="Not logged in.", results=[]),
+        )
+
+    def test_rate_all(self):
+        ratings = [
+            (feedback_response.id, i + 3)
+            for i, feedback_response in enumerate(self.feedback_responses)
+        ]
+
+        # Ownership check, bulk update and group version bump, plus the
+        # transaction's savepoint and release.
+        with self.assertNumQueries(5):
+            result = self.rate(self.request_user.user, ratings)
+
+        self.assertEqual(
+            result,
+            RateFeedbackResponses(
+                success=True,
+                error=None,
+                results=[
+                    RateFeedbackResponseResult(
+                        feedback_response_id=feedback_response_id,
+                        success=True,
+                        error=None,
+                    )
+                    for feedback_response_id, _ in ratings
+                ],
+            ),
+        )
+        for feedback_response, (_, rating) in zip(self.feedback_responses, ratings):
+            feedback_response.refresh_from_db()
+            self.assertEqual(feedback_response.rating, rating)
+            self.assertIsNotNone(feedback_response.time_rated)
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 1)
+
+    def test_partial(self):
+        already_rated, unsubmitted, to_rate = self.feedback_responses
+        already_rated.rating = 2
+        already_rated.save()
+        unsubmitted.submitted = False
+        unsubmitted.save()
+
+        result = self.rate(
+            self.request_user.user,
+            [
+                (already_rated.id, 5),
+                (unsubmitted.id, 5),
+                (to_rate.id, 0),
+                (to_rate.id, 4),
+                (to_rate.id, 5),
+                (self.other_feedback_response.id, 5),
+                (1901, 5),
+            ],
+        )
+
+        self.assertEqual(
+            result,
+            RateFeedbackResponses(
+                success=False,
+                error=None,
+                results=[
+                    RateFeedbackResponseResult(
+                        feedback_response_id=already_rated.id,
+                        success=False,
+                        error="Feedback has already been rated",
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=unsubmitted.id,
+                        success=False,
+                        error="This feedback has not been submitted and cannot be rated.",
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=to_rate.id,
+                        success=False,
+                        error="Invalid rating",
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=to_rate.id, success=True, error=None,
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=to_rate.id,
+                        success=False,
+                        error="Feedback has already been rated",
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=self.other_feedback_response.id,
+                        success=False,
+                        error="Invalid feedback_response_id",
+                    ),
+                    RateFeedbackResponseResult(
+                        feedback_response_id=1901,
+                        success=False,
+                        error="Invalid feedback_response_id",
+                    ),
+                ],
+            ),
+        )
+        already_rated.refresh_from_db()
+        self.assertEqual(already_rated.rating, 2)
+        unsubmitted.refresh_from_db()
+        self.assertIsNone(unsubmitted.rating)
+        to_rate.refresh_from_db()
+        self.assertEqual(to_rate.rating, 4)
+        self.other_feedback_response.refresh_from_db()
+        self.assertIsNone(self.other_feedback_response.rating)
+
+    def test_none_rated(self):
+        with self.assertNumQueries(3):
+            result = self.rate(self.request_user.user, [(1901, 5)])
+
+        self.assertFalse(result.success)
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 0)
+
+    def test_graphql(self):
+        client = Client()
+        client.force_login(
+            self.request_user.user, backend="django.contrib.auth.backends.ModelBackend",
+        )
+        response = client.post(
+            "/graphql/",
+            json.dumps(
+                {
+                    "query": """
+                        mutation ($feedbackResponses: [RateFeedbackResponseInput!]!) {
+                            rateFeedbackResponses(feedbackResponses: $feedbackResponses) {
+                                success
+                                results { feedbackResponseId success error }
+                            }
+                        }
+                    """,
+                    "variables": {
+                        "feedbackResponses": [
+                            {
+                                "feedbackResponseId": self.feedback_responses[0].id,
+                                "rating": 5,
+                            }
+                        ]
+                    },
+                }
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(
+            response.json()["data"]["rateFeedbackResponses"],
+            {
+                "success": True,
+                "results": [
+                    {
+                        "feedbackResponseId": self.feedback_responses[0].id,
+                        "success": True,
+                        "error": None,
+                    }
+                ],
+            },
+        )
@@ -163,3 +163,41 @@ class SubmitFeedbackResponseTest(TestCase):
             ).count(),
             1,
         )
+
+    def test_single_update(self):
+        info = Mock()
+        info.context = Mock()
+        info.context.user = self.response_user.user
+        submit_feedback_response = schema.get_mutation_type().fields[
+            "submitFeedbackResponse"
+        ]
+
+        # User lookup, then the feedback and group version updates in a
+        # transaction; the response is never read.
+        with self.assertNumQueries(5):
+            result = submit_feedback_response.resolver(
+                self=Mock(),
+                info=info,
+                feedback_response_id=self.feedback_response.id,
+                feedback="feedback",
+                allow_replies=False,
+            )
+        self.assertEqual(result, SubmitFeedbackResponse(success=True, error=None,))
+
+        # `submitted` is checked by the update, so submitting again fails.
+        result = submit_feedback_response.resolver(
+            self=Mock(),
+            info=info,
+            feedback_response_id=self.feedback_response.id,
+            feedback="new feedback",
+            allow_replies=True,
+        )
+        self.assertEqual(
+            result,
+            SubmitFeedbackResponse(
+                success=False, error="Feedback has already been submitted",
+            ),
+        )
+        self.feedback_response.refresh_from_db()
+        self.assertEqual(self.feedback_response.feedback, "feedback")
+        self.assertFalse(self.feedback_response.allow_replies)
@@ -0,0 +1,248 @@
+import json
+from unittest.mock import Mock
+
+from django.test import Client
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.core.schema.mutations.submit_feedback_responses import (
+    SubmitFeedbackResponseResult,
+)
+from howsmytrack.core.schema.mutations.submit_feedback_responses import (
+    SubmitFeedbackResponses,
+)
+from howsmytrack.schema import schema
+
+
+class SubmitFeedbackResponsesTest(TestCase):
+    def setUp(self):
+        self.feedback_group = FeedbackGroup(name="name")
+        self.feedback_group.save()
+
+        self.response_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.response_user.save()
+        self.response_user_request = FeedbackRequest(
+            user=self.response_user,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.HIPHOP.name,
+        )
+        self.response_user_request.save()
+
+        self.feedback_responses = []
+        for i, email in enumerate(
+            [
+                "graham@brightonandhovealbion.com",
+                "alexis@brightonandhovealbion.com",
+                "davy@brightonandhovealbion.com",
+            ]
+        ):
+            request_user = FeedbackGroupsUser.create(email=email, password="password")
+            request_user.save()
+            feedback_request = FeedbackRequest(
+                user=request_user,
+                media_url=f"https://soundcloud.com/ruairidx/grey{i}",
+                media_type=MediaTypeChoice.SOUNDCLOUD.name,
+                feedback_group=self.feedback_group,
+                genre=GenreChoice.HIPHOP.name,
+            )
+            feedback_request.save()
+            feedback_response = FeedbackResponse(
+                user=self.response_user, feedback_request=feedback_request,
+            )
+            feedback_response.save()
+            self.feedback_responses.append(feedback_response)
+
+        # Feedback for the response user, which they can't submit themselves.
+        self.other_feedback_response = FeedbackResponse(
+            user=request_user, feedback_request=self.response_user_request,
+        )
+        self.other_feedback_response.save()
+
+    def submit(self, user, feedback_responses):
+        info = Mock()
+        info.context.user = user
+        return (
+            schema.get_mutation_type()
+            .fields["submitFeedbackResponses"]
+            .resolver(
+                self=Mock(),
+                info=info,
+                feedback_responses=[
+                    {
+                        "feedback_response_id": feedback_response_id,
+                        "feedback": f"feedback {feedback_response_id}",
+                        "allow_replies": True,
+                    }
+                    for feedback_response_id in feedback_responses
+                ],
+            )
+        )
+
+    def test_logged_out(self):
+        info = Mock()
+        info.context.user.is_anonymous = True
+        result = (
+            schema.get_mutation_type()
+            .fields["submitFeedbackResponses"]
+            .resolver(self=Mock(), info=info, feedback_responses=[])
+        )
+
+        self.assertEqual(
+            result,
+            SubmitFeedbackResponses(success=False, error="Not logged in.", results=[]),
+        )
+
+    def test_submit_all(self):
+        feedback_response_ids = [
+            feedback_response.id for feedback_response in self.feedback_responses
+        ]
+
+        # Ownership check, bulk update and group version bump, plus the
+        # transaction's savepoint and release.
+        with self.assertNumQueries(5):
+            result = self.submit(self.response_user.user, feedback_response_ids)
+
+        self.assertEqual(
+            result,
+            SubmitFeedbackResponses(
+                success=True,
+                error=None,
+                results=[
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=feedback_response_id,
+                        success=True,
+                        error=None,
+                    )
+                    for feedback_response_id in feedback_response_ids
+                ],
+            ),
+        )
+        for feedback_response in self.feedback_responses:
+            feedback_response.refresh_from_db()
+            self.assertTrue(feedback_response.submitted)
+            self.assertTrue(feedback_response.allow_replies)
+            self.assertIsNotNone(feedback_response.time_submitted)
+            self.assertEqual(
+                feedback_response.feedback, f"feedback {feedback_response.id}"
+            )
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 1)
+
+    def test_partial(self):
+        already_submitted, to_submit, _ = self.feedback_responses
+        already_submitted.feedback = "old feedback"
+        already_submitted.submitted = True
+        already_submitted.save()
+
+        result = self.submit(
+            self.response_user.user,
+            [
+                already_submitted.id,
+                to_submit.id,
+                to_submit.id,
+                self.other_feedback_response.id,
+                1901,
+            ],
+        )
+
+        self.assertEqual(
+            result,
+            SubmitFeedbackResponses(
+                success=False,
+                error=None,
+                results=[
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=already_submitted.id,
+                        success=False,
+                        error="Feedback has already been submitted",
+                    ),
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=to_submit.id, success=True, error=None,
+                    ),
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=to_submit.id,
+                        success=False,
+                        error="Feedback has already been submitted",
+                    ),
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=self.other_feedback_response.id,
+                        success=False,
+                        error="Invalid feedback_response_id",
+                    ),
+                    SubmitFeedbackResponseResult(
+                        feedback_response_id=1901,
+                        success=False,
+                        error="Invalid feedback_response_id",
+                    ),
+                ],
+            ),
+        )
+        already_submitted.refresh_from_db()
+        self.assertEqual(already_submitted.feedback, "old feedback")
+        to_submit.refresh_from_db()
+        self.assertTrue(to_submit.submitted)
+        self.other_feedback_response.refresh_from_db()
+        self.assertFalse(self.other_feedback_response.submitted)
+
+    def test_none_submitted(self):
+        with self.assertNumQueries(3):
+            result = self.submit(self.response_user.user, [1901])
+
+        self.assertFalse(result.success)
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 0)
+
+    def test_graphql(self):
+        client = Client()
+        client.force_login(
+            self.response_user.user,
+            backend="django.contrib.auth.backends.ModelBackend",
+        )
+        response = client.post(
+            "/graphql/",
+            json.dumps(
+                {
+                    "query": """
+                        mutation ($feedbackResponses: [SubmitFeedbackResponseInput!]!) {
+                            submitFeedbackResponses(feedbackResponses: $feedbackResponses) {
+                                success
+                                results { feedbackResponseId success error }
+                            }
+                        }
+                    """,
+                    "variables": {
+                        "feedbackResponses": [
+                            {
+                                "feedbackResponseId": self.feedback_responses[0].id,
+                                "feedback": "feedback",
+                                "allowReplies": False,
+                            }
+                        ]
+                    },
+                }
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(
+            response.json()["data"]["submitFeedbackResponses"],
+            {
+                "success": True,
+                "results": [
+                    {
+                        "feedbackResponseId": self.feedback_responses[0].id,
+                        "success": True,
+                        "error": None,
+                    }
+                ],
+            },
+        )
@@ -1,12 +1,20 @@
 import datetime
+from unittest.mock import Mock
+from unittest.mock import patch
 
 import pytz
 from django.test import TestCase
 
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.models import Lease
 from howsmytrack.core.models import truncate_string
 
 
 DEFAULT_DATETIME = datetime.datetime(1991, 11, 21, tzinfo=pytz.utc)
+LEASE_DURATION = datetime.timedelta(seconds=60)
 
 
 class TruncateStringTest(TestCase):
@@ -19,3 +27,100 @@ class TruncateStringTest(TestCase):
         string = "a" * 75
         truncated_string = truncate_string(string)
         self.assertEqual(truncated_string, "a" * 50 + "…")
+
+
+class FeedbackResponseReplyTest(TestCase):
+    def setUp(self):
+        user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        user.save()
+        feedback_request = FeedbackRequest(
+            user=user, media_url="https://soundcloud.com/ruairidx/grey",
+        )
+        feedback_request.save()
+        self.feedback_response = FeedbackResponse(
+            feedback_request=feedback_request, user=user,
+        )
+        self.feedback_response.save()
+
+    def add_reply(self, allow_replies, time_created):
+        with patch("django.utils.timezone.now", Mock(return_value=time_created)):
+            reply = FeedbackResponseReply(
+                feedback_response=self.feedback_response,
+                user=self.feedback_response.user,
+                text="text",
+                allow_replies=allow_replies,
+            )
+            reply.save()
+        self.feedback_response.refresh_from_db()
+        return reply
+
+    def test_reply_state(self):
+        self.assertTrue(self.feedback_response.allow_further_replies)
+        self.assertIsNone(self.feedback_response.last_reply_at)
+
+        reply = self.add_reply(True, DEFAULT_DATETIME)
+        self.assertTrue(self.feedback_response.allow_further_replies)
+        self.assertEqual(self.feedback_response.last_reply_at, DEFAULT_DATETIME)
+
+        closing_time = DEFAULT_DATETIME + datetime.timedelta(days=1)
+        self.add_reply(False, closing_time)
+        self.assertFalse(self.feedback_response.allow_further_replies)
+        self.assertEqual(self.feedback_response.last_reply_at, closing_time)
+
+        # Replies can't reopen the conversation.
+        self.add_reply(True, closing_time + datetime.timedelta(days=1))
+        self.assertFalse(self.feedback_response.allow_further_replies)
+
+    def test_edit_reply(self):
+        reply = self.add_reply(True, DEFAULT_DATETIME)
+
+        # e.g. in the admin; this closes the conversation but isn't a new reply.
+        reply.allow_replies = False
+        reply.save()
+        self.feedback_response.refresh_from_db()
+
+        self.assertFalse(self.feedback_response.allow_further_replies)
+        self.assertEqual(self.feedback_response.last_reply_at, DEFAULT_DATETIME)
+
+
+class LeaseTest(TestCase):
+    def test_acquire_new_lease(self):
+        self.assertTrue(Lease.acquire("lease", "graham", LEASE_DURATION))
+        self.assertEqual(Lease.objects.get(name="lease").holder, "graham")
+
+    def test_acquire_held_lease(self):
+        Lease.acquire("lease", "graham", LEASE_DURATION)
+        self.assertFalse(Lease.acquire("lease", "lewis", LEASE_DURATION))
+        self.assertEqual(Lease.objects.get(name="lease").holder, "graham")
+
+    def test_renew_lease(self):
+        with patch("django.utils.timezone.now", Mock(return_value=DEFAULT_DATETIME)):
+            Lease.acquire("lease", "graham", LEASE_DURATION)
+        with patch(
+            "django.utils.timezone.now",
+            Mock(return_value=DEFAULT_DATETIME + LEASE_DURATION / 2),
+        ):
+            self.assertTrue(Lease.acquire("lease", "graham", LEASE_DURATION))
+        self.assertEqual(
+            Lease.objects.get(name="lease").expires_at,
+            DEFAULT_DATETIME + LEASE_DURATION * 1.5,
+        )
+
+    def test_acquire_expired_lease(self):
+        with patch("django.utils.timezone.now", Mock(return_value=DEFAULT_DATETIME)):
+            Lease.acquire("lease", "graham", LEASE_DURATION)
+        with patch(
+            "django.utils.timezone.now",
+            Mock(return_value=DEFAULT_DATETIME + LEASE_DURATION * 2),
+        ):
+            self.assertTrue(Lease.acquire("lease", "lewis", LEASE_DURATION))
+        self.assertEqual(Lease.objects.get(name="lease").holder, "lewis")
+
+    def test_release(self):
+        Lease.acquire("lease", "graham", LEASE_DURATION)
+        Lease.release("lease", "lewis")
+        self.assertEqual(Lease.objects.filter(name="lease").count(), 1)
+        Lease.release("lease", "graham")
+        self.assertEqual(Lease.objects.filter(name="lease").count(), 0)
@@ -0,0 +1,59 @@
+import asyncio
+from urllib.parse import urlencode
+
+from django.test import override_settings
+from django.test import TransactionTestCase
+from graphql_jwt.shortcuts import get_token
+
+from howsmytrack.core.asgi import HowsMyTrackASGIHandler
+from howsmytrack.core.models import FeedbackGroupsUser
+
+
+async def get(application, path, query, cookie):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": urlencode(query).encode(),
+            "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+        },
+        receive,
+        send,
+    )
+    return messages
+
+
+# Requests are run in other threads, so data must be committed to be seen.
+class ASGIHandlerTest(TransactionTestCase):
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+
+    @override_settings(ASGI_THREADS=2, ALLOWED_HOSTS=["localhost"])
+    def test_graphql(self):
+        application = HowsMyTrackASGIHandler()
+        cookie = f"JWT={get_token(self.user.user)}"
+        query = {"query": "{ userDetails { username } }"}
+
+        async def get_concurrently():
+            return await asyncio.gather(
+                *[get(application, "/graphql/", query, cookie) for _ in range(4)]
+            )
+
+        messages = asyncio.run(get_concurrently())
+
+        self.assertEqual(application.executor._max_workers, 2)
+        for start, body in messages:
+            self.assertEqual(start["status"], 200)
+            self.assertIn(b"graham@brightonandhovealbion.com", body["body"])
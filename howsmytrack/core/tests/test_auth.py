@@ -0,0 +1,172 @@
+import base64
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import Client
+from django.test import override_settings
+from django.test import TestCase
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.shortcuts import get_token
+
+from howsmytrack.core import auth
+from howsmytrack.core.auth import get_user_by_token
+from howsmytrack.core.auth import verified_tokens
+from howsmytrack.core.models import FeedbackGroupsUser
+
+
+USER_DETAILS_QUERY = "{ userDetails { username } }"
+
+
+@override_settings(JWT_VERIFICATION_CACHE={"MAX_SIZE": 2, "TTL": timedelta(minutes=1)})
+class VerifiedTokenCacheTest(TestCase):
+    def setUp(self):
+        verified_tokens.clear()
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.token = get_token(self.user.user)
+
+    def get_username(self, token):
+        client = Client()
+        client.cookies["JWT"] = token
+        response = client.post(
+            "/graphql/",
+            json.dumps({"query": USER_DETAILS_QUERY}),
+            content_type="application/json",
+        )
+        user_details = response.json()["data"]["userDetails"]
+        return user_details and user_details["username"]
+
+    def test_cached(self):
+        self.assertEqual(get_user_by_token(self.token), self.user.user)
+
+        with patch.object(auth, "get_payload") as get_payload, self.assertNumQueries(0):
+            self.assertEqual(get_user_by_token(self.token), self.user.user)
+        get_payload.assert_not_called()
+
+        self.assertEqual(
+            self.get_username(self.token), "graham@brightonandhovealbion.com"
+        )
+
+    def test_cached_user_is_copied(self):
+        user = get_user_by_token(self.token)
+        user.username = "changed"
+        # Loads the related object into the user's `_state`.
+        self.assertEqual(user.feedbackgroupsuser, self.user)
+
+        user = get_user_by_token(self.token)
+        self.assertEqual(user.username, "graham@brightonandhovealbion.com")
+        self.assertEqual(user._state.db, "default")
+        self.assertFalse(user._state.adding)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.feedbackgroupsuser, self.user)
+
+    def test_tampered_payload(self):
+        get_user_by_token(self.token)
+        # Another user's username, with the original signature.
+        header, payload, signature = self.token.split(".")
+        payload = json.loads(base64.urlsafe_b64decode(payload + "=="))
+        payload["username"] = "lewis@brightonandhovealbion.com"
+        payload = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        tampered_token = ".".join([header, payload.rstrip("="), signature])
+
+        with self.assertRaises(JSONWebTokenError):
+            get_user_by_token(tampered_token)
+
+    def test_ttl(self):
+        get_user_by_token(self.token)
+        expires_at = verified_tokens.entries[auth.get_token_key(self.token)].expires_at
+
+        # Expired entries are verified and looked up again.
+        with patch("time.time", return_value=expires_at), self.assertNumQueries(1):
+            get_user_by_token(self.token)
+
+    def test_token_expiry(self):
+        get_user_by_token(self.token)
+
+        # Tokens expire long after the TTL, so the TTL applies.
+        entry = verified_tokens.entries[auth.get_token_key(self.token)]
+        self.assertLess(entry.expires_at, entry.payload["exp"])
+
+        with override_settings(
+            JWT_VERIFICATION_CACHE={"MAX_SIZE": 2, "TTL": timedelta(days=30)}
+        ):
+            verified_tokens.set("token", entry.payload, self.user.user)
+        self.assertEqual(
+            verified_tokens.entries["token"].expires_at, entry.payload["exp"]
+        )
+
+    def test_bounded(self):
+        other_users = []
+        for email in [
+            "lewis@brightonandhovealbion.com",
+            "davy@brightonandhovealbion.com",
+        ]:
+            user = FeedbackGroupsUser.create(email=email, password="password")
+            user.save()
+            other_users.append(user)
+
+        get_user_by_token(self.token)
+        for user in other_users:
+            get_user_by_token(get_token(user.user))
+
+        self.assertEqual(len(verified_tokens.entries), 2)
+        self.assertIsNone(verified_tokens.get(auth.get_token_key(self.token)))
+
+    @override_settings(JWT_VERIFICATION_CACHE={"MAX_SIZE": 0, "TTL": timedelta(0)})
+    def test_disabled(self):
+        get_user_by_token(self.token)
+
+        self.assertEqual(len(verified_tokens.entries), 0)
+
+    def test_logout(self):
+        get_user_by_token(self.token)
+        client = Client()
+        client.cookies["JWT"] = self.token
+
+        client.get("/logout/")
+
+        self.assertEqual(len(verified_tokens.entries), 0)
+        # Logging out without a token is fine too.
+        Client().get("/logout/")
+
+    def test_update_email(self):
+        self.assertEqual(
+            self.get_username(self.token), "graham@brightonandhovealbion.com"
+        )
+
+        client = Client()
+        client.cookies["JWT"] = self.token
+        client.post(
+            "/graphql/",
+            json.dumps(
+                {
+                    "query": 'mutation { updateEmail(email: "graham@brighton.com") { success } }'
+                }
+            ),
+            content_type="application/json",
+        )
+
+        # The old token is for the old username.
+        self.assertIsNone(self.get_username(self.token))
+
+    def test_password_change(self):
+        get_user_by_token(self.token)
+
+        self.user.user.set_password("new password")
+        self.user.user.save()
+
+        self.assertEqual(len(verified_tokens.entries), 0)
+
+    def test_other_users_not_invalidated(self):
+        other_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        other_user.save()
+        get_user_by_token(self.token)
+
+        other_user.user.save()
+
+        self.assertEqual(len(verified_tokens.entries), 1)
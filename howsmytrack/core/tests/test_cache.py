@@ -0,0 +1,310 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from howsmytrack.core.auth import get_user_by_natural_key
+from howsmytrack.core.cache import bump_version
+from howsmytrack.core.cache import get_or_compute
+from howsmytrack.core.cache import get_version
+from howsmytrack.core.cache import get_version_key
+from howsmytrack.core.cache import MEDIA_INFO_TIMEOUT
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.schema import schema
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def get_cache_requests(name, result):
+    return (
+        REGISTRY.get_sample_value(
+            "howsmytrack_cache_requests_total", {"cache": name, "result": result},
+        )
+        or 0
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_compute(self):
+        hits_before = get_cache_requests("test", "hit")
+        misses_before = get_cache_requests("test", "miss")
+        compute = Mock(return_value="value")
+
+        for _ in range(3):
+            self.assertEqual(
+                get_or_compute("test", "key", compute, MEDIA_INFO_TIMEOUT), "value"
+            )
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(get_cache_requests("test", "hit"), hits_before + 2)
+        self.assertEqual(get_cache_requests("test", "miss"), misses_before + 1)
+
+    def test_get_or_compute_none(self):
+        compute = Mock(return_value=None)
+
+        get_or_compute("test", "key", compute, MEDIA_INFO_TIMEOUT)
+        get_or_compute("test", "key", compute, MEDIA_INFO_TIMEOUT)
+
+        self.assertEqual(compute.call_count, 2)
+
+    def test_bump_version(self):
+        compute = Mock(side_effect=["old", "new"])
+
+        def get_value():
+            return get_or_compute(
+                "test",
+                "key",
+                compute,
+                MEDIA_INFO_TIMEOUT,
+                version=get_version("test", 1),
+            )
+
+        self.assertEqual(get_value(), "old")
+        self.assertEqual(get_value(), "old")
+        bump_version("test", 1)
+        self.assertEqual(get_value(), "new")
+
+    def test_version_evicted(self):
+        with patch("howsmytrack.core.cache.time.time", return_value=1000):
+            version = get_version("test", 1)
+        cache.delete(get_version_key("test", 1))
+        with patch("howsmytrack.core.cache.time.time", return_value=1001):
+            bump_version("test", 1)
+
+        # Restarting from 1 could serve values cached under old versions.
+        self.assertGreater(get_version("test", 1), version)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.other_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.other_user.save()
+
+        self.feedback_group = FeedbackGroup(name="name")
+        self.feedback_group.save()
+
+        self.user_feedback_request = FeedbackRequest(
+            user=self.user,
+            media_url="https://soundcloud.com/ruairidx/grey",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.NO_GENRE.name,
+        )
+        self.user_feedback_request.save()
+        self.other_feedback_request = FeedbackRequest(
+            user=self.other_user,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=self.feedback_group,
+            genre=GenreChoice.NO_GENRE.name,
+        )
+        self.other_feedback_request.save()
+
+        self.user_feedback_response = FeedbackResponse(
+            feedback_request=self.other_feedback_request, user=self.user,
+        )
+        self.user_feedback_response.save()
+        self.other_feedback_response = FeedbackResponse(
+            feedback_request=self.user_feedback_request,
+            user=self.other_user,
+            feedback="feedback",
+            submitted=True,
+            allow_replies=True,
+        )
+        self.other_feedback_response.save()
+
+        self.info = Mock()
+        self.info.context.user = self.user.user
+
+    def get_user_details(self, feedback_groups_user=None):
+        info = Mock()
+        info.context.user = (feedback_groups_user or self.user).user
+        return schema.get_query_type().graphene_type().resolve_user_details(info=info)
+
+    def get_feedback_group(self):
+        return (
+            schema.get_query_type()
+            .graphene_type()
+            .resolve_feedback_group(
+                info=self.info, feedback_group_id=self.feedback_group.id,
+            )
+        )
+
+    def run_mutation(self, name, feedback_groups_user=None, **kwargs):
+        info = Mock()
+        info.context.user = (feedback_groups_user or self.user).user
+        return (
+            schema.get_mutation_type()
+            .fields[name]
+            .resolver(self=Mock(), info=info, **kwargs)
+        )
+
+    def test_media_info(self):
+        resolve_media_info = schema.get_query_type().graphene_type().resolve_media_info
+        media_url = "https://soundcloud.com/ruairidx/grey"
+        hits_before = get_cache_requests("media_info", "hit")
+
+        first_result = resolve_media_info(info=self.info, media_url=media_url)
+        second_result = resolve_media_info(info=self.info, media_url=media_url)
+
+        self.assertEqual(first_result, second_result)
+        self.assertEqual(second_result.media_type, MediaTypeChoice.SOUNDCLOUD.name)
+        self.assertEqual(get_cache_requests("media_info", "hit"), hits_before + 1)
+
+    def test_notifications_submit(self):
+        self.assertEqual(self.get_user_details().notifications, 1)
+        with self.assertNumQueries(1):
+            # Only the FeedbackGroupsUser lookup; the counts are cached.
+            self.assertEqual(self.get_user_details().notifications, 1)
+
+        self.run_mutation(
+            "submitFeedbackResponse",
+            feedback_response_id=self.user_feedback_response.id,
+            feedback="feedback",
+            allow_replies=True,
+        )
+
+        self.assertEqual(self.get_user_details().notifications, 0)
+
+    def test_notifications_replies(self):
+        self.assertEqual(self.get_user_details().notifications, 1)
+
+        self.run_mutation(
+            "rateFeedbackResponse",
+            feedback_response_id=self.other_feedback_response.id,
+            rating=5,
+        )
+        self.run_mutation(
+            "addFeedbackResponseReply",
+            feedback_groups_user=self.other_user,
+            feedback_response_id=self.other_feedback_response.id,
+            text="thanks",
+            allow_replies=True,
+        )
+        self.assertEqual(self.get_user_details().notifications, 2)
+
+        reply = FeedbackResponseReply.objects.get(user=self.other_user)
+        self.run_mutation("markRepliesAsRead", reply_ids=[reply.id])
+        self.assertEqual(self.get_user_details().notifications, 1)
+
+    def test_notifications_assign_groups(self):
+        self.assertEqual(self.get_user_details(self.other_user).notifications, 0)
+
+        FeedbackRequest(
+            user=self.other_user,
+            media_url="https://soundcloud.com/ruairidx/bruno2",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            genre=GenreChoice.NO_GENRE.name,
+        ).save()
+        FeedbackRequest(
+            user=self.user,
+            media_url="https://soundcloud.com/ruairidx/grey2",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            genre=GenreChoice.NO_GENRE.name,
+        ).save()
+        call_command("assign_groups")
+
+        self.assertEqual(self.get_user_details(self.other_user).notifications, 1)
+
+    def test_feedback_group_snapshot(self):
+        feedback_group = self.get_feedback_group()
+        self.assertIsNone(feedback_group.feedback_responses[0].feedback)
+
+        with self.assertNumQueries(2):
+            # Only the FeedbackGroupsUser lookup and the version check.
+            self.assertEqual(self.get_feedback_group(), feedback_group)
+
+        self.run_mutation(
+            "submitFeedbackResponse",
+            feedback_response_id=self.user_feedback_response.id,
+            feedback="feedback",
+            allow_replies=True,
+        )
+
+        self.assertEqual(
+            self.get_feedback_group().feedback_responses[0].feedback, "feedback"
+        )
+
+    def test_feedback_group_snapshot_rate(self):
+        self.run_mutation(
+            "submitFeedbackResponse",
+            feedback_response_id=self.user_feedback_response.id,
+            feedback="feedback",
+            allow_replies=True,
+        )
+        self.assertIsNone(self.get_feedback_group().user_feedback_responses[0].rating)
+
+        self.run_mutation(
+            "rateFeedbackResponse",
+            feedback_response_id=self.other_feedback_response.id,
+            rating=5,
+        )
+
+        self.assertEqual(self.get_feedback_group().user_feedback_responses[0].rating, 5)
+        self.feedback_group.refresh_from_db()
+        self.assertEqual(self.feedback_group.version, 2)
+
+    def test_feedback_groups_snapshots(self):
+        resolve_feedback_groups = (
+            schema.get_query_type().graphene_type().resolve_feedback_groups
+        )
+        feedback_groups = resolve_feedback_groups(info=self.info)
+
+        self.assertEqual(self.get_feedback_group(), feedback_groups[0])
+        with self.assertNumQueries(3):
+            # FeedbackGroupsUser, FeedbackRequest and prefetched group requests.
+            self.assertEqual(resolve_feedback_groups(info=self.info), feedback_groups)
+
+    def test_feedback_group_missing(self):
+        resolve_feedback_group = (
+            schema.get_query_type().graphene_type().resolve_feedback_group
+        )
+        self.assertIsNone(
+            resolve_feedback_group(info=self.info, feedback_group_id=1901)
+        )
+
+    def test_user_lookup(self):
+        username = self.user.user.username
+        self.assertEqual(get_user_by_natural_key(username), self.user.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_by_natural_key(username), self.user.user)
+
+        self.user.user.is_active = False
+        self.user.user.save()
+
+        self.assertFalse(get_user_by_natural_key(username).is_active)
+
+    def test_user_lookup_update_email(self):
+        old_username = self.user.user.username
+        self.assertEqual(get_user_by_natural_key(old_username), self.user.user)
+
+        self.run_mutation("updateEmail", email="graham@brighton.com")
+
+        self.assertIsNone(get_user_by_natural_key(old_username))
+        self.assertEqual(get_user_by_natural_key("graham@brighton.com"), self.user.user)
@@ -0,0 +1,194 @@
+import json
+from unittest.mock import Mock
+
+from django.test import Client
+from django.test import TestCase
+from graphql_jwt.shortcuts import get_token
+
+from howsmytrack.core.etags import get_root_fields
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.schema import schema
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+FEEDBACK_GROUPS_QUERY = "query FeedbackGroups { feedbackGroups { id members } }"
+USER_DETAILS_QUERY = "{ userDetails { username notifications } }"
+
+
+class GetRootFieldsTest(TestCase):
+    def test_query(self):
+        self.assertEqual(
+            get_root_fields("{ userDetails { username } feedbackGroups { id } }", None),
+            {"userDetails", "feedbackGroups"},
+        )
+
+    def test_operation_name(self):
+        query = "query A { userDetails { username } } query B { feedbackGroups { id } }"
+        self.assertEqual(get_root_fields(query, "B"), {"feedbackGroups"})
+        self.assertIsNone(get_root_fields(query, None))
+        self.assertIsNone(get_root_fields(query, "C"))
+        self.assertIsNone(get_root_fields("{ userDetails { username } }", "A"))
+
+    def test_not_a_query(self):
+        self.assertIsNone(get_root_fields("mutation { logout { success } }", None))
+        self.assertIsNone(get_root_fields("{ nonsense", None))
+        self.assertIsNone(
+            get_root_fields(
+                "{ ...Details } fragment Details on Query { userDetails { username } }",
+                None,
+            )
+        )
+
+
+class ETagTest(TestCase):
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.other_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.other_user.save()
+
+        feedback_group = FeedbackGroup(name="name")
+        feedback_group.save()
+        FeedbackRequest(
+            user=self.user,
+            media_url="https://soundcloud.com/ruairidx/grey",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=feedback_group,
+            genre=GenreChoice.NO_GENRE.name,
+        ).save()
+        other_feedback_request = FeedbackRequest(
+            user=self.other_user,
+            media_url="https://soundcloud.com/ruairidx/bruno",
+            media_type=MediaTypeChoice.SOUNDCLOUD.name,
+            feedback_group=feedback_group,
+            genre=GenreChoice.NO_GENRE.name,
+        )
+        other_feedback_request.save()
+        self.feedback_response = FeedbackResponse(
+            feedback_request=other_feedback_request, user=self.user,
+        )
+        self.feedback_response.save()
+
+        self.client = Client()
+        self.client.force_login(self.user.user, backend=MODEL_BACKEND)
+
+    def get(self, query, etag=None, **params):
+        headers = {}
+        if etag:
+            headers["HTTP_IF_NONE_MATCH"] = etag
+        return self.client.get("/graphql/", {"query": query, **params}, **headers)
+
+    def test_not_modified(self):
+        response = self.get(USER_DETAILS_QUERY)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+
+        with self.assertNumQueries(3):
+            # Session, user and data version; no resolvers are run.
+            response = self.get(USER_DETAILS_QUERY, etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_modified(self):
+        etag = self.get(FEEDBACK_GROUPS_QUERY)["ETag"]
+
+        info = Mock()
+        info.context.user = self.user.user
+        schema.get_mutation_type().fields["submitFeedbackResponse"].resolver(
+            self=Mock(),
+            info=info,
+            feedback_response_id=self.feedback_response.id,
+            feedback="feedback",
+            allow_replies=True,
+        )
+
+        response = self.get(FEEDBACK_GROUPS_QUERY, etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_different_queries(self):
+        self.assertNotEqual(
+            self.get(USER_DETAILS_QUERY)["ETag"],
+            self.get(FEEDBACK_GROUPS_QUERY)["ETag"],
+        )
+        self.assertNotEqual(
+            self.get(
+                "query ($url: String!) { mediaInfo(mediaUrl: $url) { mediaType } }",
+                variables=json.dumps({"url": "https://soundcloud.com/ruairidx/grey"}),
+            )["ETag"],
+            self.get(
+                "query ($url: String!) { mediaInfo(mediaUrl: $url) { mediaType } }",
+                variables=json.dumps({"url": "https://soundcloud.com/ruairidx/bruno"}),
+            )["ETag"],
+        )
+
+    def test_different_users(self):
+        etag = self.get(USER_DETAILS_QUERY)["ETag"]
+
+        self.client.force_login(self.other_user.user, backend=MODEL_BACKEND)
+        response = self.get(USER_DETAILS_QUERY, etag=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_jwt(self):
+        client = Client()
+        client.cookies["JWT"] = get_token(self.user.user)
+
+        response = client.get("/graphql/", {"query": USER_DETAILS_QUERY})
+        self.assertEqual(
+            response.json()["data"]["userDetails"]["username"],
+            "graham@brightonandhovealbion.com",
+        )
+
+        response = client.get(
+            "/graphql/",
+            {"query": USER_DETAILS_QUERY},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalid_jwt(self):
+        client = Client()
+        client.cookies["JWT"] = "nonsense"
+
+        response = client.get("/graphql/", {"query": USER_DETAILS_QUERY})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("errors", response.json())
+
+    def test_not_tagged(self):
+        # Unassigned requests can be edited without changing the data version.
+        response = self.get("{ unassignedRequest { id } }")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+        response = self.get("{ userDetails { username } }", variables="nonsense")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.get("{ nonsense }")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/graphql/",
+            json.dumps({"query": USER_DETAILS_QUERY}),
+            content_type="application/json",
+        )
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_not_tagged_errors(self):
+        # Fields are validated when the query is run, not when it's tagged.
+        response = self.get("{ userDetails { nonsense } }")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header("ETag"))
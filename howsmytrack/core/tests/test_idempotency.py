@@ -0,0 +1,227 @@
+import hashlib
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db.models import QuerySet
+from django.test import Client
+from django.test import TestCase
+from django.utils import timezone
+
+from howsmytrack.core.graphql_view import HowsMyTrackGraphQLView
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+from howsmytrack.core.models import IdempotencyKey
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+TTL = timedelta(hours=1)
+LEASE = timedelta(seconds=60)
+ADD_REPLY_MUTATION = """
+    mutation ($id: Int!) {
+        addFeedbackResponseReply(feedbackResponseId: $id, text: "thanks pal", allowReplies: true) {
+            reply { id }
+            error
+        }
+    }
+"""
+
+
+class IdempotencyKeyTest(TestCase):
+    def setUp(self):
+        self.request_user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.request_user.save()
+        response_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        response_user.save()
+        feedback_request = FeedbackRequest(
+            user=self.request_user, media_url="https://soundcloud.com/ruairidx/grey",
+        )
+        feedback_request.save()
+        self.feedback_response = FeedbackResponse(
+            user=response_user,
+            feedback_request=feedback_request,
+            feedback="feedback",
+            submitted=True,
+            allow_replies=True,
+        )
+        self.feedback_response.save()
+
+        self.client = Client()
+        self.client.force_login(self.request_user.user, backend=MODEL_BACKEND)
+
+    def get_body(self, query, variables):
+        return json.dumps({"query": query, "variables": variables})
+
+    def post(self, query, variables=None, key="key"):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post(
+            "/graphql/",
+            self.get_body(query, variables),
+            content_type="application/json",
+            **headers,
+        )
+
+    def add_reply(self, **kwargs):
+        return self.post(
+            ADD_REPLY_MUTATION, {"id": self.feedback_response.id}, **kwargs
+        )
+
+    def test_retry(self):
+        response = self.add_reply()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+
+        # Session and user, then the stored response.
+        with self.assertNumQueries(3):
+            retry = self.add_reply()
+
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), response.json())
+        self.assertEqual(FeedbackResponseReply.objects.count(), 1)
+
+    def test_different_keys(self):
+        self.add_reply(key="key")
+        self.add_reply(key="other key")
+        self.add_reply(key=None)
+
+        self.assertEqual(FeedbackResponseReply.objects.count(), 3)
+
+    def test_different_users(self):
+        self.add_reply()
+
+        self.client.force_login(self.feedback_response.user.user, backend=MODEL_BACKEND)
+        response = self.add_reply()
+
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(FeedbackResponseReply.objects.count(), 2)
+
+    def test_different_request(self):
+        self.add_reply()
+
+        response = self.post(ADD_REPLY_MUTATION, {"id": self.feedback_response.id + 1},)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.json()["errors"][0]["message"],
+            "Idempotency-Key has already been used for a different request.",
+        )
+
+    def claim_for_reply(self):
+        body = self.get_body(ADD_REPLY_MUTATION, {"id": self.feedback_response.id})
+        return IdempotencyKey.claim(
+            self.request_user.user,
+            "key",
+            hashlib.sha256(body.encode()).hexdigest(),
+            TTL,
+            LEASE,
+        )
+
+    def test_in_progress(self):
+        self.claim_for_reply()
+
+        response = self.add_reply()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(FeedbackResponseReply.objects.count(), 0)
+
+    def test_in_progress_lease_expired(self):
+        # As if the first request's worker was killed before it finished.
+        _, dead_claim = self.claim_for_reply()
+        IdempotencyKey.objects.update(claimed_at=timezone.now() - LEASE)
+
+        response = self.add_reply()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(FeedbackResponseReply.objects.count(), 1)
+
+        # The dead request can no longer touch the key.
+        dead_claim.release()
+        dead_claim.store_response(500, "")
+        retry = self.add_reply()
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), response.json())
+
+    def test_lease_expired_different_request(self):
+        self.claim_for_reply()
+        IdempotencyKey.objects.update(claimed_at=timezone.now() - LEASE)
+
+        response = self.post(ADD_REPLY_MUTATION, {"id": self.feedback_response.id + 1},)
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_concurrent_take_over(self):
+        self.claim_for_reply()
+        IdempotencyKey.objects.update(claimed_at=timezone.now() - LEASE)
+        stale_key = IdempotencyKey.objects.get()
+
+        claimed, _ = IdempotencyKey.claim(
+            self.request_user.user, "key", stale_key.request_hash, TTL, LEASE,
+        )
+        self.assertTrue(claimed)
+
+        # As if both retries read the key before either took it over.
+        with patch.object(QuerySet, "first", return_value=stale_key):
+            claimed, _ = IdempotencyKey.claim(
+                self.request_user.user, "key", stale_key.request_hash, TTL, LEASE,
+            )
+        self.assertFalse(claimed)
+
+    def test_expired(self):
+        self.add_reply()
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        response = self.add_reply()
+
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(FeedbackResponseReply.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_concurrent_claim(self):
+        claimed, idempotency_key = IdempotencyKey.claim(
+            self.request_user.user, "key", "hash", TTL, LEASE,
+        )
+        self.assertTrue(claimed)
+
+        # As if both requests checked for the key before either claimed it.
+        with patch.object(QuerySet, "first", return_value=None):
+            claimed, existing_key = IdempotencyKey.claim(
+                self.request_user.user, "key", "hash", TTL, LEASE,
+            )
+
+        self.assertFalse(claimed)
+        self.assertEqual(existing_key, idempotency_key)
+
+    def test_not_stored(self):
+        # Queries don't need storing.
+        self.post("{ userDetails { username } }")
+        # Nor do requests which error before they're run.
+        self.post("{ nonsense")
+        with patch.object(
+            HowsMyTrackGraphQLView, "dispatch_with_etag", side_effect=ValueError,
+        ):
+            with self.assertRaises(ValueError):
+                self.add_reply()
+
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+    def test_logged_out(self):
+        self.client.logout()
+
+        response = self.add_reply()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+    def test_key_too_long(self):
+        response = self.add_reply(key="k" * 256)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(FeedbackResponseReply.objects.count(), 0)
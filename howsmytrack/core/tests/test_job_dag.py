@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from howsmytrack.core.job_dag import DagJob
+from howsmytrack.core.job_dag import JobDag
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import JobRunStatus
+
+
+TIMEOUT = timedelta(seconds=5)
+
+
+class JobDagTest(TestCase):
+    def setUp(self):
+        self.job_dag = JobDag(
+            "daily_jobs",
+            [
+                DagJob("calculate_user_ratings", dependencies=[], timeout=TIMEOUT),
+                DagJob("send_group_reminder_emails", dependencies=[], timeout=TIMEOUT),
+                DagJob(
+                    "assign_groups",
+                    dependencies=["calculate_user_ratings"],
+                    timeout=TIMEOUT,
+                ),
+            ],
+        )
+        self.jobs_started = []
+
+    def run_job_dag(self, job_behaviours=None):
+        """Run the DAG with run_job replaced by `job_behaviours`, a dict of job
+        names to functions; jobs without a behaviour succeed immediately."""
+        job_behaviours = job_behaviours or {}
+
+        def run_job(job_name):
+            self.jobs_started.append(job_name)
+            if job_name in job_behaviours:
+                return job_behaviours[job_name]()
+            return Mock(status=JobRunStatus.SUCCEEDED.name)
+
+        with patch("howsmytrack.core.job_dag.run_job", Mock(side_effect=run_job)):
+            return self.job_dag.run()
+
+    def test_run(self):
+        def slow_ratings():
+            time.sleep(0.1)
+            return Mock(status=JobRunStatus.SUCCEEDED.name)
+
+        statuses = self.run_job_dag({"calculate_user_ratings": slow_ratings})
+
+        self.assertEqual(
+            statuses,
+            {
+                "calculate_user_ratings": JobRunStatus.SUCCEEDED,
+                "send_group_reminder_emails": JobRunStatus.SUCCEEDED,
+                "assign_groups": JobRunStatus.SUCCEEDED,
+            },
+        )
+        # Grouping only starts once ratings are done.
+        self.assertEqual(self.jobs_started[-1], "assign_groups")
+
+        dag_run = JobRun.objects.get(job_name="daily_jobs")
+        self.assertEqual(dag_run.status, JobRunStatus.SUCCEEDED.name)
+        self.assertEqual(dag_run.rows_processed, 3)
+        self.assertEqual(
+            dag_run.critical_path, "calculate_user_ratings > assign_groups"
+        )
+        self.assertGreaterEqual(dag_run.duration, timedelta(seconds=0.1))
+
+    def test_run_dependency_failed(self):
+        def failing_ratings():
+            raise ValueError("bad times")
+
+        statuses = self.run_job_dag({"calculate_user_ratings": failing_ratings})
+
+        self.assertEqual(statuses["calculate_user_ratings"], JobRunStatus.FAILED)
+        self.assertEqual(statuses["send_group_reminder_emails"], JobRunStatus.SUCCEEDED)
+        self.assertEqual(statuses["assign_groups"], JobRunStatus.SKIPPED)
+        self.assertNotIn("assign_groups", self.jobs_started)
+
+        dag_run = JobRun.objects.get(job_name="daily_jobs")
+        self.assertEqual(dag_run.status, JobRunStatus.FAILED.name)
+        self.assertEqual(
+            dag_run.error, "calculate_user_ratings: Failed, assign_groups: Skipped"
+        )
+
+    def test_run_dependency_running_elsewhere(self):
+        statuses = self.run_job_dag({"calculate_user_ratings": lambda: None})
+
+        self.assertEqual(statuses["calculate_user_ratings"], JobRunStatus.SKIPPED)
+        self.assertEqual(statuses["assign_groups"], JobRunStatus.SKIPPED)
+
+    def test_run_dependency_timed_out(self):
+        self.job_dag.jobs["calculate_user_ratings"] = DagJob(
+            "calculate_user_ratings", dependencies=[], timeout=timedelta(seconds=0.1),
+        )
+
+        def slow_ratings():
+            time.sleep(0.5)
+            return Mock(status=JobRunStatus.SUCCEEDED.name)
+
+        statuses = self.run_job_dag({"calculate_user_ratings": slow_ratings})
+
+        self.assertEqual(statuses["calculate_user_ratings"], JobRunStatus.TIMED_OUT)
+        self.assertEqual(statuses["assign_groups"], JobRunStatus.SKIPPED)
+
+    def test_run_empty(self):
+        self.assertEqual(JobDag("nothing", []).run(), {})
+        self.assertEqual(JobRun.objects.get(job_name="nothing").critical_path, "")
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            JobDag(
+                "daily_jobs",
+                [DagJob("assign_groups", dependencies=["nonsense"], timeout=TIMEOUT)],
+            )
+
+    def test_dependency_cycle(self):
+        with self.assertRaises(ValueError):
+            JobDag(
+                "daily_jobs",
+                [
+                    DagJob("assign_groups", dependencies=["a"], timeout=TIMEOUT),
+                    DagJob("a", dependencies=["b"], timeout=TIMEOUT),
+                    DagJob("b", dependencies=["assign_groups"], timeout=TIMEOUT),
+                ],
+            )
@@ -0,0 +1,91 @@
+import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytz
+from django.test import TestCase
+
+from howsmytrack.core.job_runner import advisory_lock_id
+from howsmytrack.core.job_runner import job_lock
+from howsmytrack.core.job_runner import run_job
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import JobRunStatus
+from howsmytrack.core.models import Lease
+
+
+FAR_FUTURE = datetime.datetime(2999, 1, 1, tzinfo=pytz.utc)
+
+
+class RunJobTest(TestCase):
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+
+    def test_run_job(self):
+        job_run = run_job("calculate_user_ratings")
+
+        self.assertEqual(job_run.job_name, "calculate_user_ratings")
+        self.assertEqual(job_run.status, JobRunStatus.SUCCEEDED.name)
+        self.assertEqual(job_run.rows_processed, 1)
+        self.assertIsNotNone(job_run.time_finished)
+        self.assertEqual(job_run.duration, job_run.time_finished - job_run.time_started)
+        # Lock is released once the job is done.
+        self.assertEqual(Lease.objects.count(), 0)
+
+    def test_run_job_already_running(self):
+        Lease(
+            name="job:calculate_user_ratings", holder="other", expires_at=FAR_FUTURE,
+        ).save()
+
+        self.assertIsNone(run_job("calculate_user_ratings"))
+        self.assertEqual(JobRun.objects.count(), 0)
+
+    def test_run_job_failed(self):
+        with patch(
+            "howsmytrack.core.job_runner.call_command",
+            side_effect=ValueError("bad times"),
+        ):
+            with self.assertRaises(ValueError):
+                run_job("calculate_user_ratings")
+
+        job_run = JobRun.objects.get(job_name="calculate_user_ratings")
+        self.assertEqual(job_run.status, JobRunStatus.FAILED.name)
+        self.assertEqual(job_run.error, "ValueError('bad times')")
+        self.assertEqual(Lease.objects.count(), 0)
+
+
+class JobLockTest(TestCase):
+    def mock_postgres_connection(self, acquired):
+        connection = MagicMock()
+        connection.vendor = "postgresql"
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (acquired,)
+        return connection, cursor
+
+    def test_postgres_advisory_lock(self):
+        connection, cursor = self.mock_postgres_connection(acquired=True)
+        lock_id = advisory_lock_id("assign_groups")
+
+        with patch("howsmytrack.core.job_runner.connection", connection):
+            with job_lock("assign_groups") as acquired:
+                self.assertTrue(acquired)
+                cursor.execute.assert_called_once_with(
+                    "SELECT pg_try_advisory_lock(%s)", [lock_id]
+                )
+
+        cursor.execute.assert_called_with("SELECT pg_advisory_unlock(%s)", [lock_id])
+        # Postgres locks don't need lease rows.
+        self.assertEqual(Lease.objects.count(), 0)
+
+    def test_postgres_advisory_lock_not_acquired(self):
+        connection, cursor = self.mock_postgres_connection(acquired=False)
+
+        with patch("howsmytrack.core.job_runner.connection", connection):
+            with job_lock("assign_groups") as acquired:
+                self.assertFalse(acquired)
+
+        # Don't unlock a lock that we never held.
+        cursor.execute.assert_called_once()
@@ -0,0 +1,213 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import Client
+from django.test import override_settings
+from django.test import TestCase
+from graphql.error import GraphQLError
+from graphql.error import GraphQLLocatedError
+from graphql.execution import ExecutionResult
+from prometheus_client import generate_latest
+from prometheus_client import REGISTRY
+
+from howsmytrack.core.job_runner import run_job
+from howsmytrack.core.metrics import get_registry
+from howsmytrack.core.metrics import MULTIPROCESS_DIR_ENV_VAR
+from howsmytrack.core.metrics import record_graphql_operation
+from howsmytrack.core.metrics import record_job_run
+from howsmytrack.core.metrics import update_queue_depths
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import JobRun
+from howsmytrack.core.models import JobRunStatus
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+def get_sample_value(name, labels=None, registry=REGISTRY):
+    return registry.get_sample_value(name, labels or {}) or 0
+
+
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.client = Client()
+
+    def test_graphql_operation(self):
+        labels = {"operation": "userDetails"}
+        operations_before = get_sample_value(
+            "howsmytrack_graphql_operation_seconds_count", labels
+        )
+        queries_before = get_sample_value(
+            "howsmytrack_graphql_operation_db_queries_sum", labels
+        )
+
+        self.client.force_login(self.user.user, backend=MODEL_BACKEND)
+        self.client.post(
+            "/graphql/",
+            json.dumps({"query": "query UserDetails { userDetails { username } }"}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(
+            get_sample_value("howsmytrack_graphql_operation_seconds_count", labels),
+            operations_before + 1,
+        )
+        # Session, user, FeedbackGroupsUser and notification lookups.
+        self.assertEqual(
+            get_sample_value("howsmytrack_graphql_operation_db_queries_sum", labels),
+            queries_before + 5,
+        )
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'howsmytrack_graphql_operation_seconds_count{operation="userDetails"}',
+            response.content.decode(),
+        )
+
+    def test_graphql_invalid_query(self):
+        labels = {"operation": "none"}
+        operations_before = get_sample_value(
+            "howsmytrack_graphql_operation_seconds_count", labels
+        )
+
+        self.client.post(
+            "/graphql/",
+            json.dumps({"query": "{ nonsense }"}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(
+            get_sample_value("howsmytrack_graphql_operation_seconds_count", labels),
+            operations_before + 1,
+        )
+
+    def test_queue_depths(self):
+        FeedbackRequest(
+            user=self.user,
+            media_url="https://soundcloud.com/ruairidx/grey",
+            media_type="SOUNDCLOUD",
+            genre="NO_GENRE",
+        ).save()
+        other_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        other_user.save()
+        FeedbackRequest(user=other_user, genre="NO_GENRE").save()
+        update_queue_depths()
+
+        self.assertEqual(
+            get_sample_value(
+                "howsmytrack_unassigned_feedback_requests", {"has_track": "true"}
+            ),
+            1,
+        )
+        self.assertEqual(
+            get_sample_value(
+                "howsmytrack_unassigned_feedback_requests", {"has_track": "false"}
+            ),
+            1,
+        )
+
+    def test_job_run(self):
+        # Jobs run in the clock process, which serves the default registry
+        # from its own metrics port.
+        labels = {"job": "rollup_daily_stats", "status": "SUCCEEDED"}
+        runs_before = get_sample_value("howsmytrack_job_duration_seconds_count", labels)
+
+        run_job("rollup_daily_stats")
+
+        self.assertIn(
+            f'howsmytrack_job_duration_seconds_count{{job="rollup_daily_stats",status="SUCCEEDED"}} {runs_before + 1}',
+            generate_latest(REGISTRY).decode(),
+        )
+
+    @override_settings(METRICS_TOKEN="token")
+    def test_token_required(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer nonsense")
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer token")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None, RUNNING_ON_PROD=True)
+    def test_token_required_in_prod(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 401)
+
+
+class RecordMetricsTest(TestCase):
+    def test_record_graphql_operation_errors(self):
+        labels = {"field": "feedbackGroups"}
+        errors_before = get_sample_value(
+            "howsmytrack_graphql_resolver_errors_total", labels
+        )
+
+        record_graphql_operation(
+            ["feedbackGroups"],
+            duration=0.1,
+            query_count=2,
+            result=ExecutionResult(
+                errors=[
+                    GraphQLLocatedError(
+                        [], original_error=ValueError(), path=["feedbackGroups", 0]
+                    ),
+                    GraphQLError("Syntax Error"),
+                ]
+            ),
+        )
+
+        self.assertEqual(
+            get_sample_value("howsmytrack_graphql_resolver_errors_total", labels),
+            errors_before + 1,
+        )
+
+    def test_record_job_run(self):
+        labels = {"job": "assign_groups", "status": JobRunStatus.SUCCEEDED.name}
+        sum_before = get_sample_value("howsmytrack_job_duration_seconds_sum", labels)
+
+        job_run = JobRun(job_name="assign_groups", host="localhost")
+        job_run.save()
+        job_run.finish(JobRunStatus.SUCCEEDED)
+        job_run.duration = timedelta(seconds=30)
+        record_job_run(job_run)
+
+        self.assertEqual(
+            get_sample_value("howsmytrack_job_duration_seconds_sum", labels),
+            sum_before + 30,
+        )
+
+
+class MultiprocessMetricsTest(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        patcher = patch.dict(
+            os.environ, {MULTIPROCESS_DIR_ENV_VAR: self.metrics_dir.name}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.metrics_dir.cleanup)
+
+    def test_registry(self):
+        # Each worker's metrics are read from the shared directory, rather
+        # than from this process's default registry.
+        registry = get_registry()
+
+        self.assertIsNot(registry, REGISTRY)
+        self.assertIsNone(
+            registry.get_sample_value(
+                "howsmytrack_job_duration_seconds_count",
+                {"job": "rollup_daily_stats", "status": "SUCCEEDED"},
+            )
+        )
@@ -0,0 +1,100 @@
+from importlib import import_module
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from django.apps import apps as django_apps
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+
+
+class CheckUnassignedRequestUsersTest(TestCase):
+    def check_unassigned_request_users(self, user_ids):
+        # Duplicates can't be created now that the constraint exists, so the
+        # migration is run against stand-ins for its historical models.
+        apps = Mock()
+        FeedbackRequest = apps.get_model.return_value
+        FeedbackRequest.objects.using.return_value.filter.return_value.values.return_value.annotate.return_value.filter.return_value.values_list.return_value = (
+            user_ids
+        )
+        import_module(
+            "howsmytrack.core.migrations.0020_unassigned_request_constraints"
+        ).check_unassigned_request_users(apps, Mock())
+
+    def test_no_duplicates(self):
+        self.check_unassigned_request_users([])
+
+    def test_duplicates(self):
+        with self.assertRaisesRegex(
+            RuntimeError,
+            r"FeedbackGroupsUsers \[3, 5\] have more than one unassigned feedback request",
+        ):
+            self.check_unassigned_request_users([3, 5])
+
+
+class BackfillReplyStateTest(TestCase):
+    def test_backfill(self):
+        request_user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        request_user.save()
+        feedback_request = FeedbackRequest(
+            user=request_user, media_url="https://soundcloud.com/ruairidx/grey",
+        )
+        feedback_request.save()
+        feedback_responses = []
+        for email, reply_allow_replies in [
+            ("lewis", [True, False, True]),
+            ("davy", [True, True]),
+            ("alexis", []),
+        ]:
+            user = FeedbackGroupsUser.create(
+                email=f"{email}@brightonandhovealbion.com", password="password",
+            )
+            user.save()
+            feedback_response = FeedbackResponse(
+                feedback_request=feedback_request, user=user,
+            )
+            feedback_response.save()
+            for allow_replies in reply_allow_replies:
+                FeedbackResponseReply(
+                    feedback_response=feedback_response,
+                    user=user,
+                    text="text",
+                    allow_replies=allow_replies,
+                ).save()
+            feedback_responses.append(feedback_response)
+        # As if the replies were made before the columns existed.
+        FeedbackResponse.objects.update(replies_closed=False, last_reply_at=None)
+
+        migration = import_module(
+            "howsmytrack.core.migrations.0023_feedbackresponse_reply_state"
+        )
+        with patch.object(migration, "BATCH_SIZE", 1):
+            migration.backfill_reply_state(
+                django_apps, Mock(connection=Mock(alias="default"))
+            )
+
+        self.assertEqual(
+            [
+                (feedback_response.replies_closed, feedback_response.last_reply_at)
+                for feedback_response in FeedbackResponse.objects.order_by("id")
+            ],
+            [
+                (
+                    closed,
+                    FeedbackResponseReply.objects.filter(
+                        feedback_response=feedback_response
+                    )
+                    .order_by("-time_created")
+                    .values_list("time_created", flat=True)
+                    .first(),
+                )
+                for closed, feedback_response in zip(
+                    [True, False, False], feedback_responses
+                )
+            ],
+        )
@@ -0,0 +1,99 @@
+import json
+
+from django.test import Client
+from django.test import override_settings
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.profiling import QueryProfile
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+USER_DETAILS_QUERY = "{ userDetails { username notifications } }"
+
+SQL_PROFILER = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1,
+    "SLOW_REQUEST_MS": 10000,
+    "SLOW_SQL_MS": 10000,
+    "MAX_QUERIES": 10000,
+    "SLOWEST_QUERIES": 2,
+}
+
+
+class QueryProfileTest(TestCase):
+    def test_record(self):
+        profile = QueryProfile(max_slowest_queries=2)
+        profile.record("SELECT 1", 0.001)
+        profile.resolver_path = "userDetails"
+        profile.record("SELECT 2", 0.003)
+        profile.record("SELECT 3", 0.002)
+
+        self.assertEqual(
+            profile.as_dict(),
+            {
+                "queries": 3,
+                "timeMs": 6,
+                "slowestQueries": [
+                    {"sql": "SELECT 2", "timeMs": 3},
+                    {"sql": "SELECT 3", "timeMs": 2},
+                ],
+                "resolvers": {"userDetails": {"queries": 2, "timeMs": 5}},
+            },
+        )
+
+
+class SQLProfilerMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.client = Client()
+        self.client.force_login(self.user.user, backend=MODEL_BACKEND)
+
+    def query_user_details(self):
+        response = self.client.post(
+            "/graphql/",
+            json.dumps({"query": USER_DETAILS_QUERY}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @override_settings(SQL_PROFILER={**SQL_PROFILER, "ENABLED": False})
+    def test_disabled(self):
+        self.assertNotIn("extensions", self.query_user_details())
+
+    @override_settings(SQL_PROFILER={**SQL_PROFILER, "SAMPLE_RATE": 0})
+    def test_not_sampled(self):
+        self.assertNotIn("extensions", self.query_user_details())
+
+    @override_settings(SQL_PROFILER=SQL_PROFILER, DEBUG=True)
+    def test_profile_in_extensions(self):
+        with self.assertRaises(AssertionError):
+            # Nothing logged for quick requests.
+            with self.assertLogs("howsmytrack.core.profiling"):
+                response = self.query_user_details()
+
+        sql_profile = response["extensions"]["sqlProfile"]
+        self.assertEqual(sql_profile["queries"], 5)
+        self.assertEqual(len(sql_profile["slowestQueries"]), 2)
+        self.assertEqual(
+            list(sql_profile["resolvers"].keys()), ["userDetails"],
+        )
+        self.assertEqual(sql_profile["resolvers"]["userDetails"]["queries"], 5)
+
+    @override_settings(SQL_PROFILER={**SQL_PROFILER, "MAX_QUERIES": 1})
+    def test_slow_request_logged(self):
+        with self.assertLogs("howsmytrack.core.profiling", level="WARNING") as logs:
+            self.query_user_details()
+
+        log = json.loads(logs.records[0].getMessage())
+        self.assertEqual(log["message"], "Slow request")
+        self.assertEqual(log["path"], "/graphql/")
+        self.assertEqual(log["resolvers"]["userDetails"]["queries"], 5)
+
+    @override_settings(SQL_PROFILER=SQL_PROFILER, DEBUG=False)
+    def test_profile_not_in_extensions_outside_debug(self):
+        self.assertNotIn("extensions", self.query_user_details())
@@ -0,0 +1,94 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from howsmytrack.core.auth import get_users_by_email
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import FeedbackResponseReply
+
+
+class QueryPlanTest(TestCase):
+    """
+    Check that the hottest queries are served by indexes rather than scanning
+    whole tables, which would get slower as the tables grow.
+
+    These tables are tiny in tests, so on Postgres sequential scans are
+    disabled to make the planner show whether an index *could* be used.
+    """
+
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+
+        if connection.vendor == "postgresql":  # pragma: no cover
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertNoFullScan(self, queryset, model):
+        table = model._meta.db_table
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":  # pragma: no cover
+            full_scan = re.compile(rf"Seq Scan on {table}\b")
+        else:
+            # SQLite reports scans that use an index as e.g. `SCAN TABLE x USING INDEX y`.
+            full_scan = re.compile(rf"\bSCAN (?:TABLE )?{table}\b(?! USING)")
+        self.assertIsNone(
+            full_scan.search(plan), f"Full scan of {table} in plan:\n{plan}",
+        )
+
+    def test_unassigned_requests_with_tracks(self):
+        self.assertNoFullScan(
+            FeedbackRequest.objects.filter(
+                feedback_group=None, media_url__isnull=False,
+            ),
+            FeedbackRequest,
+        )
+
+    def test_unassigned_requests_without_tracks(self):
+        self.assertNoFullScan(
+            FeedbackRequest.objects.filter(
+                feedback_group=None, media_url__isnull=True,
+            ),
+            FeedbackRequest,
+        )
+
+    def test_unassigned_requests_for_user(self):
+        self.assertNoFullScan(
+            FeedbackRequest.objects.filter(user=self.user, feedback_group=None,),
+            FeedbackRequest,
+        )
+
+    def test_pending_requests_for_media_key(self):
+        self.assertNoFullScan(
+            FeedbackRequest.objects.filter(media_key="key", feedback_group=None,),
+            FeedbackRequest,
+        )
+
+    def test_users_by_email(self):
+        self.assertNoFullScan(
+            get_users_by_email("GRAHAM@brightonandhovealbion.com"), User,
+        )
+
+    def test_incomplete_responses_for_user(self):
+        self.assertNoFullScan(
+            FeedbackResponse.objects.filter(user=self.user, submitted=False,),
+            FeedbackResponse,
+        )
+
+    def test_unread_replies_for_user(self):
+        self.assertNoFullScan(
+            FeedbackResponseReply.objects.exclude(user=self.user,)
+            .filter(time_read__isnull=True,)
+            .filter(
+                Q(feedback_response__user=self.user)
+                | Q(feedback_response__feedback_request__user=self.user),
+            ),
+            FeedbackResponseReply,
+        )
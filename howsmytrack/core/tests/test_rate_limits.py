@@ -0,0 +1,179 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client
+from django.test import override_settings
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from howsmytrack.core import rate_limits
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import IdempotencyKey
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+RATE_LIMITS = {
+    "tokenAuth": {"capacity": 2, "per_minute": 1},
+    "feedbackGroups": {"capacity": 1, "per_minute": 2},
+    "updateEmail": {"capacity": 1, "per_minute": 1},
+}
+TOKEN_AUTH_MUTATION = """
+    mutation {
+        tokenAuth(username: "graham@brightonandhovealbion.com", password: "wrong") {
+            payload
+        }
+    }
+"""
+FEEDBACK_GROUPS_QUERY = "{ feedbackGroups { id } }"
+
+
+def get_rate_limited_requests(field):
+    return (
+        REGISTRY.get_sample_value(
+            "howsmytrack_rate_limited_requests_total", {"field": field},
+        )
+        or 0
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RATE_LIMITS=RATE_LIMITS)
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        rate_limits._fallback_buckets.clear()
+
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        self.other_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.other_user.save()
+
+    def post(self, query, client=None, **headers):
+        return (client or Client()).post(
+            "/graphql/",
+            json.dumps({"query": query}),
+            content_type="application/json",
+            **headers,
+        )
+
+    def get_logged_in_client(self, user):
+        client = Client()
+        client.force_login(user.user, backend=MODEL_BACKEND)
+        return client
+
+    def assertRateLimited(self, response, retry_after):
+        self.assertEqual(response["Retry-After"], str(retry_after))
+        error = response.json()["errors"][0]
+        self.assertEqual(
+            error["message"],
+            f"Too many requests. Please try again in {retry_after} seconds.",
+        )
+        self.assertEqual(
+            error["extensions"], {"code": "RATE_LIMITED", "retryAfter": retry_after},
+        )
+
+    def test_limited_by_ip(self):
+        for _ in range(2):
+            response = self.post(TOKEN_AUTH_MUTATION)
+            self.assertFalse(response.has_header("Retry-After"))
+            self.assertEqual(
+                response.json()["errors"][0]["message"],
+                "Please enter valid credentials",
+            )
+
+        rate_limited_requests = get_rate_limited_requests("tokenAuth")
+        self.assertRateLimited(self.post(TOKEN_AUTH_MUTATION), 60)
+        self.assertEqual(
+            get_rate_limited_requests("tokenAuth"), rate_limited_requests + 1
+        )
+
+        # Other clients have their own buckets.
+        response = self.post(TOKEN_AUTH_MUTATION, REMOTE_ADDR="10.0.0.1")
+        self.assertFalse(response.has_header("Retry-After"))
+
+    def test_forwarded_for(self):
+        # Only the address added by the router is used.
+        for spoofed_ip in ["10.0.0.1", "10.0.0.2", "10.0.0.3"]:
+            response = self.post(
+                TOKEN_AUTH_MUTATION, HTTP_X_FORWARDED_FOR=f"{spoofed_ip}, 10.0.0.4",
+            )
+        self.assertRateLimited(response, 60)
+
+        response = self.post(TOKEN_AUTH_MUTATION)
+        self.assertFalse(response.has_header("Retry-After"))
+
+    def test_refill(self):
+        with patch("time.time", return_value=1000):
+            self.post(TOKEN_AUTH_MUTATION)
+            self.post(TOKEN_AUTH_MUTATION)
+        with patch("time.time", return_value=1045):
+            self.assertRateLimited(self.post(TOKEN_AUTH_MUTATION), 15)
+        with patch("time.time", return_value=1060):
+            response = self.post(TOKEN_AUTH_MUTATION)
+            self.assertFalse(response.has_header("Retry-After"))
+
+    def test_limited_by_user(self):
+        client = self.get_logged_in_client(self.user)
+        response = client.get("/graphql/", {"query": FEEDBACK_GROUPS_QUERY})
+        self.assertEqual(response.json(), {"data": {"feedbackGroups": []}})
+        etag = response["ETag"]
+
+        response = client.get(
+            "/graphql/", {"query": FEEDBACK_GROUPS_QUERY}, HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = client.get("/graphql/", {"query": FEEDBACK_GROUPS_QUERY})
+        self.assertRateLimited(response, 30)
+        # The error mustn't be reused as if it were the current result.
+        self.assertFalse(response.has_header("ETag"))
+
+        # Other users on the same IP have their own buckets.
+        response = self.post(
+            FEEDBACK_GROUPS_QUERY, client=self.get_logged_in_client(self.other_user),
+        )
+        self.assertEqual(response.json(), {"data": {"feedbackGroups": []}})
+
+    def test_not_stored_for_idempotency(self):
+        client = self.get_logged_in_client(self.user)
+        mutation = 'mutation { updateEmail(email: "graham@brighton.com") { success } }'
+        self.post(mutation, client=client)
+
+        response = self.post(mutation, client=client, HTTP_IDEMPOTENCY_KEY="key")
+
+        self.assertRateLimited(response, 60)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_cache_unavailable(self):
+        with patch.object(cache, "get", side_effect=ConnectionError), patch.object(
+            cache, "set", side_effect=ConnectionError
+        ):
+            self.post(TOKEN_AUTH_MUTATION)
+            self.post(TOKEN_AUTH_MUTATION)
+            self.assertRateLimited(self.post(TOKEN_AUTH_MUTATION), 60)
+
+    @patch.object(rate_limits, "MAX_FALLBACK_BUCKETS", 2)
+    def test_cache_unavailable_bounded(self):
+        with patch.object(cache, "get", side_effect=ConnectionError), patch.object(
+            cache, "set", side_effect=ConnectionError
+        ), patch.object(rate_limits.time, "time", return_value=0):
+            rate_limits.take_token("a", 2, 1)
+            rate_limits.take_token("b", 2, 1)
+            rate_limits.take_token("a", 2, 1)
+            # "b" is the oldest, so is forgotten to make room.
+            rate_limits.take_token("c", 1, 1)
+            self.assertEqual(list(rate_limits._fallback_buckets), ["a", "c"])
+
+        with patch.object(cache, "get", side_effect=ConnectionError), patch.object(
+            cache, "set", side_effect=ConnectionError
+        ), patch.object(rate_limits.time, "time", return_value=1):
+            # "c" has refilled but "a" hasn't, so only "c" is forgotten.
+            rate_limits.take_token("d", 2, 1)
+            self.assertEqual(list(rate_limits._fallback_buckets), ["a", "d"])
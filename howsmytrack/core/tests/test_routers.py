@@ -0,0 +1,195 @@
+import json
+from datetime import timedelta
+from unittest.mock import Mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import Client
+from django.test import override_settings
+from django.test import TestCase
+from django.utils import timezone
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.models import GenreChoice
+from howsmytrack.core.models import MediaTypeChoice
+from howsmytrack.core.routers import PRIMARY_PIN_COOKIE
+from howsmytrack.core.routers import read_from_replica
+from howsmytrack.core.routers import ReplicaRouter
+
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+RATING_QUERY = "{ userDetails { rating } }"
+
+
+def save_to_all(*objs):
+    """Save the same rows to the primary and the replica, as replication would."""
+    for obj in objs:
+        obj.save(using="replica")
+        obj.save(using="default")
+
+
+@override_settings(REPLICA_DATABASE="replica")
+class ReplicaRouterTest(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        FeedbackGroup(name="primary").save(using="default")
+        FeedbackGroup(name="replica").save(using="replica")
+
+    def get_name(self):
+        return FeedbackGroup.objects.get().name
+
+    def test_read_from_replica(self):
+        self.assertEqual(self.get_name(), "primary")
+        with read_from_replica():
+            self.assertEqual(self.get_name(), "replica")
+            with read_from_replica():
+                self.assertEqual(self.get_name(), "replica")
+            self.assertEqual(self.get_name(), "replica")
+        self.assertEqual(self.get_name(), "primary")
+
+    def test_read_your_writes(self):
+        with read_from_replica():
+            feedback_group = FeedbackGroup.objects.get()
+            feedback_group.name = "written"
+            feedback_group.save()
+
+            self.assertEqual(self.get_name(), "written")
+        self.assertEqual(FeedbackGroup.objects.using("replica").get().name, "replica")
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica(self):
+        with read_from_replica():
+            self.assertEqual(self.get_name(), "primary")
+
+    def test_database_cache(self):
+        router = ReplicaRouter()
+        cache_entry = Mock(_meta=Mock(app_label="django_cache"))
+
+        with read_from_replica():
+            self.assertEqual(router.db_for_read(cache_entry), "default")
+            self.assertEqual(router.db_for_write(cache_entry), "default")
+            # Still reading from the replica.
+            self.assertEqual(self.get_name(), "replica")
+
+
+@override_settings(REPLICA_DATABASE="replica")
+class ReplicaGraphQLTest(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.user.rating = 4
+        save_to_all(self.user.user, self.user)
+        # Pretend a rating hasn't been replicated yet.
+        self.user.rating = 5
+        self.user.save(using="default")
+
+        self.client = Client()
+        self.client.force_login(self.user.user, backend=MODEL_BACKEND)
+
+    def post(self, query):
+        return self.client.post(
+            "/graphql/", json.dumps({"query": query}), content_type="application/json",
+        )
+
+    def test_query(self):
+        response = self.post(RATING_QUERY)
+        self.assertEqual(response.json()["data"]["userDetails"]["rating"], 4)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+        response = self.client.get("/graphql/", {"query": RATING_QUERY})
+        self.assertEqual(response.json()["data"]["userDetails"]["rating"], 4)
+
+    def test_pinned_after_mutation(self):
+        response = self.post(
+            'mutation { updateEmail(email: "graham@brighton.com") { success } }'
+        )
+        self.assertTrue(response.json()["data"]["updateEmail"]["success"])
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]["max-age"], 10)
+
+        response = self.post(RATING_QUERY)
+        self.assertEqual(response.json()["data"]["userDetails"]["rating"], 5)
+
+        response = self.client.get("/graphql/", {"query": RATING_QUERY})
+        self.assertEqual(response.json()["data"]["userDetails"]["rating"], 5)
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica(self):
+        response = self.post(RATING_QUERY)
+        self.assertEqual(response.json()["data"]["userDetails"]["rating"], 5)
+
+        response = self.post(
+            'mutation { updateEmail(email: "graham@brighton.com") { success } }'
+        )
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+
+@override_settings(REPLICA_DATABASE="replica")
+class ReplicaReadOnlyPathsTest(TestCase):
+    databases = {"default", "replica"}
+
+    def test_export_stats(self):
+        staff_user = User.objects.create_user(
+            username="graham@brightonandhovealbion.com",
+            password="password",
+            is_staff=True,
+        )
+        # Only replicated; the primary's copy has been deleted since.
+        user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        user.user.save(using="replica")
+        user.save(using="replica")
+        client = Client()
+        client.force_login(staff_user, backend=MODEL_BACKEND)
+
+        with self.assertNumQueries(1, using="replica"):
+            response = client.get("/stats/feedback_groups_users/", {"format": "ndjson"})
+            content = b"".join(response.streaming_content)
+
+        self.assertEqual(content.count(b"\n"), 1)
+
+    def test_send_group_reminder_emails(self):
+        users = []
+        feedback_group = FeedbackGroup(name="name")
+        save_to_all(feedback_group)
+        FeedbackGroup.objects.using("replica").update(
+            time_created=timezone.now() - timedelta(days=1)
+        )
+        FeedbackGroup.objects.update(time_created=timezone.now() - timedelta(days=1))
+        for email in (
+            "graham@brightonandhovealbion.com",
+            "lewis@brightonandhovealbion.com",
+        ):
+            user = FeedbackGroupsUser.create(email=email, password="password")
+            save_to_all(user.user, user)
+            feedback_request = FeedbackRequest(
+                user=user,
+                media_url="https://soundcloud.com/ruairidx/grey",
+                media_type=MediaTypeChoice.SOUNDCLOUD.name,
+                feedback_group=feedback_group,
+                genre=GenreChoice.NO_GENRE.name,
+                email_when_grouped=True,
+            )
+            save_to_all(feedback_request)
+            users.append((user, feedback_request))
+        save_to_all(
+            FeedbackResponse(feedback_request=users[0][1], user=users[1][0]),
+            FeedbackResponse(feedback_request=users[1][1], user=users[0][0]),
+        )
+
+        # Requests and responses for each request are read from the replica.
+        with self.assertNumQueries(3, using="replica"):
+            call_command("send_group_reminder_emails")
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            FeedbackRequest.objects.filter(reminder_email_sent=True).count(), 2
+        )
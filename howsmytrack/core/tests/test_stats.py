@@ -0,0 +1,120 @@
+import datetime
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytz
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from howsmytrack.core.models import FeedbackGroup
+from howsmytrack.core.models import FeedbackGroupsUser
+from howsmytrack.core.models import FeedbackRequest
+from howsmytrack.core.models import FeedbackResponse
+from howsmytrack.core.stats import build_daily_stats
+from howsmytrack.core.stats import build_feedback_groups_users
+from howsmytrack.core.stats import build_feedback_groups_users_by_date
+from howsmytrack.core.stats import build_feedback_requests
+from howsmytrack.core.stats import build_feedback_requests_by_date
+from howsmytrack.core.stats import build_response_rates_by_date
+
+
+DAY_ONE = datetime.datetime(2020, 2, 16, 6, tzinfo=pytz.utc)
+DAY_TWO = datetime.datetime(2020, 2, 17, 7, 30, 15, tzinfo=pytz.utc)
+
+
+class StatsTest(TestCase):
+    def setUp(self):
+        self.graham_user = FeedbackGroupsUser.create(
+            email="graham@brightonandhovealbion.com", password="password",
+        )
+        self.lewis_user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.graham_user.save()
+        self.lewis_user.save()
+        User.objects.filter(id=self.graham_user.user.id).update(date_joined=DAY_ONE)
+        User.objects.filter(id=self.lewis_user.user.id).update(date_joined=DAY_TWO)
+
+        with patch("django.utils.timezone.now", Mock(return_value=DAY_ONE)):
+            feedback_group = FeedbackGroup(name="name")
+            feedback_group.save()
+            graham_feedback_request = FeedbackRequest(
+                user=self.graham_user,
+                media_url="https://soundcloud.com/ruairidx/grey",
+                feedback_group=feedback_group,
+            )
+            graham_feedback_request.save()
+
+        with patch("django.utils.timezone.now", Mock(return_value=DAY_TWO)):
+            lewis_feedback_request = FeedbackRequest(
+                user=self.lewis_user,
+                media_url="https://soundcloud.com/ruairidx/bruno",
+                feedback_group=feedback_group,
+            )
+            lewis_feedback_request.save()
+
+        FeedbackResponse(
+            feedback_request=graham_feedback_request,
+            user=self.lewis_user,
+            submitted=True,
+        ).save()
+        FeedbackResponse(
+            feedback_request=lewis_feedback_request,
+            user=self.graham_user,
+            submitted=False,
+        ).save()
+
+        call_command("rollup_daily_stats")
+
+    def test_build_feedback_requests(self):
+        self.assertEqual(
+            list(build_feedback_requests()),
+            [("16/2/2020 6:0:0", 1), ("17/2/2020 7:30:15", 2)],
+        )
+
+    def test_build_feedback_requests_date_range(self):
+        self.assertEqual(
+            list(build_feedback_requests(start_date=DAY_TWO.date())),
+            [("17/2/2020 7:30:15", 2)],
+        )
+        self.assertEqual(
+            list(build_feedback_requests(end_date=DAY_ONE.date())),
+            [("16/2/2020 6:0:0", 1)],
+        )
+
+    def test_build_feedback_groups_users(self):
+        self.assertEqual(
+            list(build_feedback_groups_users()),
+            [("16/2/2020 6:0:0", 1), ("17/2/2020 7:30:15", 2)],
+        )
+
+    def test_build_response_rates_by_date(self):
+        self.assertEqual(
+            list(build_response_rates_by_date()), [("16/2/2020", 0.5)],
+        )
+        self.assertEqual(
+            list(build_response_rates_by_date(start_date=DAY_TWO.date())), [],
+        )
+
+    def test_build_feedback_requests_by_date(self):
+        self.assertEqual(
+            list(build_feedback_requests_by_date()),
+            [("16/2/2020", 1), ("17/2/2020", 1)],
+        )
+
+    def test_build_feedback_groups_users_by_date(self):
+        self.assertEqual(
+            list(
+                build_feedback_groups_users_by_date(
+                    start_date=DAY_ONE.date(), end_date=DAY_ONE.date(),
+                )
+            ),
+            [("16/2/2020", 1)],
+        )
+
+    def test_build_daily_stats(self):
+        self.assertEqual(
+            list(build_daily_stats()),
+            [("16/2/2020", 1, 1, 1, 2, 0, 0, 0), ("17/2/2020", 1, 1, 0, 0, 0, 0, 0)],
+        )
@@ -0,0 +1,58 @@
+from django.test import TestCase
+
+from howsmytrack.core.validators import get_media_key
+
+
+class GetMediaKeyTest(TestCase):
+    def assertSameTrack(self, *media_urls):
+        self.assertEqual(len({get_media_key(media_url) for media_url in media_urls}), 1)
+
+    def test_soundcloud(self):
+        self.assertSameTrack(
+            "https://soundcloud.com/ruairidx/grey",
+            "https://soundcloud.com/ruairidx/grey/",
+            "https://soundcloud.com/RuairiDX/grey?utm_source=clipboard&si=abc",
+            "https://m.soundcloud.com/ruairidx/grey#t=0:30",
+            " https://www.soundcloud.com/ruairidx/grey ",
+        )
+        self.assertNotEqual(
+            get_media_key("https://soundcloud.com/ruairidx/grey"),
+            get_media_key("https://soundcloud.com/ruairidx/grey/s-secret"),
+        )
+
+    def test_dropbox(self):
+        self.assertSameTrack(
+            "https://www.dropbox.com/s/nonsense/file.wav",
+            "https://www.dropbox.com/s/nonsense/file.wav?dl=0",
+            "https://dropbox.com/s/nonsense/file.wav?dl=1",
+        )
+        self.assertNotEqual(
+            get_media_key("https://www.dropbox.com/scl/fi/nonsense/file.wav?rlkey=a"),
+            get_media_key("https://www.dropbox.com/scl/fi/nonsense/file.wav?rlkey=b"),
+        )
+
+    def test_google_drive(self):
+        self.assertSameTrack(
+            "https://drive.google.com/file/d/abcdefghijklmnopqrstuvwxyz1234567/view",
+            "https://drive.google.com/file/d/abcdefghijklmnopqrstuvwxyz1234567/view?usp=sharing",
+            "https://drive.google.com/file/d/abcdefghijklmnopqrstuvwxyz1234567",
+        )
+        self.assertNotEqual(
+            get_media_key("https://drive.google.com/file/d/abc/view"),
+            get_media_key("https://drive.google.com/drive/folders/abc"),
+        )
+
+    def test_onedrive(self):
+        self.assertSameTrack(
+            "https://onedrive.live.com/?authkey=AUTHKEY&cid=CID&id=CID%21123",
+            "https://onedrive.live.com/?id=CID%21123&cid=cid&authkey=AUTHKEY",
+            "https://onedrive.live.com/download?cid=CID&resid=CID%21123&authkey=OTHER",
+        )
+        self.assertNotEqual(
+            get_media_key("https://onedrive.live.com/?authkey=A&cid=CID&id=CID%21123"),
+            get_media_key("https://onedrive.live.com/?authkey=A&cid=CID&id=CID%21124"),
+        )
+
+    def test_no_media_url(self):
+        self.assertIsNone(get_media_key(None))
+        self.assertIsNone(get_media_key(""))
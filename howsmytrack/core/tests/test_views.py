@@ -1,6 +1,17 @@
+import datetime
+
+import pytz
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import Client
 from django.test import TestCase
 
+from howsmytrack.core.models import FeedbackGroupsUser
+
+
+DATE_JOINED = datetime.datetime(2020, 2, 16, 6, tzinfo=pytz.utc)
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
 
 class LogoutTest(TestCase):
     """Test JWT cookie is deleted on logout."""
@@ -20,3 +31,71 @@ class RedirectToWwwTest(TestCase):
         response = client.get("", follow=False)
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.url, "https://www.howsmytrack.com/")
+
+
+class ExportStatsTest(TestCase):
+    """Test stats reports are streamed to staff users only."""
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username="graham@brightonandhovealbion.com",
+            password="password",
+            is_staff=True,
+        )
+        self.user = FeedbackGroupsUser.create(
+            email="lewis@brightonandhovealbion.com", password="password",
+        )
+        self.user.save()
+        User.objects.filter(id=self.user.user.id).update(date_joined=DATE_JOINED)
+        call_command("rollup_daily_stats")
+        self.client = Client()
+
+    def test_not_staff(self):
+        self.client.login(
+            username="lewis@brightonandhovealbion.com", password="password"
+        )
+        response = self.client.get("/stats/feedback_groups_users_by_date/")
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_report(self):
+        self.client.force_login(self.staff_user, backend=MODEL_BACKEND)
+        response = self.client.get("/stats/nonsense/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_format(self):
+        self.client.force_login(self.staff_user, backend=MODEL_BACKEND)
+        response = self.client.get(
+            "/stats/feedback_groups_users_by_date/", {"format": "xml"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_date(self):
+        self.client.force_login(self.staff_user, backend=MODEL_BACKEND)
+        response = self.client.get(
+            "/stats/feedback_groups_users_by_date/", {"start": "yesterday"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_csv(self):
+        self.client.force_login(self.staff_user, backend=MODEL_BACKEND)
+        response = self.client.get(
+            "/stats/feedback_groups_users_by_date/", {"end": "2020-02-16"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            b"".join(response.streaming_content), b"date,count\r\n16/2/2020,1\r\n",
+        )
+
+    def test_ndjson(self):
+        self.client.force_login(self.staff_user, backend=MODEL_BACKEND)
+        response = self.client.get(
+            "/stats/feedback_groups_users_by_date/",
+            {"format": "ndjson", "start": "2020-02-16"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            b'{"date": "16/2/2020", "count": 1}\n',
+        )
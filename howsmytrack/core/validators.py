@@ -1,3 +1,8 @@
+import hashlib
+import re
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 
@@ -22,6 +27,7 @@ ONEDRIVE_FILE_PARTS = [
     "cid=",
     "id=",
 ]
+GOOGLE_DRIVE_FILE_ID_REGEX = re.compile(r"^/file/d/([^/]+)")
 
 
 def is_onedrive_url(media_url):
@@ -50,3 +56,43 @@ def validate_media_url(media_url):
     if is_onedrive_url(media_url):
         return MediaTypeChoice.ONEDRIVE.name
     raise ValidationError(message=INVALID_MEDIA_URL_MESSAGE,)
+
+
+def get_canonical_media_url(media_url):
+    """
+    Reduce a media URL to the parts which identify the track on its
+    platform, so that links which differ only in their query strings,
+    `www.` prefixes, trailing slashes or parameter order are the same.
+    """
+    parts = urlsplit(media_url.strip())
+    host = re.sub(r"^(www|m)\.", "", parts.netloc.lower())
+    path = parts.path.rstrip("/")
+    params = parse_qs(parts.query)
+    if host == "soundcloud.com":
+        # Slugs are case-insensitive and any query string is for tracking.
+        return f"soundcloud:{path.lower()}"
+    if host.endswith("dropbox.com"):
+        # `dl` only chooses between previewing and downloading. Newer links
+        # need their `rlkey` to be opened, so it's part of the track.
+        rlkey = params.get("rlkey", [""])[0]
+        return f"dropbox:{path}?rlkey={rlkey}" if rlkey else f"dropbox:{path}"
+    if host == "drive.google.com":
+        file_id_match = GOOGLE_DRIVE_FILE_ID_REGEX.match(path)
+        if file_id_match:
+            return f"googledrive:{file_id_match.group(1)}"
+    if host == "onedrive.live.com":
+        # Download links call the file's id `resid`; `authkey` only grants
+        # access, so different share links for one file have the same key.
+        cid = params.get("cid", [""])[0]
+        item_id = (params.get("resid") or params.get("id") or [""])[0]
+        return f"onedrive:{cid.lower()}:{item_id.lower()}"
+    return f"{host}{path}?{parts.query}"
+
+
+def get_media_key(media_url):
+    """
+    Hash the canonical form of a media URL, for comparing requests by track.
+    """
+    if not media_url:
+        return None
+    return hashlib.sha256(get_canonical_media_url(media_url).encode()).hexdigest()
@@ -1,11 +1,34 @@
+import csv
+import json
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404
 from django.http import HttpResponse
+from django.http import HttpResponseBadRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import generate_latest
+
+from howsmytrack.core.auth import invalidate_token
+from howsmytrack.core.metrics import get_registry
+from howsmytrack.core.routers import read_from_replica
+from howsmytrack.core.stats import STATS_REPORTS
 
 
 WWW_HOMEPAGE_URL = "https://www.howsmytrack.com/"
 
+STATS_FORMAT_CSV = "csv"
+STATS_FORMAT_NDJSON = "ndjson"
+
 
 def logout(request):
+    token = request.COOKIES.get("JWT")
+    if token:
+        invalidate_token(token)
     response = HttpResponse("Cookies Deleted")
     response.delete_cookie("JWT", path="/")
     return response
@@ -16,3 +39,96 @@ def redirect_to_www(request):
     likely that the user actually wanted to go to the web homepage.
     """
     return redirect(WWW_HOMEPAGE_URL)
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it, allowing
+    csv.writer to produce lines for a StreamingHttpResponse."""
+
+    def write(self, value):
+        return value
+
+
+def read_rows_from_replica(rows):
+    """Reports are built lazily as they're streamed, so route reads to the
+    replica while iterating over them rather than while building them."""
+    with read_from_replica():
+        yield from rows
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row))) + "\n"
+
+
+def parse_optional_date(value):
+    if not value:
+        return None
+    date = parse_date(value)
+    if not date:
+        raise ValueError(f"Invalid date: {value}")
+    return date
+
+
+@staff_member_required
+def export_stats(request, report_name):
+    """Stream a stats report as CSV (default) or NDJSON, optionally limited
+    to rows between the `start` and `end` dates (YYYY-MM-DD, inclusive).
+    """
+    report = STATS_REPORTS.get(report_name)
+    if not report:
+        raise Http404(f"Unknown stats report: {report_name}")
+
+    output_format = request.GET.get("format", STATS_FORMAT_CSV)
+    if output_format not in (STATS_FORMAT_CSV, STATS_FORMAT_NDJSON):
+        return HttpResponseBadRequest("format must be one of: csv, ndjson")
+
+    try:
+        start_date = parse_optional_date(request.GET.get("start"))
+        end_date = parse_optional_date(request.GET.get("end"))
+    except ValueError:
+        return HttpResponseBadRequest(
+            "start and end must be dates of the form YYYY-MM-DD"
+        )
+
+    rows = read_rows_from_replica(
+        report.build_rows(start_date=start_date, end_date=end_date)
+    )
+    if output_format == STATS_FORMAT_NDJSON:
+        response = StreamingHttpResponse(
+            stream_ndjson(report.columns, rows), content_type="application/x-ndjson",
+        )
+        filename = f"{report_name}.ndjson"
+    else:
+        response = StreamingHttpResponse(
+            stream_csv(report.columns, rows), content_type="text/csv",
+        )
+        filename = report.filename
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def metrics(request):
+    """Metrics for all web processes on this host, in the Prometheus text format."""
+    if settings.METRICS_TOKEN:
+        authorized = constant_time_compare(
+            request.headers.get("Authorization", ""),
+            f"Bearer {settings.METRICS_TOKEN}",
+        )
+    else:
+        # Metrics are only public when not running in production.
+        authorized = not settings.RUNNING_ON_PROD
+    if not authorized:
+        return HttpResponse("Unauthorized", status=401)
+
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
@@ -1,11 +1,19 @@
+from datetime import timedelta
 from threading import Lock
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from django.core.management import call_command
+from apscheduler.schedulers.base import STATE_PAUSED
+from apscheduler.schedulers.base import STATE_RUNNING
+from apscheduler.schedulers.base import STATE_STOPPED
 from django_apscheduler.jobstores import DjangoJobStore
 from django_apscheduler.jobstores import register_events
 from django_apscheduler.jobstores import register_job
 
+from howsmytrack.core.job_dag import DagJob
+from howsmytrack.core.job_dag import JobDag
+from howsmytrack.core.job_runner import run_job
+from howsmytrack.core.metrics import update_queue_depths
+
 
 scheduler = BackgroundScheduler()
 scheduler.add_jobstore(DjangoJobStore(), "default")
@@ -13,40 +21,95 @@ scheduler.add_jobstore(DjangoJobStore(), "default")
 # 10 AM UTC; focusing on Americans who get their groups assigned while they sleep.
 JOB_HOUR = 10
 
-# Lock is used to prevent the same job running multiple times simultaneously. In the long term,
-# I would prefer to figure out why this is happening, even with just one instance running.
+# Lock guards starting and pausing the scheduler. The scheduler itself only runs in the
+# `run_scheduler` clock process, which holds a DB lease to make sure only one scheduler
+# is running across all dynos; each job also takes its own DB lock in `run_job`.
 lock = Lock()
 
 
+# Ratings must be up to date before grouping, since users are grouped by rating.
+# Reminder emails don't depend on anything so are sent while ratings are calculated.
+DAILY_JOBS = JobDag(
+    "daily_jobs",
+    [
+        DagJob(
+            "calculate_user_ratings", dependencies=[], timeout=timedelta(minutes=30),
+        ),
+        DagJob(
+            "send_group_reminder_emails",
+            dependencies=[],
+            timeout=timedelta(minutes=30),
+        ),
+        DagJob(
+            "assign_groups",
+            dependencies=["calculate_user_ratings"],
+            timeout=timedelta(minutes=30),
+        ),
+    ],
+)
+
+# These jobs used to be scheduled individually at fixed offsets and are now run by
+# DAILY_JOBS; remove them from the job store if they're still there.
+REMOVED_JOB_IDS = [
+    "howsmytrack.jobs.calculate_user_ratings",
+    "howsmytrack.jobs.send_group_reminder_emails",
+    "howsmytrack.jobs.assign_groups",
+]
+
+
 @register_job(scheduler, "cron", hour=JOB_HOUR)
-def calculate_user_ratings():
-    with lock:
-        print("Starting: calculate_user_ratings")
-        call_command("calculate_user_ratings")
-        print("Done: calculate_user_ratings")
+def daily_jobs():
+    print("Starting: daily_jobs")
+    DAILY_JOBS.run()
+    print("Done: daily_jobs")
 
 
-@register_job(scheduler, "cron", hour=JOB_HOUR, minute=15)
-def send_group_reminder_emails():
-    with lock:
-        print("Starting: send_group_reminder_emails")
-        call_command("send_group_reminder_emails")
-        print("Done: send_group_reminder_emails")
+# Just after midnight UTC so that the previous day's stats are complete.
+@register_job(scheduler, "cron", hour=0, minute=5)
+def rollup_daily_stats():
+    print("Starting: rollup_daily_stats")
+    run_job("rollup_daily_stats")
+    print("Done: rollup_daily_stats")
 
 
-@register_job(scheduler, "cron", hour=JOB_HOUR, minute=30)
-def assign_groups():
-    with lock:
-        print("Starting: assign_groups")
-        call_command("assign_groups")
-        print("Done: assign_groups")
+@register_job(scheduler, "cron", minute=30)
+def delete_expired_idempotency_keys():
+    print("Starting: delete_expired_idempotency_keys")
+    run_job("delete_expired_idempotency_keys")
+    print("Done: delete_expired_idempotency_keys")
+
+
+# Not a management command or recorded as a JobRun; it's a single query to
+# keep the queue depth gauge served by the clock process current.
+@register_job(scheduler, "interval", minutes=1)
+def update_queue_depth_metrics():
+    update_queue_depths()
 
 
 def start_scheduler():
     with lock:
-        if scheduler.state == 0:
+        if scheduler.state == STATE_STOPPED:
             register_events(scheduler)
             scheduler.start()
+            for job_id in REMOVED_JOB_IDS:
+                if scheduler.get_job(job_id):
+                    scheduler.remove_job(job_id)
             print("Started scheduler.")
+        elif scheduler.state == STATE_PAUSED:
+            scheduler.resume()
+            print("Resumed scheduler.")
         else:
             print("Attempted to start scheduler, but scheduler was already running.")
+
+
+def pause_scheduler():
+    with lock:
+        if scheduler.state == STATE_RUNNING:
+            scheduler.pause()
+            print("Paused scheduler.")
+
+
+def shutdown_scheduler():
+    if scheduler.state != STATE_STOPPED:
+        scheduler.shutdown()
+        print("Shut down scheduler.")
@@ -9,10 +9,13 @@ https://docs.djangoproject.com/en/3.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.0/ref/settings/
 """
+import logging
 import os
 import sys
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 RUNNING_ON_PROD = os.environ.get("ENVIRONMENT") == "PROD"
 
 if RUNNING_ON_PROD:
@@ -59,16 +62,35 @@ INSTALLED_APPS = [
 
 GRAPHENE = {
     "SCHEMA": "howsmytrack.schema.schema",
-    "MIDDLEWARE": ["graphql_jwt.middleware.JSONWebTokenMiddleware",],
+    "MIDDLEWARE": [
+        "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "howsmytrack.core.profiling.SQLProfilerGraphQLMiddleware",
+        "howsmytrack.core.metrics.MetricsGraphQLMiddleware",
+        "howsmytrack.core.rate_limits.RateLimitGraphQLMiddleware",
+    ],
 }
 
+# Token buckets limiting how often each client (each user, or each IP when
+# logged out) can resolve expensive root fields; see howsmytrack.core.rate_limits.
+# Clients can resolve a field `capacity` times in a burst, refilled at
+# `per_minute`. Tests aren't limited unless they're testing limits.
+if "test" in sys.argv:
+    RATE_LIMITS = {}
+else:
+    RATE_LIMITS = {
+        "registerUser": {"capacity": 5, "per_minute": 1},
+        "tokenAuth": {"capacity": 10, "per_minute": 5},
+        "feedbackGroups": {"capacity": 30, "per_minute": 30},
+    }
+
 AUTHENTICATION_BACKENDS = [
-    "graphql_jwt.backends.JSONWebTokenBackend",
+    "howsmytrack.core.auth.CachedJSONWebTokenBackend",
     "django.contrib.auth.backends.ModelBackend",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "howsmytrack.core.profiling.SQLProfilerMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -98,6 +120,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "howsmytrack.wsgi.application"
 
+# Size of the thread pool requests are run in when served over ASGI (see
+# howsmytrack.core.asgi). Each thread may hold its own DB connection.
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", "8"))
+
 if DEBUG:
     CORS_ORIGIN_ALLOW_ALL = True
 else:
@@ -109,6 +135,7 @@ else:
     ]
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = list(default_headers) + ["idempotency-key"]
 
 # Force HTTPS
 if not DEBUG:
@@ -138,10 +165,35 @@ if DEBUG:
             "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
         }
     }
+    if "test" in sys.argv:
+        # Stand-in replica for tests, which enable REPLICA_DATABASE themselves.
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(BASE_DIR, "db-replica.sqlite3"),
+        }
 else:
     import dj_database_url
 
     DATABASES = {"default": dj_database_url.config(conn_max_age=600)}
+    if os.environ.get("REPLICA_DATABASE_URL"):
+        DATABASES["replica"] = dj_database_url.parse(
+            os.environ["REPLICA_DATABASE_URL"], conn_max_age=600
+        )
+
+# GraphQL queries and other read-only paths read from this database alias, if
+# set (see howsmytrack.core.routers). Clients read from the primary for
+# REPLICA_PIN_SECONDS after a mutation, so they always see their own writes.
+DATABASE_ROUTERS = ["howsmytrack.core.routers.ReplicaRouter"]
+REPLICA_DATABASE = "replica" if "replica" in DATABASES and not DEBUG else None
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "10"))
+
+# Responses to mutations made with an `Idempotency-Key` header are stored for
+# this long, so that retries with the same key aren't run again.
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# A key still in progress after this long is assumed to belong to a request
+# that died (e.g. its worker was killed), and can be taken over by a retry.
+# Well over the 30 second limit Heroku and gunicorn give each request.
+IDEMPOTENCY_KEY_LEASE = timedelta(seconds=60)
 
 GRAPHQL_JWT = {
     "JWT_VERIFY_EXPIRATION": True,
@@ -153,6 +205,82 @@ GRAPHQL_JWT = {
     # All authentication uses cookies, so allowing tokens to be included in
     # query bodies is an unnecessary risk.
     "JWT_HIDE_TOKEN_FIELDS": True,
+    "JWT_GET_USER_BY_NATURAL_KEY_HANDLER": "howsmytrack.core.auth.get_user_by_natural_key",
+}
+
+# Recently verified JWTs are cached in each process (see howsmytrack.core.auth),
+# so that requests with them skip verification and the user lookup. Tests don't
+# cache them unless they're testing caching.
+JWT_VERIFICATION_CACHE = {
+    "MAX_SIZE": 0 if "test" in sys.argv else 1000,
+    "TTL": timedelta(minutes=1),
+}
+
+# SQL profiling
+# Opt-in; when enabled, SAMPLE_RATE of requests have their SQL queries profiled. Profiled
+# requests exceeding any of the thresholds are logged, and in debug mode, profiles are
+# returned in the `extensions` field of GraphQL responses.
+SQL_PROFILER = {
+    "ENABLED": os.environ.get("SQL_PROFILER_ENABLED") == "1",
+    "SAMPLE_RATE": float(
+        os.environ.get("SQL_PROFILER_SAMPLE_RATE", "1" if DEBUG else "0.01")
+    ),
+    "SLOW_REQUEST_MS": 500,
+    "SLOW_SQL_MS": 200,
+    "MAX_QUERIES": 50,
+    # Number of slowest statements included in each profile.
+    "SLOWEST_QUERIES": 5,
+}
+
+# Caching
+# Caches must be shared by every process on every dyno (web and clock), or a
+# process could keep serving values that a change made by another process has
+# invalidated; rate limits are also counted in the cache. Production uses Redis
+# (requires django-redis) if REDIS_URL is set, which Heroku Redis does, and
+# otherwise a table in the DB (created by `createcachetable` on release), which
+# is shared but slower. Local development uses local memory, and tests don't
+# cache unless they're testing caching.
+if "test" in sys.argv:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+elif os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+elif DEBUG:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+else:
+    logging.getLogger(__name__).warning(
+        "REDIS_URL is not set; caching in the database instead."
+    )
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "howsmytrack_cache",
+        }
+    }
+
+# Metrics
+# If set, scrapers must send this as a bearer token to read /metrics. It's
+# required in production; without it, /metrics refuses every request.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# The clock process runs jobs and sends group emails but serves no /metrics,
+# so it serves its own metrics (job durations, email send latencies and queue
+# depths) on this port if set. It has no authentication, so only expose the
+# port to the scraper.
+CLOCK_METRICS_PORT = (
+    int(os.environ["CLOCK_METRICS_PORT"])
+    if os.environ.get("CLOCK_METRICS_PORT")
+    else None
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {"howsmytrack": {"handlers": ["console"], "level": "INFO"}},
 }
 
 # Password validation
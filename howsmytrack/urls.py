@@ -17,11 +17,13 @@ from django.contrib import admin
 from django.urls import include
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 from graphql_jwt.decorators import jwt_cookie
 
 import howsmytrack.settings
+from howsmytrack.core.graphql_view import HowsMyTrackGraphQLView
+from howsmytrack.core.views import export_stats
 from howsmytrack.core.views import logout
+from howsmytrack.core.views import metrics
 from howsmytrack.core.views import redirect_to_www
 
 urlpatterns = [
@@ -31,8 +33,12 @@ urlpatterns = [
     path(
         "graphql/",
         csrf_exempt(
-            jwt_cookie(GraphQLView.as_view(graphiql=howsmytrack.settings.DEBUG))
+            jwt_cookie(
+                HowsMyTrackGraphQLView.as_view(graphiql=howsmytrack.settings.DEBUG)
+            )
         ),
     ),
     path("logout/", logout),
+    path("metrics", metrics),
+    path("stats/<str:report_name>/", export_stats),
 ]
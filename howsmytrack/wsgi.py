@@ -13,7 +13,3 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "howsmytrack.settings")
 
 application = get_wsgi_application()
-
-from howsmytrack.jobs import start_scheduler
-
-start_scheduler()